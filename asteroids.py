@@ -0,0 +1,156 @@
+# Asteroid belts.
+#
+# A belt's rocks are orbital elements in arrays (radius, phase, angular
+# speed, height, size, shape), never entities. Positions are a closed-form
+# function of universe time, computed for every drawn rock at once and
+# written straight into one merged mesh per belt, so a belt of thousands of
+# rocks is a single node and draw call.
+#
+# Rocks are stored in random order, so any prefix of them is an even sample
+# of the belt. LOD thins a belt by drawing a shorter prefix as the ship
+# gets further from the ring; only drawn rocks are moved each frame.
+
+import math
+
+import numpy as np
+from panda3d.core import BoundingSphere, NodePath, Point3
+
+from lod import select_levels
+from meshes import make_geom_node, vertex_rows, set_triangles
+
+# Octahedron rocks, lit from above by their vertex colours
+ROCK_VERTICES = np.array([
+    (1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1),
+], dtype=np.float32) * 0.5
+ROCK_TRIANGLES = np.array([
+    (0, 2, 4), (4, 2, 1), (1, 2, 5), (5, 2, 0),
+    (4, 3, 0), (1, 3, 4), (5, 3, 1), (0, 3, 5),
+], dtype=np.uint32)
+ROCK_SHADING = np.array([0.8, 0.7, 1.0, 0.45, 0.75, 0.65], dtype=np.float32)
+
+
+def belt_elements(belt):
+    # Orbital elements of every rock in a BeltRecord, from its seed
+    rng = np.random.default_rng(belt.seed)
+    n = belt.count
+    mid = (belt.inner_radius + belt.outer_radius) / 2
+    radius = rng.triangular(belt.inner_radius, mid, belt.outer_radius, n)
+    return {
+        'radius': radius,
+        'phase': rng.uniform(0, math.pi * 2, n),
+        'speed': belt.orbital_speed / np.sqrt(radius / 100),
+        'height': np.clip(rng.normal(0, belt.thickness / 3, n), -belt.thickness, belt.thickness),
+        # Mostly small rocks, a few large ones
+        'size': belt.rock_size[0] + (belt.rock_size[1] - belt.rock_size[0]) * rng.random(n) ** 2,
+        'stretch': rng.uniform(0.6, 1.4, (n, 3)),
+        'shade': rng.uniform(0.6, 1.0, n),
+    }
+
+
+class AsteroidBelt:
+    def __init__(self, record, parent, position, rgba):
+        self.record = record
+        self.count = record.count
+        e = belt_elements(record)
+        self.radius = e['radius'].astype(np.float32)
+        self.phase = e['phase']
+        self.speed = e['speed']
+        self.height = e['height'].astype(np.float32)
+        self.mean_size = float(e['size'].mean())
+
+        # Vertices are stored corner-major (every rock's first corner, then
+        # every rock's second...), so each axis updates in long runs.
+        # shape is each corner's offset from its rock's centre, (3, 6, n).
+        n = self.count
+        scale = (e['size'][:, None] * e['stretch']).T
+        self.shape = (ROCK_VERTICES.T[:, :, None] * scale[:, None, :]).astype(np.float32)
+
+        colors = np.empty((len(ROCK_VERTICES), n, 4), dtype=np.float32)
+        colors[..., :3] = np.asarray(tuple(rgba)[:3], dtype=np.float32) * (ROCK_SHADING[:, None] * e['shade'])[..., None]
+        colors[..., 3] = 1
+        # Triangles stay rock by rock, so a prefix of them is a prefix of rocks
+        self.triangles = (ROCK_TRIANGLES[None] * n + np.arange(n, dtype=np.uint32)[:, None, None]).reshape(-1, 3)
+
+        self.geom_node = make_geom_node('asteroid_belt', np.zeros((n * len(ROCK_VERTICES), 3)),
+                                        colors.reshape(-1, 4), self.triangles, dynamic=True)
+        # Rocks move every frame, so the bounds are the whole ring instead
+        # of being recomputed from the vertices
+        self.geom_node.set_bounds(BoundingSphere(Point3(0, 0, 0), record.outer_radius + record.thickness))
+        self.geom_node.set_final(True)
+        self.node = NodePath(self.geom_node)
+        self.node.reparent_to(parent)
+        self.node.set_pos(position)
+        self.node.set_light_off()
+
+        self.level = None
+        self.visible = n
+
+    def set_lod(self, level, density):
+        self.level = level
+        visible = max(int(math.ceil(self.count * density[level])), 1)
+        if visible != self.visible:
+            self.visible = visible
+            set_triangles(self.geom_node, self.triangles[:visible * len(ROCK_TRIANGLES)])
+
+    def write(self, t):
+        k = self.visible
+        angle = self.phase[:k] + self.speed[:k] * t
+        rows = vertex_rows(self.geom_node).reshape(len(ROCK_VERTICES), self.count, 7)
+        rows[:, :k, 0] = self.shape[0, :, :k] + np.cos(angle) * self.radius[:k]
+        rows[:, :k, 1] = self.shape[1, :, :k] + self.height[:k]
+        rows[:, :k, 2] = self.shape[2, :, :k] + np.sin(angle) * self.radius[:k]
+
+    def ring_distance(self, point):
+        # From a point (in the parent's space) to the belt's mid ring
+        x, y, z = (float(p) - float(c) for p, c in zip(point, self.node.get_pos()))
+        mid = (self.record.inner_radius + self.record.outer_radius) / 2
+        return math.hypot(math.hypot(x, z) - mid, y)
+
+    def destroy(self):
+        self.node.remove_node()
+
+
+class BeltSystem:
+    # Every loaded belt is written for the same universe time, so a rock's
+    # position doesn't depend on when its belt was loaded
+    def __init__(self, thresholds, density, hysteresis=0.15):
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.density = density
+        self.hysteresis = hysteresis
+        self.belts = []
+        self.switches = 0
+
+    def __len__(self):
+        return len(self.belts)
+
+    def add(self, belt):
+        self.belts.append(belt)
+        return belt
+
+    def remove(self, belt):
+        self.belts.remove(belt)
+        belt.destroy()
+
+    def update_lod(self, viewer):
+        if not self.belts:
+            return
+        ratios = np.array([b.mean_size / max(b.ring_distance(viewer), 1e-6) for b in self.belts])
+        # New belts (-1) take whichever level fits
+        current = np.array([-1 if b.level is None else b.level for b in self.belts])
+        levels = select_levels(ratios, current, self.thresholds, self.hysteresis)
+        for belt, level in zip(self.belts, levels.tolist()):
+            if level != belt.level:
+                belt.set_lod(level, self.density)
+                self.switches += 1
+
+    def write(self, t):
+        for belt in self.belts:
+            belt.write(t)
+
+    def rocks(self):
+        return sum(b.count for b in self.belts), sum(b.visible for b in self.belts)
+
+    def report(self, name='Belts'):
+        total, drawn = self.rocks()
+        return (f"{name:<10} belts {len(self.belts):>3} | rocks {total:>6} | drawn {drawn:>6} | "
+                f"switches {self.switches}")
@@ -0,0 +1,91 @@
+# Per-chunk static batching.
+#
+# Once a chunk's bodies have their LOD levels, copies of every body's static
+# parts (body mesh, glows, nebula layers) are gathered under one node and
+# flattened. Flattening bakes transforms and colors into the vertices and
+# merges everything that shares a render state, so a chunk costs a few Geoms
+# (draw calls) instead of a few per body. The originals are hidden, not
+# removed. Animated parts such as black-hole disks and orbiting planets are
+# never batched.
+#
+# Batched objects implement:
+#   batch_parts()        - static nodes to copy into the batch
+#   set_batched(batched) - hide or show the nodes the batch stands in for
+#
+# A batch goes stale when a member changes appearance (an LOD switch) or the
+# chunk's membership changes. It is cleared at once, so the individual nodes
+# show again, and rebuilt later.
+
+
+def count_nodes(root):
+    # (GeomNodes, Geoms) visible under root; each Geom is one draw call
+    nodes = geoms = 0
+    for path in root.find_all_matches('**/+GeomNode'):
+        if not path.is_hidden():
+            nodes += 1
+            geoms += path.node().get_num_geoms()
+    return nodes, geoms
+
+
+class ChunkBatch:
+    def __init__(self, parent):
+        self.parent = parent
+        self.node = None
+        self.members = []
+
+        self.nodes_before = self.geoms_before = 0
+        self.nodes_after = self.geoms_after = 0
+        self.builds = 0
+
+    @property
+    def built(self):
+        return self.node is not None
+
+    def build(self, objects, origin):
+        # origin (under parent) keeps the baked vertex coordinates small
+        self.clear()
+        self.nodes_before, self.geoms_before = self._count(objects)
+
+        node = self.parent.attach_new_node('chunk_batch')
+        node.set_pos(origin)
+        content = node.attach_new_node('content')
+
+        for obj in objects:
+            parts = obj.batch_parts()
+            if not parts:
+                continue
+
+            for part in parts:
+                copy = part.copy_to(content)
+                copy.set_transform(part.get_transform(content))
+                copy.set_state(part.get_state(content))
+                copy.show()
+
+            obj.set_batched(True)
+            self.members.append(obj)
+
+        content.flatten_strong()
+        self.node = node
+
+        nodes, geoms = self._count(objects)
+        batch_nodes, batch_geoms = count_nodes(node)
+        self.nodes_after = nodes + batch_nodes
+        self.geoms_after = geoms + batch_geoms
+        self.builds += 1
+
+    def _count(self, objects):
+        nodes = geoms = 0
+        for obj in objects:
+            n, g = count_nodes(obj)
+            nodes += n
+            geoms += g
+        return nodes, geoms
+
+    def clear(self):
+        for obj in self.members:
+            obj.set_batched(False)
+        self.members.clear()
+
+        if self.node is not None:
+            self.node.remove_node()
+            self.node = None
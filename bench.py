@@ -0,0 +1,305 @@
+# Headless benchmark runner.
+#
+#   python3 bench.py                          # all scenarios, JSON to stdout
+#   python3 bench.py hyper_line --out a.json  # one scenario, JSON to a file
+#
+# The simulator runs in an offscreen window with a fixed time step and seeded
+# RNGs, and replays scripted flights. Each scenario reports frame-time
+# percentiles and the time spent in the main subsystems, so results can be
+# diffed between commits. Chunk workers still run in the background; pass
+# --workers 0 to make chunk arrival frame-exact as well.
+
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+import contextlib
+import subprocess
+
+import numpy as np
+from panda3d.core import loadPrcFileData
+
+from config import Config
+from generation import STAR, BLACK_HOLE, generate_chunk
+
+DT = 1 / 60
+
+# ══════════════════════════════════════════════════════════════════
+# TIMING SCOPES
+# ══════════════════════════════════════════════════════════════════
+
+class Scopes:
+    def __init__(self):
+        self.frame = {}
+        self.frames = []
+
+    def wrap(self, func, name):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.frame[name] = self.frame.get(name, 0.0) + (time.perf_counter() - start) * 1000
+        return timed
+
+    def end_frame(self, measured):
+        if measured:
+            self.frames.append(self.frame)
+        self.frame = {}
+
+    def summary(self):
+        names = sorted({name for frame in self.frames for name in frame})
+        return {name: percentiles([frame.get(name, 0.0) for frame in self.frames]) for name in names}
+
+
+def percentiles(values):
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return {}
+    return {
+        'p50': round(float(np.percentile(values, 50)), 3),
+        'p95': round(float(np.percentile(values, 95)), 3),
+        'p99': round(float(np.percentile(values, 99)), 3),
+        'max': round(float(values.max()), 3),
+        'mean': round(float(values.mean()), 3),
+    }
+
+# ══════════════════════════════════════════════════════════════════
+# SCRIPTED FLIGHTS
+# Each scenario is a generator that steers the ship and yields once per
+# frame: False for warm-up frames, True for measured ones.
+# ══════════════════════════════════════════════════════════════════
+
+def find_body(kind, center=(0, 0, 0), max_radius=64):
+    # Nearest generated body of a kind, searched ring by ring from a chunk
+    for radius in range(max_radius + 1):
+        found = []
+        for dx in range(-radius, radius + 1):
+            for dz in range(-radius, radius + 1):
+                if max(abs(dx), abs(dz)) != radius:
+                    continue
+                record = generate_chunk((center[0] + dx, 0, center[2] + dz))
+                found += [body for body in record.bodies if body.kind == kind]
+        if found:
+            return min(found, key=lambda body: math.dist(body.position, (0, 0, 0)))
+    raise LookupError(f"no body of kind {kind} within {max_radius} chunks")
+
+
+def render_position(sim, abs_pos):
+    origin = sim.floating_origin.get_absolute_position((0, 0, 0))
+    return sim.Vec3(*(a - o for a, o in zip(abs_pos, origin)))
+
+
+def place_ship(sim, abs_pos, look_at=None):
+    ship = sim.ship
+    ship.speed = 0
+    ship.position = render_position(sim, abs_pos)
+    if look_at is not None:
+        ship.look_at(render_position(sim, look_at))
+
+
+def hyper_line(sim, chunks=50, warmup=60):
+    ship = sim.ship
+    place_ship(sim, sim.main.START_POSITION)
+    ship.rotation = (0, 0, 0)
+    ship.mode = 3
+    ship.speed = ship.max_speeds[3]
+
+    frames = math.ceil(chunks * Config.CHUNK_SIZE / (ship.max_speeds[3] * DT))
+    sim.held_keys['w'] = 1
+    try:
+        for i in range(warmup + frames):
+            yield i >= warmup
+    finally:
+        sim.held_keys['w'] = 0
+        ship.mode = 0
+        ship.speed = 0
+
+
+def orbit_threshold(sim, frames=900, warmup=60):
+    # Circles a star while the distance swings across the planet load and
+    # unload radii, so planets keep loading and unloading
+    star = find_body(STAR, (25, 0, 25))
+    mid = (Config.PLANET_LOAD_DIST + Config.PLANET_UNLOAD_DIST) / 2
+    swing = (Config.PLANET_UNLOAD_DIST - Config.PLANET_LOAD_DIST) * 0.75
+
+    for i in range(warmup + frames):
+        t = max(i - warmup, 0) / frames
+        angle = t * math.pi * 4
+        radius = mid + swing * math.sin(t * math.pi * 12)
+        x, y, z = star.position
+        place_ship(sim, (x + math.cos(angle) * radius, y, z + math.sin(angle) * radius), star.position)
+        yield i >= warmup
+
+
+def black_hole_park(sim, frames=600, warmup=60):
+    hole = find_body(BLACK_HOLE, (-25, 0, 25))
+    x, y, z = hole.position
+    parked = (x + hole.size * 5, y, z)
+
+    for i in range(warmup + frames):
+        # Held in place against the pull, so the gravity code runs every frame
+        place_ship(sim, parked, hole.position)
+        yield i >= warmup
+
+
+SCENARIOS = {
+    'hyper_line': hyper_line,
+    'orbit_threshold': orbit_threshold,
+    'black_hole_park': black_hole_park,
+}
+
+# ══════════════════════════════════════════════════════════════════
+# RUNNER
+# ══════════════════════════════════════════════════════════════════
+
+class Simulator:
+    # Offscreen instance of main.py with its per-frame work instrumented
+    def __init__(self, seed):
+        loadPrcFileData('', 'audio-library-name null\nsync-video false')
+        Config.WINDOW_TYPE = 'offscreen'
+        np.random.seed(seed)
+        random.seed(seed)
+
+        # The banner and engine info go to stderr, keeping stdout for JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            import main as simulator
+            simulator.init()
+        from ursina import application, held_keys, Vec3
+        from ursina import time as ursina_time
+
+        self.main = main = simulator
+        self.app = main.app
+        self.ship = main.ship
+        self.floating_origin = main.floating_origin
+        self.held_keys = held_keys
+        self.Vec3 = Vec3
+
+        # Fixed time step: every run sees the same dt sequence, one
+        # simulation step per frame
+        Config.SIM_STEP = DT
+        application.calculate_dt = False
+        ursina_time.dt = ursina_time.dt_unscaled = DT
+
+        self.scopes = Scopes()
+        wrap = self.scopes.wrap
+        main.Universe.update = wrap(main.Universe.update, 'Universe.update')
+        main.Effects.update = wrap(main.Effects.update, 'Effects.update')
+        main.OrbitSystem.step = wrap(main.OrbitSystem.step, 'OrbitSystem.step')
+        main.OrbitSystem.write = wrap(main.OrbitSystem.write, 'OrbitSystem.write')
+        main.Spaceship.simulate = wrap(main.Spaceship.simulate, 'Spaceship.simulate')
+        for cls in (main.Spaceship, main.HUD, main.WarpEffect, main.EngineExhaust, main.BlackHole):
+            cls.update = wrap(cls.update, f'{cls.__name__}.update')
+        self.update = wrap(main.update, 'update')
+
+    def startup(self, limit=600):
+        # Frames until the chunks around the start are in, with the
+        # start-up milestones in ms since the process started
+        frames = 0
+        # The game prints its start-up report; keep stdout for JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            while 'interactive' not in self.main.startup and frames < limit:
+                self.app.step()
+                frames += 1
+        return dict({name: round(seconds * 1000, 1) for name, seconds in self.main.startup.marks.items()},
+                    frames=frames)
+
+    def run(self, name, scenario):
+        frame_times = []
+        self.scopes.frames.clear()
+        streamer = self.main.universe.streamer
+        prefetcher = self.main.universe.prefetcher
+        generated = streamer.requested
+        prefetched = streamer.prefetched
+        hits, late, misses = prefetcher.hits, prefetcher.late, prefetcher.misses
+        rebases = self.floating_origin.rebases
+
+        for measured in scenario(self):
+            start = time.perf_counter()
+            self.app.step()
+            elapsed = (time.perf_counter() - start) * 1000
+            if measured:
+                frame_times.append(elapsed)
+            self.scopes.end_frame(measured)
+
+        return {
+            'frames': len(frame_times),
+            'frame_ms': percentiles(frame_times),
+            'scopes_ms': self.scopes.summary(),
+            'profiler_ms': self.main.profiler.summary(frames=len(frame_times)),
+            'counters': {
+                'chunks_loaded': len(self.main.universe.chunks),
+                'chunks_generated': streamer.requested - generated,
+                'chunks_prefetched': streamer.prefetched - prefetched,
+                'prefetch_hits': prefetcher.hits - hits,
+                'prefetch_late': prefetcher.late - late,
+                'prefetch_misses': prefetcher.misses - misses,
+                'rebases': self.floating_origin.rebases - rebases,
+                'objects_indexed': len(self.main.universe.index),
+            },
+        }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+sim = None
+
+
+def update():
+    # Called by ursina every frame, in place of main.update
+    sim.update()
+
+
+def main():
+    global sim
+    parser = argparse.ArgumentParser(description='Headless benchmark runner')
+    parser.add_argument('scenarios', nargs='*', help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument('--out', help='write JSON results here instead of stdout')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, help='chunk workers (default: Config.CHUNK_WORKERS)')
+    args = parser.parse_args()
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}")
+
+    if args.workers is not None:
+        Config.CHUNK_WORKERS = args.workers
+    sim = Simulator(args.seed)
+
+    results = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'dt': DT,
+        'seed': args.seed,
+        'config': {name: getattr(Config, name) for name in (
+            'CHUNK_SIZE', 'RENDER_DISTANCE', 'STARS_PER_CHUNK', 'CHUNK_WORKERS',
+            'CHUNK_WORKER_MODE', 'CHUNK_BUDGET_MS', 'SEED_SCHEME', 'PREFETCH_SECONDS',
+        )},
+        'startup_ms': sim.startup(),
+        'scenarios': {},
+    }
+    for name in args.scenarios or SCENARIOS:
+        result = results['scenarios'][name] = sim.run(name, SCENARIOS[name])
+        frame = result['frame_ms']
+        print(f"{name:<16} {result['frames']:>5} frames | p50 {frame['p50']:7.2f} | "
+              f"p95 {frame['p95']:7.2f} | p99 {frame['p99']:7.2f} ms", file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# Bounded LRU cache of generated chunk records.
+#
+# Re-entering recently visited space reuses the records instead of
+# regenerating them. Entries are evicted least-recently-used first, once
+# either the entry limit or the (estimated) byte limit is exceeded.
+
+from collections import OrderedDict
+
+from generation import STAR
+
+# Rough in-memory cost of a record, used for the byte limit. Planet lists
+# are filled lazily after caching, so stars reserve room for a full system.
+CHUNK_BYTES = 200
+BODY_BYTES = 400
+PLANET_SYSTEM_BYTES = 6 * 350
+
+
+def estimate_chunk_bytes(record):
+    size = CHUNK_BYTES
+    for body in record.bodies:
+        size += BODY_BYTES
+        if body.kind == STAR:
+            size += PLANET_SYSTEM_BYTES
+    return size
+
+
+class ChunkCache:
+    def __init__(self, max_entries=512, max_bytes=None, sizeof=estimate_chunk_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.entries = OrderedDict()
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, coords):
+        return coords in self.entries
+
+    def get(self, coords):
+        entry = self.entries.get(coords)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(coords)
+        return entry[0]
+
+    def put(self, record):
+        coords = record.coords
+        old = self.entries.pop(coords, None)
+        if old is not None:
+            self.bytes -= old[1]
+
+        size = self.sizeof(record) if self.max_bytes is not None else 0
+        self.entries[coords] = (record, size)
+        self.bytes += size
+        self._evict()
+
+    def _evict(self):
+        while self.entries and (
+            len(self.entries) > self.max_entries
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            _, (_, size) = self.entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate(),
+        }
+
+    def report(self):
+        return (f"{'ChunkCache':<10} entries {len(self.entries):>4} | evicted {self.evictions:>4} | "
+                f"hit rate {self.hit_rate() * 100:5.1f}% ({self.hits}/{self.hits + self.misses})")
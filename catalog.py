@@ -0,0 +1,430 @@
+# Catalog queries over procedural space.
+#
+# Answers questions like "nearest Blue Giant", "black holes within 200k" or
+# "stars with an Ocean planet in this sector" from generated data alone, far
+# past render distance and without creating any entities. Results are
+# (BodyRecord, distance) pairs, like SpatialIndex queries.
+#
+# Space is searched nearest first. Sectors and then batches of chunks go on
+# one heap keyed by how close they could possibly be, and a nearest query
+# stops as soon as nothing left on the heap can beat what it has found.
+# Chunks are turned into rows of a structured array in batches; queries that
+# don't ask for stars never generate any, and planets are only rolled for
+# queries that filter on them.
+#
+# Rows cover a chunk over all of universe time: every star also gets rows
+# for its remnants, which exist from the star's death on. A query with
+# alive_at sees the chunk as resolve_chunk would build it at that time.
+#
+# Each sector visited keeps a summary (LRU): its occupied chunks and what
+# they hold, from galaxy.chunk_contents, so sectors without anything that
+# matches are skipped. Sectors a query covers completely also keep their
+# full body table, which answers later queries there with one array filter.
+#
+# A cold search can take a hundred milliseconds or more, so the game runs
+# them with submit(), on the catalog's own worker thread, and picks up the
+# future when it's done. Summaries then only ever change on that thread.
+#
+#   catalog = Catalog()
+#   catalog.nearest(pos, star_type='Blue Giant')
+#   catalog.within(pos, 200000, kind=BLACK_HOLE)
+#   catalog.in_sector(catalog.sector_of(pos), planet_type='Ocean')
+#   future = catalog.submit('nearest', pos, kind=BLACK_HOLE)
+
+import atexit
+import heapq
+import math
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from config import Config
+from galaxy import chunk_contents, live_sectors
+from generation import (
+    STAR, NEBULA, BLACK_HOLE, GAS_GIANT, STAR_TYPES, PLANET_TYPES, GAS_GIANTS,
+    STAR_LIFETIMES, KIND_NAMES, make_body, chunk_plans, generate_chunk, generate_planets, star_fate,
+    star_remnants,
+)
+
+# Flat-layout bodies sit up to 200 units outside their chunk's layer
+MARGIN = 250.0
+
+# One bit per planet type, gas giants after the rocky ones
+PLANET_NAMES = [p['name'] for p in PLANET_TYPES] + [g['name'] for g in GAS_GIANTS]
+
+CATALOG_DTYPE = np.dtype([
+    ('kind', 'u1'),
+    ('type_index', 'u1'),
+    ('chunk', 'i8', 3),
+    ('position', 'f8', 3),
+    ('size', 'f8'),
+    ('seed', 'u8'),
+    ('born', 'f8'),     # universe time a remnant appears, -inf for generated bodies
+    ('death', 'f8'),    # universe time the star dies, inf for other bodies
+    ('planets', 'u4'),  # PLANET_NAMES bits, when rolled
+])
+
+
+def _index(names, name, what):
+    if name is None or isinstance(name, int):
+        return name
+    try:
+        return names.index(name)
+    except ValueError:
+        raise ValueError(f"unknown {what} {name!r}, expected one of {', '.join(names)}") from None
+
+
+def planet_mask(star):
+    mask = 0
+    for planet in generate_planets(star):
+        mask |= 1 << (planet.type_index + (len(PLANET_TYPES) if planet.kind == GAS_GIANT else 0))
+    return mask
+
+
+def chunk_rows(coords_list, stars=True, planets=False):
+    # Catalog rows for every body in the chunks, and for every star's
+    # remnants. Without stars, only the chunk rng's nebula and black hole
+    # are generated.
+    bodies = []
+    owners = []
+    born = []
+    deaths = []
+    remnants = []
+    for coords, plan in zip(coords_list, chunk_plans(coords_list)):
+        if not stars:
+            plan = (plan[0], [], plan[2], plan[3])
+        for body in generate_chunk(coords, plan=plan).bodies:
+            bodies.append(body)
+            owners.append(coords)
+            born.append(-math.inf)
+            if body.kind == STAR:
+                death = star_fate(body)[0]
+                deaths.append(death)
+                remnants += [(remnant, coords, death) for remnant in star_remnants(body)]
+            else:
+                deaths.append(math.inf)
+    for remnant, coords, death in remnants:
+        bodies.append(remnant)
+        owners.append(coords)
+        born.append(death)
+        deaths.append(math.inf)
+
+    rows = np.zeros(len(bodies), dtype=CATALOG_DTYPE)
+    if not bodies:
+        return rows
+    rows['kind'] = [b.kind for b in bodies]
+    rows['type_index'] = [b.type_index for b in bodies]
+    rows['chunk'] = owners
+    rows['position'] = [b.position for b in bodies]
+    rows['size'] = [b.size for b in bodies]
+    rows['seed'] = [b.seed for b in bodies]
+    rows['born'] = born
+    rows['death'] = deaths
+    if planets:
+        rows['planets'] = [planet_mask(b) if b.kind == STAR else 0 for b in bodies]
+    return rows
+
+
+def row_record(row):
+    return make_body(int(row['kind']), int(row['type_index']), tuple(row['position'].tolist()),
+                     float(row['size']), int(row['seed']))
+
+
+def _box_distance(point, lo, hi):
+    # From a point to each box lo..hi, 0 inside
+    gap = np.maximum(np.maximum(lo - point, point - hi), 0.0)
+    return np.sqrt((gap * gap).sum(axis=1))
+
+
+@dataclass
+class Query:
+    kind: int = None
+    star_type: int = None    # STAR_TYPES index
+    planet_type: int = None  # PLANET_NAMES index
+    alive_at: float = None   # universe time; None for bodies as generated
+
+    @classmethod
+    def make(cls, kind=None, star_type=None, planet_type=None, alive_at=None):
+        # Types can be given by name
+        star_type = _index([t['name'] for t in STAR_TYPES], star_type, 'star type')
+        planet_type = _index(PLANET_NAMES, planet_type, 'planet type')
+        if (star_type is not None or planet_type is not None) and kind not in (None, STAR):
+            raise ValueError(f"{KIND_NAMES[kind]}s have no star or planet type")
+        return cls(kind, star_type, planet_type, alive_at)
+
+    @property
+    def kinds(self):
+        if self.star_type is not None or self.planet_type is not None:
+            return (STAR,)
+        if self.kind is not None:
+            return (self.kind,)
+        return (STAR, NEBULA, BLACK_HOLE)
+
+    @property
+    def planets(self):
+        return self.planet_type is not None
+
+    @property
+    def remnants(self):
+        # Any star may have left a nebula or a black hole by then
+        return self.alive_at is not None and (NEBULA in self.kinds or BLACK_HOLE in self.kinds)
+
+    @property
+    def stars(self):
+        return STAR in self.kinds or self.remnants
+
+    @property
+    def empty(self):
+        # Every star of the type has died by then
+        return (self.star_type is not None and self.alive_at is not None
+                and self.alive_at >= STAR_LIFETIMES[self.star_type])
+
+    def mask(self, rows):
+        mask = np.isin(rows['kind'], self.kinds)
+        if self.star_type is not None:
+            mask &= rows['type_index'] == self.star_type
+        if self.planet_type is not None:
+            mask &= (rows['planets'] & (1 << self.planet_type)) != 0
+        if self.alive_at is None:
+            mask &= rows['born'] == -math.inf
+        else:
+            mask &= (rows['born'] <= self.alive_at) & (rows['death'] > self.alive_at)
+        return mask
+
+
+class SectorSummary:
+    def __init__(self, sector):
+        self.sector = sector
+        size = Config.SECTOR_SIZE
+        axis = np.arange(size)
+        offsets = np.stack(np.meshgrid(axis, axis, axis, indexing='ij'), axis=-1).reshape(-1, 3)
+        chunks = np.asarray(sector, dtype=np.int64) * size + offsets
+
+        if Config.UNIVERSE_LAYOUT == 'flat':
+            # Every chunk of the layer has its stars; the rare bodies are
+            # rolled at generation, so any chunk may hold them
+            chunks = chunks[chunks[:, 1] == 0]
+            stars = np.full(len(chunks), Config.STARS_PER_CHUNK)
+            nebula = black_hole = np.ones(len(chunks), dtype=bool)
+        else:
+            stars, nebula, black_hole = chunk_contents(chunks)
+            occupied = (stars > 0) | nebula | black_hole
+            chunks, stars = chunks[occupied], stars[occupied]
+            nebula, black_hole = nebula[occupied], black_hole[occupied]
+
+        self.chunks = chunks
+        self.holds = {STAR: stars > 0, NEBULA: nebula, BLACK_HOLE: black_hole}
+
+        # The full body table, once some query has generated all of it
+        self.rows = None
+        self.has_planets = False
+        self.type_counts = None
+        self.planet_counts = None
+
+    def chunk_mask(self, query):
+        mask = np.zeros(len(self.chunks), dtype=bool)
+        for kind in query.kinds:
+            mask |= self.holds[kind]
+        if query.remnants:
+            mask |= self.holds[STAR]
+        return mask
+
+    def can_match(self, query):
+        if not self.chunk_mask(query).any():
+            return False
+        if self.rows is not None and query.star_type is not None and not self.type_counts[query.star_type]:
+            return False
+        if self.has_planets and query.planet_type is not None and not self.planet_counts[query.planet_type]:
+            return False
+        return True
+
+    def ready(self, query):
+        return self.rows is not None and (self.has_planets or not query.planets)
+
+    def fill(self, planets=False):
+        self.rows = chunk_rows([tuple(c) for c in self.chunks.tolist()], True, planets)
+        self.has_planets = planets
+        stars = self.rows[self.rows['kind'] == STAR]
+        self.type_counts = np.bincount(stars['type_index'], minlength=len(STAR_TYPES))
+        if planets:
+            bits = (stars['planets'][:, None] >> np.arange(len(PLANET_NAMES))) & 1
+            self.planet_counts = bits.sum(axis=0)
+
+    def nbytes(self):
+        return self.chunks.nbytes * 2 + (self.rows.nbytes if self.rows is not None else 0)
+
+
+class Catalog:
+    def __init__(self, batch=64, max_sectors=256, max_distance=400000, threaded=True):
+        self.batch = batch
+        self.max_sectors = max_sectors
+        self.max_distance = max_distance
+        self.summaries = OrderedDict()
+        self.threaded = threaded
+        self.executor = None
+
+        self.queries = 0
+        self.chunks_scanned = 0
+        self.sectors_skipped = 0
+        self.table_hits = 0
+        self.last_ms = 0.0
+
+    @staticmethod
+    def sector_of(pos):
+        span = Config.CHUNK_SIZE * Config.SECTOR_SIZE
+        return tuple(int(math.floor(p / span)) for p in pos)
+
+    def summary(self, sector):
+        summary = self.summaries.get(sector)
+        if summary is None:
+            summary = self.summaries[sector] = SectorSummary(sector)
+            while len(self.summaries) > self.max_sectors:
+                self.summaries.popitem(last=False)
+        else:
+            self.summaries.move_to_end(sector)
+        return summary
+
+    # ──────────────────────────────────────────────────────────────
+    # Queries. `pos` is an absolute position, results are
+    # (BodyRecord, distance), nearest first.
+    # ──────────────────────────────────────────────────────────────
+
+    def nearest(self, pos, max_distance=None, **filters):
+        found = self.k_nearest(pos, 1, max_distance, **filters)
+        if not found:
+            return None, max_distance
+        return found[0]
+
+    def k_nearest(self, pos, k, max_distance=None, **filters):
+        return self._search(pos, max_distance, Query.make(**filters), k)
+
+    def within(self, pos, radius, **filters):
+        return self._search(pos, radius, Query.make(**filters), None)
+
+    def in_sector(self, sector, pos=None, **filters):
+        query = Query.make(**filters)
+        self.queries += 1
+        if query.empty:
+            return []
+        summary = self.summary(tuple(sector))
+        if not summary.can_match(query):
+            return []
+        if not summary.ready(query):
+            summary.fill(query.planets)
+            self.chunks_scanned += len(summary.chunks)
+        rows = summary.rows[query.mask(summary.rows)]
+        if pos is None:
+            return [(row_record(row), None) for row in rows]
+        dists = np.sqrt(((rows['position'] - np.asarray(pos, dtype=np.float64)) ** 2).sum(axis=1))
+        order = np.argsort(dists, kind='stable')
+        return [(row_record(rows[i]), float(dists[i])) for i in order.tolist()]
+
+    def _sectors(self, point, radius):
+        # Sectors that could hold a body within radius, with their distance
+        span = Config.CHUNK_SIZE * Config.SECTOR_SIZE
+        lo = np.floor((point - radius - MARGIN) / span).astype(np.int64)
+        hi = np.floor((point + radius + MARGIN) / span).astype(np.int64)
+        if Config.UNIVERSE_LAYOUT == 'flat':
+            lo[1], hi[1] = max(lo[1], 0), min(hi[1], 0)
+        axes = [np.arange(l, h + 1) for l, h in zip(lo.tolist(), hi.tolist())]
+        sectors = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+        if Config.UNIVERSE_LAYOUT != 'flat' and len(sectors):
+            sectors = sectors[live_sectors(sectors)]
+
+        near = _box_distance(point, sectors * span - MARGIN, (sectors + 1) * span + MARGIN)
+        corner = np.maximum(np.abs(sectors * span - MARGIN - point), np.abs((sectors + 1) * span + MARGIN - point))
+        far = np.sqrt((corner * corner).sum(axis=1))
+        keep = near <= radius
+        return sectors[keep], near[keep], far[keep]
+
+    def _search(self, pos, radius, query, k):
+        start = time.perf_counter()
+        self.queries += 1
+        if query.empty:
+            return []
+        radius = self.max_distance if radius is None else radius
+        point = np.asarray(pos, dtype=np.float64)
+        size = Config.CHUNK_SIZE
+
+        sectors, near, far = self._sectors(point, radius)
+        heap = [(d, i, None, tuple(s)) for i, (d, s) in enumerate(zip(near.tolist(), sectors.tolist()))]
+        heapq.heapify(heap)
+        seq = len(heap)
+        far = dict(zip(map(tuple, sectors.tolist()), far.tolist()))
+
+        found = []  # (distance, row), kept sorted
+        limit = radius
+        while heap:
+            bound, _, chunks, sector = heapq.heappop(heap)
+            if bound > limit:
+                break
+
+            if chunks is None:
+                summary = self.summary(sector)
+                if not summary.can_match(query):
+                    self.sectors_skipped += 1
+                    continue
+                # A query covering the whole sector builds its table for
+                # the next one
+                if not summary.ready(query) and k is None and query.stars and far[sector] <= radius:
+                    summary.fill(query.planets)
+                    self.chunks_scanned += len(summary.chunks)
+                elif summary.ready(query):
+                    self.table_hits += 1
+                if summary.ready(query):
+                    rows = summary.rows
+                else:
+                    chunks = summary.chunks[summary.chunk_mask(query)]
+                    bounds = _box_distance(point, chunks * size - MARGIN, (chunks + 1) * size + MARGIN)
+                    order = np.argsort(bounds, kind='stable')
+                    order = order[bounds[order] <= limit]
+                    for i in range(0, len(order), self.batch):
+                        batch = order[i:i + self.batch]
+                        heapq.heappush(heap, (float(bounds[batch[0]]), seq, chunks[batch], sector))
+                        seq += 1
+                    continue
+            else:
+                rows = chunk_rows([tuple(c) for c in chunks.tolist()], query.stars, query.planets)
+                self.chunks_scanned += len(chunks)
+
+            rows = rows[query.mask(rows)]
+            dists = np.sqrt(((rows['position'] - point) ** 2).sum(axis=1))
+            for i in np.flatnonzero(dists <= limit).tolist():
+                found.append((float(dists[i]), rows[i]))
+            if k is not None and len(found) >= k:
+                found.sort(key=lambda item: item[0])
+                del found[k:]
+                limit = found[-1][0]
+
+        found.sort(key=lambda item: item[0])
+        self.last_ms = (time.perf_counter() - start) * 1000
+        return [(row_record(row), dist) for dist, row in found]
+
+    def submit(self, method, *args, **filters):
+        # Runs a query in the background and returns its future. Without a
+        # thread it runs inline, and the future is already done.
+        query = getattr(self, method)
+        if not self.threaded:
+            future = Future()
+            future.set_result(query(*args, **filters))
+            return future
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(1, thread_name_prefix='catalog')
+            atexit.register(self.shutdown)
+        return self.executor.submit(query, *args, **filters)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def report(self, name='Catalog'):
+        summaries = list(self.summaries.values())
+        tables = sum(1 for s in summaries if s.rows is not None)
+        memory = sum(s.nbytes() for s in summaries) / 1e6
+        return (f"{name:<10} queries {self.queries} | last {self.last_ms:.1f} ms | "
+                f"sectors {len(summaries)} ({tables} tables, {memory:.1f} MB) | "
+                f"skipped {self.sectors_skipped} | table hits {self.table_hits} | "
+                f"chunks scanned {self.chunks_scanned}")
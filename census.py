@@ -0,0 +1,301 @@
+# Offline universe census.
+#
+#   python3 census.py --radius 48                       # statistics only
+#   python3 census.py --radius 48 --out census --workers 8
+#
+# Generates every occupied chunk in a region, with the same generators the
+# game streams with (generate_chunk, then generate_planets and
+# generate_belts for each star), and prints the statistics used to check
+# generator changes: the star-type mix against STAR_TYPES probabilities,
+# planet type counts and nebula and black hole density.
+#
+# The region is split by sector and each sector is one task on a process
+# pool. A worker writes its sector as one columnar .npz shard and sends back
+# only counts, so memory stays flat however large the region and throughput
+# follows the number of cores. Shards hold one array per column:
+#   body_*   one row per star, nebula and black hole
+#   planet_* one row per planet, planet_star indexes the body rows
+#   belt_*   one row per asteroid belt, belt_star likewise
+# with manifest.json describing the run and its generator signature.
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+from config import Config
+from galaxy import live_sectors, occupied
+from generation import (
+    STAR, NEBULA, BLACK_HOLE, GAS_GIANT, STAR_TYPES, PLANET_TYPES, GAS_GIANTS, BELT_TYPES,
+    chunk_plans, generate_chunk, generate_planets, generate_belts, generation_settings,
+)
+from chunkstore import generator_signature
+
+PLANET_NAMES = [p['name'] for p in PLANET_TYPES] + [g['name'] for g in GAS_GIANTS]
+BATCH = 256  # chunks generated per chunk_plans call
+
+
+def _settings():
+    # Process workers start with a fresh Config
+    settings = generation_settings()
+    settings.update(BELT_ROCKS=Config.BELT_ROCKS)
+    return settings
+
+
+def region_sectors(center, radius):
+    # Sectors that may hold chunks of the region, nearest first
+    size = Config.SECTOR_SIZE
+    center = np.asarray(center, dtype=np.int64)
+    lo = np.floor_divide(center - radius, size)
+    hi = np.floor_divide(center + radius, size)
+    if Config.UNIVERSE_LAYOUT == 'flat':
+        lo[1], hi[1] = max(lo[1], 0), min(hi[1], 0)
+    axes = [np.arange(l, h + 1) for l, h in zip(lo.tolist(), hi.tolist())]
+    sectors = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+    if Config.UNIVERSE_LAYOUT != 'flat' and len(sectors):
+        sectors = sectors[live_sectors(sectors)]
+    mid = (sectors * size + size / 2 - center) / size
+    return [tuple(s) for s in sectors[np.argsort((mid * mid).sum(axis=1), kind='stable')].tolist()]
+
+
+def region_size(radius):
+    # Chunks in the region, empty sectors included
+    axis = np.arange(-radius, radius + 1)
+    if Config.UNIVERSE_LAYOUT == 'flat':
+        return int((2 * np.floor(np.sqrt(radius * radius - axis * axis)) + 1).sum())
+    rest = radius * radius - axis[:, None] ** 2 - axis[None, :] ** 2
+    return int((2 * np.floor(np.sqrt(rest[rest >= 0])) + 1).sum())
+
+
+def sector_chunks(sector, center, radius):
+    # Occupied chunks of the sector inside the region
+    size = Config.SECTOR_SIZE
+    axis = np.arange(size)
+    offsets = np.stack(np.meshgrid(axis, axis, axis, indexing='ij'), axis=-1).reshape(-1, 3)
+    chunks = np.asarray(sector, dtype=np.int64) * size + offsets
+    delta = chunks - np.asarray(center, dtype=np.int64)
+    chunks = chunks[(delta * delta).sum(axis=1) <= radius * radius]
+    return chunks[occupied(chunks)]
+
+
+def census_sector(sector, center, radius, out, compress, settings):
+    for name, value in settings.items():
+        setattr(Config, name, value)
+    start = time.perf_counter()
+    chunks = sector_chunks(sector, center, radius)
+    coords_list = [tuple(c) for c in chunks.tolist()]
+
+    bodies, body_chunks, planets, planet_star, belts, belt_star = [], [], [], [], [], []
+    for i in range(0, len(coords_list), BATCH):
+        batch = coords_list[i:i + BATCH]
+        for coords, plan in zip(batch, chunk_plans(batch)):
+            for body in generate_chunk(coords, plan=plan).bodies:
+                if body.kind == STAR:
+                    for planet in generate_planets(body):
+                        planets.append(planet)
+                        planet_star.append(len(bodies))
+                    for belt in generate_belts(body):
+                        belts.append(belt)
+                        belt_star.append(len(bodies))
+                    # Only the counts are kept, not the records
+                    body.planets = body.belts = None
+                bodies.append(body)
+                body_chunks.append(coords)
+
+    body_kind = np.array([b.kind for b in bodies], dtype=np.uint8)
+    body_type = np.array([b.type_index for b in bodies], dtype=np.uint8)
+    planet_kind = np.array([p.kind for p in planets], dtype=np.uint8)
+    planet_type = np.array([p.type_index for p in planets], dtype=np.uint8)
+
+    if out and bodies:
+        columns = {
+            'body_kind': body_kind,
+            'body_type': body_type,
+            'body_chunk': np.array(body_chunks, dtype=np.int64).reshape(-1, 3),
+            'body_position': np.array([b.position for b in bodies], dtype=np.float64).reshape(-1, 3),
+            'body_size': np.array([b.size for b in bodies], dtype=np.float64),
+            'body_seed': np.array([b.seed for b in bodies], dtype=np.uint64),
+            'planet_star': np.array(planet_star, dtype=np.uint32),
+            'planet_kind': planet_kind,
+            'planet_type': planet_type,
+            'planet_seed': np.array([p.seed for p in planets], dtype=np.uint64),
+            'planet_size': np.array([p.size for p in planets], dtype=np.float64),
+            'planet_orbital_radius': np.array([p.orbital_radius for p in planets], dtype=np.float64),
+            'planet_orbital_speed': np.array([p.orbital_speed for p in planets], dtype=np.float64),
+            'planet_orbital_angle': np.array([p.orbital_angle for p in planets], dtype=np.float64),
+            'planet_rotation_speed': np.array([p.rotation_speed for p in planets], dtype=np.float64),
+            'planet_ring': np.array([p.ring for p in planets], dtype=bool),
+            'belt_star': np.array(belt_star, dtype=np.uint32),
+            'belt_type': np.array([b.type_index for b in belts], dtype=np.uint8),
+            'belt_seed': np.array([b.seed for b in belts], dtype=np.uint64),
+            'belt_inner_radius': np.array([b.inner_radius for b in belts], dtype=np.float64),
+            'belt_outer_radius': np.array([b.outer_radius for b in belts], dtype=np.float64),
+            'belt_thickness': np.array([b.thickness for b in belts], dtype=np.float64),
+            'belt_count': np.array([b.count for b in belts], dtype=np.uint32),
+        }
+        path = os.path.join(out, 'sector_{}_{}_{}.npz'.format(*sector))
+        (np.savez_compressed if compress else np.savez)(path, **columns)
+
+    stars = body_type[body_kind == STAR]
+    gas_giants = planet_kind == GAS_GIANT
+    return {
+        'sector': sector,
+        'occupied': len(coords_list),
+        'star_types': np.bincount(stars, minlength=len(STAR_TYPES)),
+        'planet_types': np.concatenate([
+            np.bincount(planet_type[~gas_giants], minlength=len(PLANET_TYPES)),
+            np.bincount(planet_type[gas_giants], minlength=len(GAS_GIANTS)),
+        ]),
+        'belt_types': np.bincount(np.array([b.type_index for b in belts], dtype=np.int64),
+                                  minlength=len(BELT_TYPES)),
+        'nebulae': int((body_kind == NEBULA).sum()),
+        'black_holes': int((body_kind == BLACK_HOLE).sum()),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+class Census:
+    def __init__(self):
+        self.sectors = 0
+        self.chunks = 0
+        self.occupied = 0
+        self.star_types = np.zeros(len(STAR_TYPES), dtype=np.int64)
+        self.planet_types = np.zeros(len(PLANET_NAMES), dtype=np.int64)
+        self.belt_types = np.zeros(len(BELT_TYPES), dtype=np.int64)
+        self.nebulae = 0
+        self.black_holes = 0
+        self.worker_seconds = 0.0
+
+    def add(self, result):
+        self.sectors += 1
+        self.occupied += result['occupied']
+        self.star_types += result['star_types']
+        self.planet_types += result['planet_types']
+        self.belt_types += result['belt_types']
+        self.nebulae += result['nebulae']
+        self.black_holes += result['black_holes']
+        self.worker_seconds += result['seconds']
+
+    def summary(self):
+        return {
+            'sectors': self.sectors,
+            'chunks': self.chunks,
+            'occupied_chunks': self.occupied,
+            'star_types': dict(zip([t['name'] for t in STAR_TYPES], self.star_types.tolist())),
+            'planet_types': dict(zip(PLANET_NAMES, self.planet_types.tolist())),
+            'belt_types': dict(zip([t['name'] for t in BELT_TYPES], self.belt_types.tolist())),
+            'nebulae': self.nebulae,
+            'black_holes': self.black_holes,
+        }
+
+    def report(self):
+        stars = int(self.star_types.sum())
+        planets = int(self.planet_types.sum())
+        per_1000 = 1000 / max(self.chunks, 1)
+        lines = [
+            f"Chunks     {self.chunks} in region | {self.occupied} occupied "
+            f"({self.occupied / max(self.chunks, 1):.1%}) | {self.sectors} sectors",
+            f"Stars      {stars} | {stars / max(self.occupied, 1):.2f} per occupied chunk",
+            "",
+            f"{'Star type':<14} {'count':>8} {'share':>7} {'expected':>9}",
+        ]
+        # Pearson's chi-square against the generator's probabilities
+        chi2 = 0.0
+        for props, count in zip(STAR_TYPES, self.star_types.tolist()):
+            expected = props['prob'] * stars
+            chi2 += (count - expected) ** 2 / expected if expected else 0.0
+            lines.append(f"{props['name']:<14} {count:>8} {count / max(stars, 1):>7.2%} {props['prob']:>9.2%}")
+        lines += [
+            f"chi-square {chi2:.2f} with {len(STAR_TYPES) - 1} degrees of freedom "
+            f"({'ok' if chi2 < 15.09 else 'off'} at p=0.01)",
+            "",
+            f"Planets    {planets} | {planets / max(stars, 1):.2f} per star",
+        ]
+        for name, count in zip(PLANET_NAMES, self.planet_types.tolist()):
+            lines.append(f"  {name:<14} {count:>8} {count / max(planets, 1):>7.2%}")
+        belts = int(self.belt_types.sum())
+        lines += [
+            f"Belts      {belts} | {belts / max(stars, 1):.1%} of stars",
+            f"Nebulae    {self.nebulae} | {self.nebulae * per_1000:.2f} per 1000 chunks",
+            f"Black holes {self.black_holes} | {self.black_holes * per_1000:.2f} per 1000 chunks"
+            + (f" | 1 per {self.chunks / self.black_holes:.0f} chunks" if self.black_holes else ""),
+        ]
+        return "\n".join(lines)
+
+
+def run(center, radius, workers, out=None, compress=False, progress=None):
+    sectors = region_sectors(center, radius)
+    census = Census()
+    census.chunks = region_size(radius)
+    settings = _settings()
+    if out:
+        os.makedirs(out, exist_ok=True)
+
+    if workers <= 1:
+        for sector in sectors:
+            census.add(census_sector(sector, center, radius, out, compress, settings))
+            if progress:
+                progress(census, len(sectors))
+        return census
+
+    # A few tasks in flight per worker, so results stream back in order of
+    # completion without queueing the whole region
+    with ProcessPoolExecutor(workers) as executor:
+        todo = iter(sectors)
+        running = set()
+        while True:
+            for sector in todo:
+                running.add(executor.submit(census_sector, sector, center, radius, out, compress, settings))
+                if len(running) >= workers * 2:
+                    break
+            if not running:
+                break
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                census.add(future.result())
+                if progress:
+                    progress(census, len(sectors))
+    return census
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a region offline and print its statistics')
+    parser.add_argument('--radius', type=int, default=32, help='chunks around the center')
+    parser.add_argument('--center', type=int, nargs=3, default=(0, 0, 0))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--out', help='directory for .npz shards and manifest.json')
+    parser.add_argument('--compress', action='store_true', help='compress the shards')
+    args = parser.parse_args()
+
+    def progress(census, total):
+        print(f"\r{census.sectors}/{total} sectors | {census.occupied} chunks", end='', file=sys.stderr)
+
+    start = time.perf_counter()
+    census = run(tuple(args.center), args.radius, args.workers, args.out, args.compress, progress)
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+
+    print(census.report())
+    print(f"\n{census.occupied} chunks in {elapsed:.1f} s with {args.workers} workers | "
+          f"{census.occupied / elapsed:.0f} chunks/s | {census.worker_seconds / elapsed:.2f} workers busy")
+
+    if args.out:
+        manifest = {
+            'signature': generator_signature(),
+            'center': list(args.center),
+            'radius': args.radius,
+            'layout': Config.UNIVERSE_LAYOUT,
+            'seconds': round(elapsed, 3),
+            'census': census.summary(),
+        }
+        with open(os.path.join(args.out, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        print(f"Shards written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
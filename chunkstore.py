@@ -0,0 +1,283 @@
+# Persistent on-disk chunk store.
+#
+# Generated chunk records are appended to two fixed-width binary files:
+#   bodies.bin - one BODY_DTYPE row per body
+#   index.bin  - one INDEX_DTYPE row per chunk: coords, first body row, count
+# Each file starts with a HEADER_SIZE byte header holding the magic, format
+# version and the generator signature: the seed scheme, GENERATOR_VERSION
+# and a hash of every generation setting.
+# A store written by a different signature is stale and is rejected.
+# Everything after the header is read through np.memmap, so lookups are
+# zero-copy views. Body flags are written in place, which lets later systems
+# persist mutations such as destroyed bodies.
+#
+# New chunks are buffered in memory and appended in batches, once
+# FLUSH_ROWS bodies are waiting and on close, so a put doesn't pay for a
+# write and a remap of both files. Buffered chunks can be read as usual.
+#
+# Planets are not stored. They are rebuilt from the star seed on demand.
+
+import os
+import struct
+import hashlib
+import argparse
+
+import numpy as np
+
+from config import Config
+from seeding import seed_scheme_version
+from generation import GENERATOR_VERSION, ChunkRecord, make_body, generate_chunks, generation_settings
+from galaxy import chunks_around
+
+MAGIC = b'UNIVCHNK'
+FORMAT_VERSION = 1
+HEADER_SIZE = 64
+HEADER = struct.Struct('<8sI48s')
+
+BODY_DTYPE = np.dtype([
+    ('kind', 'u1'),
+    ('type_index', 'u1'),
+    ('flags', 'u2'),
+    ('size', 'f8'),
+    ('seed', 'u8'),
+    ('position', 'f8', 3),
+])
+
+INDEX_DTYPE = np.dtype([
+    ('coords', 'i8', 3),
+    ('first', 'u8'),
+    ('count', 'u4'),
+    ('flags', 'u4'),
+])
+
+FLAG_DESTROYED = 1
+
+FLUSH_ROWS = 4096
+
+
+class ChunkStoreError(Exception):
+    pass
+
+
+def generator_signature():
+    # Fits the header: the settings are hashed rather than spelled out
+    settings = sorted(generation_settings().items())
+    digest = hashlib.sha1(repr(settings).encode()).hexdigest()[:16]
+    return f"{seed_scheme_version()}/g{GENERATOR_VERSION}/{Config.UNIVERSE_LAYOUT}/{digest}"
+
+
+class _Table:
+    def __init__(self, path, dtype, signature, writable):
+        self.path = path
+        self.dtype = dtype
+        self.writable = writable
+        self.rejected = False
+        self.created = False
+        self.view = None
+
+        if writable and not os.path.exists(path):
+            self._write_header(signature)
+            self.created = True
+
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+
+        if not self._header_ok(header, signature):
+            if not writable:
+                raise ChunkStoreError(f"{path} was written by another generator or format")
+            # Stale data is thrown away, not reused
+            self.rejected = True
+            self._write_header(signature)
+
+        self.file = open(path, 'r+b' if writable else 'rb')
+        self.remap()
+
+    def _header_ok(self, header, signature):
+        if len(header) < HEADER_SIZE:
+            return False
+        magic, version, stored = HEADER.unpack_from(header)
+        return (magic == MAGIC and version == FORMAT_VERSION
+                and stored.rstrip(b'\0').decode() == signature)
+
+    def _write_header(self, signature):
+        with open(self.path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, signature.encode()).ljust(HEADER_SIZE, b'\0'))
+
+    def rows(self):
+        # Trailing partial rows (an interrupted write) are ignored
+        return (os.path.getsize(self.path) - HEADER_SIZE) // self.dtype.itemsize
+
+    def remap(self):
+        count = self.rows()
+        if count == 0:
+            self.view = np.zeros(0, dtype=self.dtype)
+            return
+        self.view = np.memmap(self.path, dtype=self.dtype, offset=HEADER_SIZE,
+                              shape=(count,), mode='r+' if self.writable else 'r')
+
+    def append(self, rows):
+        start = HEADER_SIZE + len(self.view) * self.dtype.itemsize
+        self.file.seek(start)
+        self.file.truncate()
+        self.file.write(rows.tobytes())
+        self.file.flush()
+        self.remap()
+
+    def close(self):
+        if isinstance(self.view, np.memmap):
+            self.view.flush()
+        self.view = None
+        self.file.close()
+
+
+class ChunkStore:
+    def __init__(self, path, writable=True, flush_rows=FLUSH_ROWS):
+        self.path = path
+        self.flush_rows = flush_rows
+        self.signature = generator_signature()
+        if writable:
+            os.makedirs(path, exist_ok=True)
+
+        self.bodies = _Table(os.path.join(path, 'bodies.bin'), BODY_DTYPE,
+                             self.signature, writable)
+        self.index_table = _Table(os.path.join(path, 'index.bin'), INDEX_DTYPE,
+                                  self.signature, writable)
+
+        # The two files only make sense together: a rejected or missing
+        # half, or an index pointing past the bodies, throws both away
+        index = self.index_table.view
+        ends = index['first'] + index['count']
+        mismatched = (self.bodies.rejected != self.index_table.rejected
+                      or self.bodies.created != self.index_table.created
+                      or (len(index) and int(ends.max()) > len(self.bodies.view)))
+        if mismatched:
+            if not writable:
+                raise ChunkStoreError(f"{path} has an index and body table that don't match")
+            self.bodies._write_header(self.signature)
+            self.index_table._write_header(self.signature)
+            self.bodies.remap()
+            self.index_table.remap()
+        self.rejected = bool(mismatched) or self.bodies.rejected or self.index_table.rejected
+
+        self.index = {}
+        for row, coords in enumerate(self.index_table.view['coords'].tolist()):
+            self.index[tuple(coords)] = row
+
+        # coords -> body rows put since the last flush
+        self.pending = {}
+        self.pending_rows = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+
+    def __len__(self):
+        return len(self.index) + len(self.pending)
+
+    def __contains__(self, coords):
+        return coords in self.index or coords in self.pending
+
+    def rows(self, coords):
+        # Zero-copy structured view of a chunk's bodies, or None
+        if coords in self.pending:
+            return self.pending[coords]
+        row = self.index.get(coords)
+        if row is None:
+            return None
+        entry = self.index_table.view[row]
+        first = int(entry['first'])
+        return self.bodies.view[first:first + int(entry['count'])]
+
+    def get(self, coords):
+        rows = self.rows(coords)
+        if rows is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        record = ChunkRecord(coords)
+        for row in rows:
+            if row['flags'] & FLAG_DESTROYED:
+                continue
+            record.bodies.append(make_body(
+                int(row['kind']), int(row['type_index']),
+                tuple(row['position'].tolist()), float(row['size']), int(row['seed'])
+            ))
+        return record
+
+    def put(self, record):
+        if record.coords in self:
+            return
+
+        rows = np.zeros(len(record.bodies), dtype=BODY_DTYPE)
+        for i, body in enumerate(record.bodies):
+            rows[i] = (body.kind, body.type_index, 0, body.size, body.seed, body.position)
+
+        self.pending[record.coords] = rows
+        self.pending_rows += len(rows)
+        if self.pending_rows >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        # Appends every buffered chunk with one write per file
+        if not self.pending:
+            return
+        coords = list(self.pending)
+        counts = np.array([len(self.pending[c]) for c in coords], dtype=np.uint64)
+
+        entries = np.zeros(len(coords), dtype=INDEX_DTYPE)
+        entries['coords'] = coords
+        entries['first'] = len(self.bodies.view) + np.cumsum(counts) - counts
+        entries['count'] = counts
+        first = len(self.index_table.view)
+
+        # Bodies first, so a crash never leaves an index row without its bodies
+        self.bodies.append(np.concatenate([self.pending[c] for c in coords]))
+        self.index_table.append(entries)
+        for i, c in enumerate(coords):
+            self.index[c] = first + i
+
+        self.pending.clear()
+        self.pending_rows = 0
+        self.flushes += 1
+
+    def set_flags(self, coords, body_index, flags):
+        rows = self.rows(coords)
+        if rows is None:
+            raise KeyError(coords)
+        rows['flags'][body_index] |= flags
+
+    def close(self):
+        if self.bodies.writable:
+            self.flush()
+        self.bodies.close()
+        self.index_table.close()
+
+# ══════════════════════════════════════════════════════════════════
+# OFFLINE PRE-BAKING
+# ══════════════════════════════════════════════════════════════════
+
+def bake(store, coords_list, batch=256):
+    coords_list = [c for c in coords_list if c not in store]
+    for i in range(0, len(coords_list), batch):
+        for record in generate_chunks(coords_list[i:i + batch]):
+            store.put(record)
+    return len(coords_list)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pre-bake chunks into a chunk store')
+    parser.add_argument('path')
+    parser.add_argument('--radius', type=int, default=16, help='chunks around the center')
+    parser.add_argument('--center', type=int, nargs=3, default=(0, 0, 0))
+    args = parser.parse_args()
+
+    # Only occupied chunks; the game never asks for empty ones
+    coords = [tuple(c) for c in chunks_around(args.center, args.radius).tolist()]
+
+    store = ChunkStore(args.path)
+    if store.rejected:
+        print("Discarded a store written by a different generator")
+    added = bake(store, coords)
+    print(f"Baked {added} new chunks, {len(store)} total in {args.path}")
+    store.close()
@@ -0,0 +1,353 @@
+# Collision detection.
+#
+# Every solid loaded body is a sphere at its absolute position, kept in
+# dense slot arrays like gravity and LOD. The broad phase is a uniform grid
+# with cells at least as wide as the largest body: bodies are sorted by a
+# packed cell key, so each cell is a contiguous run found with
+# searchsorted, and two bodies can only touch if their cells are
+# neighbours. Every pair of neighbouring cells is visited once, so the cost
+# follows the number of loaded bodies and their local density. Orbiting
+# bodies move every step but rarely leave their cell, so the grid is only
+# rebuilt when a body is added or removed or one crosses into another cell.
+#
+# Keys pack KEY_BITS per axis, so cells are counted from the corner of the
+# loaded bodies' box rather than from the universe origin; a long flight
+# can't wrap them. Bodies spread too far apart for the key range get
+# coarser cells instead.
+#
+# Movers (the ship) are tested continuously. A sphere swept along a step's
+# segment hits a body at the first t in [0, 1] where the centres are the
+# sum of the radii apart. Discrete checks at 15000 units/s would jump 250
+# units per frame, straight past most planets.
+#
+# Contacts are reported as CollisionEvents when they start, not every frame
+# they last. Nebulae are gas and don't collide.
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from generation import STAR, BLACK_HOLE, PLANET, GAS_GIANT
+
+MIN_CELL = 64.0
+KEY_BITS = 21  # per axis, so keys fit in an int64
+KEY_OFFSET = 1 << (KEY_BITS - 1)
+MAX_CELLS = KEY_OFFSET - 2  # per axis from the corner, leaving room for neighbours
+
+# The cell itself and the 13 neighbours "after" it; the other 13 are
+# covered from their side
+HALF_NEIGHBOURS = np.array([(0, 0, 0)] + [
+    (x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)
+    if (x, y, z) > (0, 0, 0)
+], dtype=np.int64)
+
+# Collision radius per unit size. Bodies are unit-diameter meshes scaled
+# by size.
+RADII = {
+    STAR: 0.5,
+    BLACK_HOLE: 0.5,
+    PLANET: 0.5,
+    GAS_GIANT: 0.5,
+}
+
+
+def body_radius(kind, size):
+    return RADII.get(kind, 0.0) * size
+
+
+def _cell_keys(cells):
+    cells = cells + KEY_OFFSET
+    return (cells[..., 0] << (2 * KEY_BITS)) | (cells[..., 1] << KEY_BITS) | cells[..., 2]
+
+
+# Packing is linear while every axis stays in range, so a neighbour's key is
+# the cell's key plus a constant
+NEIGHBOUR_DELTAS = _cell_keys(HALF_NEIGHBOURS) - _cell_keys(np.zeros(3, dtype=np.int64))
+
+
+def _expand(first, counts):
+    # (i, j) for every j in first[i]:first[i] + counts[i]
+    owner = np.flatnonzero(counts > 0)
+    first, counts = first[owner], counts[owner]
+    total = int(counts.sum())
+    starts = np.repeat(first - (np.cumsum(counts) - counts), counts)
+    return np.repeat(owner, counts), starts + np.arange(total)
+
+
+@dataclass
+class CollisionEvent:
+    a: object
+    b: object
+    point: tuple  # absolute contact point
+    normal: tuple  # unit vector from b towards a
+    time: float = 0.0  # fraction of the sweep, 0 for overlaps
+    speed: float = 0.0  # closing speed along the normal, for sweeps
+
+
+class CollisionSystem:
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.objects = []
+        self.slots = {}
+        self.positions = np.zeros((capacity, 3))
+        self.radii = np.zeros(capacity)
+        self.kinds = np.zeros(capacity, dtype=np.int16)
+
+        self.cell_size = MIN_CELL
+        self.origin = np.zeros(3, dtype=np.int64)  # cell of the bodies' lowest corner
+        self.cells = np.zeros((0, 3), dtype=np.int64)  # in sorted order
+        self.order = np.zeros(0, dtype=np.int64)
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.slot_keys = np.zeros(0, dtype=np.int64)  # each slot's cell key
+        self.max_radius = 0.0
+        self.dirty = True
+
+        self.contacts = set()  # body pairs touching, as frozensets
+        self.touching = {}     # mover -> bodies it touched on its last sweep
+        self.events = []
+
+        self.updates = 0
+        self.rebuilds = 0
+        self.candidates = 0
+        self.sweeps = 0
+        self.hits = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, obj):
+        return obj in self.slots
+
+    def _grow(self):
+        capacity = len(self.radii) * 2
+        for name in ('positions', 'radii', 'kinds'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, obj, position, radius, kind):
+        if obj in self.slots:
+            self.remove(obj)
+        if radius <= 0:
+            return
+        if self.count == len(self.radii):
+            self._grow()
+
+        i = self.count
+        self.slots[obj] = i
+        self.objects.append(obj)
+        self.positions[i] = position
+        self.radii[i] = radius
+        self.kinds[i] = kind
+        self.count += 1
+        self.dirty = True
+
+    def remove(self, obj):
+        i = self.slots.pop(obj, None)
+        if i is None:
+            return
+
+        last = self.count - 1
+        # Swap-remove keeps the arrays dense
+        if i != last:
+            moved = self.objects[last]
+            self.objects[i] = moved
+            self.slots[moved] = i
+            for array in (self.positions, self.radii, self.kinds):
+                array[i] = array[last]
+
+        self.objects.pop()
+        self.count -= 1
+        self.dirty = True
+
+        self.contacts = {pair for pair in self.contacts if obj not in pair}
+        self.touching.pop(obj, None)
+        for bodies in self.touching.values():
+            bodies.discard(obj)
+
+    def sync(self, objects, positions):
+        # For moving bodies: copy fresh positions for the given objects
+        slots = [self.slots[obj] for obj in objects if obj in self.slots]
+        if len(slots) == len(positions):
+            self.positions[slots] = positions
+        else:
+            for obj, position in zip(objects, positions):
+                i = self.slots.get(obj)
+                if i is not None:
+                    self.positions[i] = position
+        if slots and not self.dirty:
+            cells = self._cells(self.positions[slots])
+            self.dirty = bool(((cells < 0) | (cells > MAX_CELLS)).any()
+                              or (_cell_keys(cells) != self.slot_keys[slots]).any())
+
+    # ──────────────────────────────────────────────────────────────
+    # Broad phase
+    # ──────────────────────────────────────────────────────────────
+
+    def _cells(self, positions):
+        return np.floor(positions / self.cell_size).astype(np.int64) - self.origin
+
+    def _sort(self):
+        if not self.dirty:
+            return
+        n = self.count
+        # From the bodies still loaded, so removing a large one shrinks it
+        self.max_radius = float(self.radii[:n].max()) if n else 0.0
+        self.cell_size = max(2 * self.max_radius, MIN_CELL)
+        if n:
+            lo = self.positions[:n].min(axis=0)
+            span = float((self.positions[:n].max(axis=0) - lo).max())
+            self.cell_size = max(self.cell_size, span / (MAX_CELLS - 1))
+            self.origin = np.floor(lo / self.cell_size).astype(np.int64)
+        cells = self._cells(self.positions[:n])
+        keys = _cell_keys(cells)
+        self.slot_keys = keys
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+        self.cells = cells[self.order]
+        # End of each body's cell run, so lookups need one search, not two
+        ends = np.r_[np.flatnonzero(self.keys[1:] != self.keys[:-1]) + 1, n]
+        self.run_end = np.repeat(ends, np.diff(np.r_[0, ends])) if n else np.zeros(0, dtype=np.int64)
+        self.dirty = False
+        self.rebuilds += 1
+
+    def pairs(self):
+        # Index pairs (a, b) of bodies whose spheres overlap
+        self._sort()
+        n = self.count
+        if n < 2:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        # One search per (body, neighbour cell), all offsets at once
+        keys = (self.keys[None] + NEIGHBOUR_DELTAS[:, None]).reshape(-1)
+        lo, hi = self._runs(keys)
+        lo[:n] = np.arange(1, n + 1)  # own cell: only the bodies after this one
+        owner, second = _expand(lo, np.maximum(hi - lo, 0))
+        first = owner % n
+        self.candidates += len(first)
+        a, b = self.order[first], self.order[second]
+
+        delta = self.positions[a] - self.positions[b]
+        reach = self.radii[a] + self.radii[b]
+        touching = (delta * delta).sum(axis=1) < reach * reach
+        return a[touching], b[touching]
+
+    def _nearby(self, lo, hi):
+        # Slots of bodies in cells overlapping the box lo..hi
+        if not self.count:
+            return np.zeros(0, dtype=np.int64)
+        # Cells past the bodies' box are empty, and beyond the key range
+        lo = np.maximum(self._cells(lo) - 1, -1)
+        hi = np.minimum(self._cells(hi) + 1, MAX_CELLS + 1)
+        if (hi < lo).any():
+            return np.zeros(0, dtype=np.int64)
+        span = hi - lo + 1
+        # Long sweeps test every body instead of the empty cells
+        if int(np.prod(span)) > self.count:
+            inside = np.all((self.cells >= lo) & (self.cells <= hi), axis=1)
+            return self.order[inside]
+
+        axes = [np.arange(l, h + 1) for l, h in zip(lo.tolist(), hi.tolist())]
+        cells = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+        keys = _cell_keys(cells)
+        first, last = self._runs(keys)
+        return self.order[_expand(first, last - first)[1]]
+
+    def _runs(self, keys):
+        # Sorted index range of the bodies in each cell key
+        first = np.searchsorted(self.keys, keys, side='left')
+        clipped = np.minimum(first, self.count - 1)
+        found = self.keys[clipped] == keys
+        return first, np.where(found, self.run_end[clipped], first)
+
+    def update(self):
+        # Body-body contacts, with an event for each that has just started
+        self.updates += 1
+        a, b = self.pairs()
+        contacts = set()
+        for i, j in zip(a.tolist(), b.tolist()):
+            pair = frozenset((self.objects[i], self.objects[j]))
+            contacts.add(pair)
+            if pair in self.contacts:
+                continue
+
+            normal = self.positions[i] - self.positions[j]
+            length = float(np.sqrt(normal @ normal))
+            normal = normal / length if length else np.array([0.0, 1.0, 0.0])
+            point = self.positions[j] + normal * self.radii[j]
+            self.events.append(CollisionEvent(self.objects[i], self.objects[j],
+                                              tuple(point.tolist()), tuple(normal.tolist())))
+        self.contacts = contacts
+
+    # ──────────────────────────────────────────────────────────────
+    # Continuous tests
+    # ──────────────────────────────────────────────────────────────
+
+    def sweep(self, mover, start, end, radius, dt=1.0):
+        # First body hit by a sphere moving from start to end (absolute
+        # positions) over dt seconds, as a CollisionEvent, or None.
+        # Touching a body only counts while moving into it, so a mover can
+        # always back away.
+        self.sweeps += 1
+        self._sort()
+        start = np.asarray(start, dtype=np.float64)
+        end = np.asarray(end, dtype=np.float64)
+
+        # Cells are as wide as the largest body, so a body touching the
+        # swept box has its centre in a cell next to it
+        index = self._nearby(np.minimum(start, end) - radius, np.maximum(start, end) + radius)
+        self.candidates += len(index)
+
+        hits = set()
+        event = None
+        if len(index):
+            centers = self.positions[index]
+            reach = self.radii[index] + radius
+            move = end - start
+            offset = start - centers
+
+            # |offset + t * move| = reach, solved for the earliest t
+            a = float(move @ move)
+            b = offset @ move
+            c = (offset * offset).sum(axis=1) - reach * reach
+            inside = (c <= 0) & (b < 0)
+            if a > 0:
+                disc = b * b - a * c
+                root = np.sqrt(np.maximum(disc, 0.0))
+                t = np.where(inside, 0.0, (-b - root) / a)
+                hit = inside | ((disc >= 0) & (b < 0) & (t >= 0) & (t <= 1))
+            else:
+                t = np.zeros(len(index))
+                hit = inside
+
+            found = np.flatnonzero(hit)
+            hits = {self.objects[i] for i in index[found].tolist()}
+            if len(found):
+                k = found[np.argmin(t[found])]
+                time_hit = float(t[k])
+                center = start + move * time_hit
+                normal = center - centers[k]
+                length = float(np.sqrt(normal @ normal))
+                normal = normal / length if length else -move / np.sqrt(a)
+                speed = float(-(move @ normal)) / dt
+                event = CollisionEvent(mover, self.objects[index[k]],
+                                       tuple((centers[k] + normal * self.radii[index[k]]).tolist()),
+                                       tuple(normal.tolist()), time_hit, speed)
+
+        # Only the first step of a contact is an event
+        touched = self.touching.get(mover, set())
+        if event is not None and event.b not in touched:
+            self.events.append(event)
+            self.hits += 1
+        self.touching[mover] = hits
+        return event
+
+    def drain(self):
+        events, self.events = self.events, []
+        return events
+
+    def report(self, name='Collision'):
+        per_update = self.candidates / max(self.updates + self.sweeps, 1)
+        return (f"{name:<10} bodies {self.count:>5} | contacts {len(self.contacts):>3} | "
+                f"sweeps {self.sweeps} hits {self.hits} | rebuilds {self.rebuilds} | "
+                f"{per_update:.1f} candidates/test")
@@ -0,0 +1,56 @@
+# ══════════════════════════════════════════════════════════════════
+# CONFIGURATION - OPTIMIZED
+# ══════════════════════════════════════════════════════════════════
+
+class Config:
+    WINDOW_TYPE = 'onscreen'  # 'offscreen' for headless runs (see bench.py)
+    CHUNK_SIZE = 4000
+    RENDER_DISTANCE = 2
+    UNLOAD_DISTANCE = 3  # chunks stay loaded until this far (hysteresis)
+    UNIVERSE_LAYOUT = 'galaxy'  # or 'flat': the old single layer of chunks, STARS_PER_CHUNK stars each
+    STARS_PER_CHUNK = 2  # exact in 'flat', the mean at the start chunk's density in 'galaxy'
+    MAX_STARS_PER_CHUNK = 12
+    SECTOR_SIZE = 16  # chunks per sector edge
+    PLANET_LOAD_DIST = 800
+    PLANET_UNLOAD_DIST = 1200
+    BELT_ROCKS = 3000  # mean rocks per asteroid belt
+    BELT_LOD_RATIOS = (0.01, 0.004, 0.0015)  # rock size/distance to the ring where belts thin out
+    BELT_DENSITY = (1.0, 0.4, 0.15, 0.05)  # share of rocks drawn at each level
+    CHUNK_WORKERS = 2  # 0 generates chunks inline on the main thread
+    CHUNK_WORKER_MODE = 'thread'  # or 'process'
+    CHUNK_BATCH = 4
+    CHUNK_BUDGET_MS = 4  # main-thread time for instantiating chunks per frame
+    CHUNK_CACHE_ENTRIES = 512
+    CHUNK_CACHE_BYTES = None  # optional memory cap, estimated
+    CHUNK_STORE_PATH = None  # directory for the persistent chunk store, e.g. 'chunkstore'
+    PREFETCH_SECONDS = 2.0  # how far ahead of the ship chunks are generated
+    PREFETCH_MIN_SPEED = 1000  # Warp and Hyper
+    PREFETCH_RADIUS = 2  # chunks either side of the path; RENDER_DISTANCE covers all it will enter
+    PREFETCH_MAX_CHUNKS = 128
+    PREFETCH_LEAD = 0.5  # seconds ahead of the ship that loading is centred on
+    CATALOG_RANGE = 400000  # how far catalog queries (G/B targeting) search
+    CATALOG_BATCH = 64  # chunks generated per step of a catalog search
+    CATALOG_SECTORS = 256  # sector summaries kept between queries
+    POOL_MAX_SIZE = 256  # parked entities kept per type
+    REANCHOR_DISTANCE = 50000  # float32-safe drift before world content is re-anchored
+    LOD_RATIOS = (0.08, 0.03, 0.01)  # size/distance where bodies drop to medium, low, impostor
+    LOD_HYSTERESIS = 0.15
+    BATCH_SETTLE_FRAMES = 10  # frames without LOD switches before a chunk is re-batched
+    BATCH_BUDGET_MS = 2
+    SIM_STEP = 1 / 60  # fixed simulation step in seconds, independent of the frame rate
+    SIM_MAX_STEPS = 8  # catch-up steps per frame before time is dropped
+    GRAVITY_THETA = 0.3  # Barnes-Hut opening angle, 0 = exact pairwise sum
+    GRAVITY_G = 1.0
+    GRAVITY_SOFTENING = 10.0  # keeps close passes finite
+    GRAVITY_REFIT_SLACK = 200  # orbiting bodies refit the octree until one drifts this far
+    SHIP_RADIUS = 3.0  # collision sphere around the ship
+    IMPACT_WARNING_SECONDS = 2.0
+    UNIVERSE_START_TIME = 0.0  # seconds since the epoch; later starts find more stars already dead
+    EVENT_NOTICE_DISTANCE = 5000  # stellar deaths closer than this are announced
+    WARP_STREAKS = 4000  # all in Hyper, a quarter in Warp
+    EXHAUST_PARTICLES = 400
+    PROFILER = True  # timing scopes cost ~2us each
+    PROFILER_EVENTS = 65536
+    PROFILER_FRAMES = 1024
+    BACKGROUND_STARS = 5000  # one mesh, so 100k+ is fine
+    SEED_SCHEME = 'mix64'  # 'md5', with UNIVERSE_LAYOUT = 'flat', reproduces universes from older versions
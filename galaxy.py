@@ -0,0 +1,220 @@
+# Galaxy-scale layout.
+#
+# Generation is hierarchical: galaxy -> sector -> chunk. The galaxy is a
+# smooth density field (a bulge, an exponential disk and logarithmic spiral
+# arms) cut by voids. Space is split into sectors of SECTOR_SIZE^3 chunks;
+# each sector gets a cheap upper bound of the field, so sectors that can't
+# hold anything are rejected without looking at their chunks. Inside live
+# sectors a chunk's density sets its star count and its odds of holding a
+# nebula or black hole.
+#
+# Contents come from hashes of the chunk coordinates, vectorized over whole
+# batches, so callers know which chunks are empty before generating any of
+# them. All coordinates here are chunk coordinates, density is 1 at the
+# starting chunk.
+
+import numpy as np
+
+from config import Config
+from seeding import SALT_CONTENTS, SALT_VOID, uniforms
+
+CENTER = np.array([-120.0, 0.0, 0.0])  # the start sits on an arm 120 chunks out
+START_RADIUS = 120.0
+RADIUS = 300.0  # disk edge, fading out over EDGE_WIDTH
+EDGE_WIDTH = 30.0
+DISK_SCALE = 60.0  # exponential disk scale length
+DISK_HEIGHT = 1.5
+CORE_RADIUS = 12.0
+CORE_DENSITY = 8.0  # relative to the disk at the start radius
+ARMS = 2
+ARM_PITCH = np.radians(14)
+ARM_FLOOR = 0.15  # inter-arm density, relative to an arm's crest
+ARM_POWER = 4  # higher is narrower arms
+VOID_LOW, VOID_HIGH = 0.15, 0.3  # sector-corner noise below VOID_LOW is empty
+START_CLEARING = 24.0  # no voids this close to the start chunk
+
+MIN_DENSITY = 1e-3  # sectors bounded below this are empty
+NEBULA_CHANCE = 0.08  # per chunk at density 1
+BLACK_HOLE_CHANCE = 0.03
+
+# ══════════════════════════════════════════════════════════════════
+# DENSITY FIELD
+# ══════════════════════════════════════════════════════════════════
+
+def _smoothstep(lo, hi, x):
+    t = np.clip((x - lo) / (hi - lo), 0.0, 1.0)
+    return t * t * (3 - 2 * t)
+
+
+def _disk(r, h):
+    disk = np.exp(-(r - START_RADIUS) / DISK_SCALE) * np.exp(-h / DISK_HEIGHT)
+    core = CORE_DENSITY * np.exp(-(r * r + (h * 3) ** 2) / (2 * CORE_RADIUS ** 2))
+    edge = 1 - _smoothstep(RADIUS, RADIUS + EDGE_WIDTH, r)
+    return disk, core, edge
+
+
+def _arms(x, z, r):
+    # Logarithmic spiral, phase 0 (a crest) at the start chunk
+    angle = np.arctan2(z, x)
+    phase = ARMS * (angle - np.log(np.maximum(r, 1.0) / START_RADIUS) / np.tan(ARM_PITCH))
+    return ARM_FLOOR + (1 - ARM_FLOOR) * ((1 + np.cos(phase)) / 2) ** ARM_POWER
+
+
+CORNER_OFFSETS = np.array([(x, y, z) for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=np.int64)
+
+
+def _void_corners(sectors):
+    # Noise at the 8 corners of each sector, (N, 8)
+    sectors = np.asarray(sectors, dtype=np.int64).reshape(-1, 3)
+    corners = sectors[:, None, :] + CORNER_OFFSETS[None]
+    return uniforms(corners.reshape(-1, 3), SALT_VOID).reshape(-1, 8)
+
+
+def _clearing(dist):
+    # Noise floor that keeps the start region out of voids
+    return 1 - _smoothstep(START_CLEARING / 2, START_CLEARING, dist)
+
+
+def _voids(coords):
+    # Trilinear noise across each sector, smoothed into a 0..1 factor
+    size = Config.SECTOR_SIZE
+    sectors = np.floor_divide(coords, size)
+    t = (coords - sectors * size + 0.5) / size
+    c = _void_corners(sectors)
+    tx, ty, tz = t[:, 0], t[:, 1], t[:, 2]
+    noise = 0.0
+    for i, (ox, oy, oz) in enumerate(CORNER_OFFSETS):
+        noise = noise + c[:, i] * np.where(ox, tx, 1 - tx) * np.where(oy, ty, 1 - ty) * np.where(oz, tz, 1 - tz)
+    noise = np.maximum(noise, _clearing(np.sqrt((coords.astype(np.float64) ** 2).sum(axis=1))))
+    return _smoothstep(VOID_LOW, VOID_HIGH, noise)
+
+
+def _raw_density(coords):
+    p = np.asarray(coords, dtype=np.float64).reshape(-1, 3) + 0.5 - CENTER
+    r = np.hypot(p[:, 0], p[:, 2])
+    h = np.abs(p[:, 1])
+    disk, core, edge = _disk(r, h)
+    return (disk * _arms(p[:, 0], p[:, 2], r) + core) * edge
+
+
+_START_SCALE = 1 / float(_raw_density([(0, 0, 0)])[0])
+
+
+def density(coords):
+    # Stars per chunk relative to the start chunk, at chunk centres
+    coords = np.asarray(coords, dtype=np.int64).reshape(-1, 3)
+    return _raw_density(coords) * _START_SCALE * _voids(coords)
+
+# ══════════════════════════════════════════════════════════════════
+# SECTORS
+# ══════════════════════════════════════════════════════════════════
+
+def _interval_min(lo, hi):
+    # Smallest |v| for v in [lo, hi]
+    return np.where((lo <= 0) & (hi >= 0), 0.0, np.minimum(np.abs(lo), np.abs(hi)))
+
+
+def sector_bounds(sectors):
+    # Upper bound of density() over every chunk in each sector. The disk,
+    # core and edge terms shrink with distance from the centre and the
+    # plane, arms are at most 1, and trilinear noise never exceeds its
+    # largest corner.
+    sectors = np.asarray(sectors, dtype=np.int64).reshape(-1, 3)
+    size = Config.SECTOR_SIZE
+    lo = sectors * size + 0.5 - CENTER
+    hi = lo + size - 1
+
+    dx = _interval_min(lo[:, 0], hi[:, 0])
+    dz = _interval_min(lo[:, 2], hi[:, 2])
+    r = np.hypot(dx, dz)
+    h = _interval_min(lo[:, 1], hi[:, 1])
+    disk, core, edge = _disk(r, h)
+
+    start = np.sqrt(sum(_interval_min(lo[:, i] + CENTER[i] - 0.5, hi[:, i] + CENTER[i] - 0.5) ** 2
+                        for i in range(3)))
+    noise = np.maximum(_void_corners(sectors).max(axis=1), _clearing(start))
+    voids = _smoothstep(VOID_LOW, VOID_HIGH, noise)
+    return (disk + core) * edge * _START_SCALE * voids
+
+
+def live_sectors(sectors):
+    return sector_bounds(sectors) >= MIN_DENSITY
+
+# ══════════════════════════════════════════════════════════════════
+# CHUNK CONTENTS
+# ══════════════════════════════════════════════════════════════════
+
+def _poisson(lam, u, cap):
+    # Inverse-CDF Poisson draw for each (lam, u), at most cap
+    count = np.zeros(len(lam), dtype=np.int64)
+    term = np.exp(-lam)
+    cdf = term.copy()
+    for k in range(1, cap + 1):
+        more = u >= cdf
+        if not more.any():
+            break
+        count += more
+        term = term * lam / k
+        cdf = cdf + term
+    return count
+
+
+def chunk_contents(coords):
+    # (stars, nebula, black_hole) per chunk. Dead sectors are skipped
+    # wholesale; only chunks in live ones are evaluated.
+    coords = np.asarray(coords, dtype=np.int64).reshape(-1, 3)
+    n = len(coords)
+    stars = np.zeros(n, dtype=np.int64)
+    nebula = np.zeros(n, dtype=bool)
+    black_hole = np.zeros(n, dtype=bool)
+    if not n:
+        return stars, nebula, black_hole
+
+    sectors, owner = np.unique(np.floor_divide(coords, Config.SECTOR_SIZE), axis=0, return_inverse=True)
+    live = np.flatnonzero(live_sectors(sectors)[owner.reshape(-1)])
+    if not len(live):
+        return stars, nebula, black_hole
+
+    dens = density(coords[live])
+    rolls = uniforms(coords[live], SALT_CONTENTS, np.arange(3))
+    stars[live] = _poisson(dens * Config.STARS_PER_CHUNK, rolls[:, 0], Config.MAX_STARS_PER_CHUNK)
+    nebula[live] = rolls[:, 1] < NEBULA_CHANCE * np.minimum(dens, 1.5)
+    black_hole[live] = rolls[:, 2] < BLACK_HOLE_CHANCE * np.minimum(dens, 4.0)
+    return stars, nebula, black_hole
+
+
+def occupied(coords):
+    # The flat layout fills every chunk of its single layer
+    if Config.UNIVERSE_LAYOUT == 'flat':
+        return np.asarray(coords, dtype=np.int64).reshape(-1, 3)[:, 1] == 0
+    stars, nebula, black_hole = chunk_contents(coords)
+    return (stars > 0) | nebula | black_hole
+
+# ══════════════════════════════════════════════════════════════════
+# STREAMING SHAPES
+# ══════════════════════════════════════════════════════════════════
+
+_OFFSETS = {}
+
+
+def sphere_offsets(radius):
+    # Integer offsets within a sphere of `radius` chunks, nearest first
+    offsets = _OFFSETS.get(radius)
+    if offsets is None:
+        r = int(radius)
+        axis = np.arange(-r, r + 1)
+        offsets = np.stack(np.meshgrid(axis, axis, axis, indexing='ij'), axis=-1).reshape(-1, 3)
+        dist2 = (offsets ** 2).sum(axis=1)
+        keep = np.flatnonzero(dist2 <= radius * radius)
+        offsets = _OFFSETS[radius] = offsets[keep[np.argsort(dist2[keep], kind='stable')]]
+    return offsets
+
+
+def chunks_around(center, radius):
+    # Occupied chunks within `radius` of a chunk, nearest first. The flat
+    # layout streams a disc of its single layer, where every chunk is full.
+    offsets = sphere_offsets(radius)
+    if Config.UNIVERSE_LAYOUT == 'flat':
+        return offsets[offsets[:, 1] == 0] + (center[0], 0, center[2])
+    coords = offsets + np.asarray(center, dtype=np.int64)
+    return coords[occupied(coords)]
@@ -0,0 +1,364 @@
+# Pure-data procedural generation. Nothing in here touches Ursina, so chunks
+# can be generated, tested and timed without opening a window. The entity
+# classes in main.py are thin views over the records produced here.
+
+import math
+import random
+from dataclasses import dataclass, field
+
+from config import Config
+from seeding import chunk_seeds, star_seeds
+from galaxy import chunk_contents
+
+# ══════════════════════════════════════════════════════════════════
+# OBJECT KINDS
+# ══════════════════════════════════════════════════════════════════
+
+STAR = 0
+NEBULA = 1
+BLACK_HOLE = 2
+PLANET = 3
+GAS_GIANT = 4
+
+KIND_NAMES = ['Star', 'Nebula', 'Black Hole', 'Planet', 'Gas Giant']
+
+# ══════════════════════════════════════════════════════════════════
+# STAR TYPES
+# ══════════════════════════════════════════════════════════════════
+
+STAR_TYPES = [
+    {'size': (200, 350), 'prob': 0.03, 'name': 'Blue Giant'},
+    {'size': (150, 250), 'prob': 0.05, 'name': 'Blue-White'},
+    {'size': (100, 180), 'prob': 0.10, 'name': 'White Star'},
+    {'size': (80, 140), 'prob': 0.15, 'name': 'Yellow Dwarf'},
+    {'size': (60, 110), 'prob': 0.25, 'name': 'Orange Dwarf'},
+    {'size': (40, 90), 'prob': 0.42, 'name': 'Red Dwarf'},
+]
+
+def get_star_type(rng):
+    roll = rng.random()
+    cumulative = 0
+    for i, props in enumerate(STAR_TYPES):
+        cumulative += props['prob']
+        if roll < cumulative:
+            return i
+    return len(STAR_TYPES) - 1
+
+# ══════════════════════════════════════════════════════════════════
+# PLANET TYPES
+# ══════════════════════════════════════════════════════════════════
+
+PLANET_TYPES = [
+    {'name': 'Molten', 'size': (8, 15)},
+    {'name': 'Desert', 'size': (10, 20)},
+    {'name': 'Ocean', 'size': (12, 25)},
+    {'name': 'Forest', 'size': (12, 22)},
+    {'name': 'Ice', 'size': (10, 20)},
+    {'name': 'Frozen', 'size': (10, 18)},
+    {'name': 'Exotic', 'size': (8, 18)},
+    {'name': 'Crystal', 'size': (8, 16)},
+    {'name': 'Rocky', 'size': (6, 14)},
+    {'name': 'Barren', 'size': (8, 16)},
+    {'name': 'Toxic', 'size': (10, 18)},
+    {'name': 'Sulfur', 'size': (8, 15)},
+]
+
+GAS_GIANTS = [
+    {'name': 'Gas Giant', 'size': (35, 60)},
+    {'name': 'Yellow Giant', 'size': (40, 65)},
+    {'name': 'Ice Giant', 'size': (30, 50)},
+    {'name': 'Blue Giant', 'size': (32, 55)},
+]
+
+NEBULA_COLOR_COUNT = 5
+
+# ══════════════════════════════════════════════════════════════════
+# ASTEROID BELT TYPES
+# ══════════════════════════════════════════════════════════════════
+
+BELT_TYPES = [
+    {'name': 'Rocky Belt', 'rock_size': (0.6, 2.5)},
+    {'name': 'Icy Belt', 'rock_size': (0.5, 2.0)},
+    {'name': 'Metallic Belt', 'rock_size': (0.4, 1.6)},
+]
+
+BELT_CHANCE = 0.35
+BELT_SEED_OFFSET = 7919  # belts roll from their own rng, planets are unchanged
+
+# ══════════════════════════════════════════════════════════════════
+# STELLAR LIFETIMES
+# Seconds of universe time, per star type. Every star is somewhere in
+# its life at the epoch, so each dies at a seeded point within one
+# lifetime. The massive types end as supernovae, leaving a black hole in
+# a remnant nebula; the rest shed a planetary nebula.
+# ══════════════════════════════════════════════════════════════════
+
+HOUR = 3600
+
+STAR_LIFETIMES = [2 * HOUR, 12 * HOUR, 100 * HOUR, 1000 * HOUR, 5000 * HOUR, 50000 * HOUR]
+SUPERNOVA_TYPES = (0, 1)
+FATE_SEED_OFFSET = 104729
+
+SUPERNOVA = 0
+STAR_DEATH = 1
+
+EVENT_NAMES = ['Supernova', 'Star death']
+
+# Bump whenever generated content changes for the same seeds, so persisted
+# chunk data from older generators is rejected
+GENERATOR_VERSION = 2
+
+# Every Config value a chunk's bodies depend on
+GENERATION_SETTINGS = (
+    'SEED_SCHEME', 'UNIVERSE_LAYOUT', 'CHUNK_SIZE', 'SECTOR_SIZE', 'STARS_PER_CHUNK', 'MAX_STARS_PER_CHUNK',
+)
+
+
+def generation_settings():
+    return {name: getattr(Config, name) for name in GENERATION_SETTINGS}
+
+# ══════════════════════════════════════════════════════════════════
+# RECORDS
+# ══════════════════════════════════════════════════════════════════
+
+@dataclass
+class PlanetRecord:
+    kind: int
+    type_index: int
+    type_name: str
+    seed: int
+    size: float
+    orbital_radius: float
+    orbital_speed: float
+    orbital_angle: float
+    rotation_speed: float
+    ring: bool
+
+
+@dataclass
+class BodyRecord:
+    kind: int
+    type_index: int
+    type_name: str
+    name: str
+    position: tuple
+    size: float
+    seed: int
+    planets: list = None  # filled lazily by generate_planets (stars only)
+    belts: list = None    # and generate_belts
+
+
+@dataclass
+class BeltRecord:
+    type_index: int
+    type_name: str
+    seed: int
+    inner_radius: float
+    outer_radius: float
+    thickness: float
+    count: int
+    rock_size: tuple
+    orbital_speed: float  # at radius 100, falling off like the planets'
+
+
+@dataclass
+class ChunkRecord:
+    coords: tuple
+    bodies: list = field(default_factory=list)
+
+# ══════════════════════════════════════════════════════════════════
+# GENERATORS
+# ══════════════════════════════════════════════════════════════════
+
+def make_body(kind, type_index, position, size, seed):
+    # Names are derived from kind, type and seed, so a body can be rebuilt
+    # from just these fields
+    if kind == STAR:
+        return BodyRecord(kind, type_index, STAR_TYPES[type_index]['name'],
+                          f"Star-{seed % 9999}", position, size, seed)
+    if kind == NEBULA:
+        return BodyRecord(kind, type_index, "Nebula", f"Nebula-{seed % 999}",
+                          position, size, seed)
+    return BodyRecord(kind, type_index, "Black Hole", f"BlackHole-{seed % 999}",
+                      position, size, seed)
+
+
+def generate_star(position, seed):
+    rng = random.Random(seed)
+    type_index = get_star_type(rng)
+    size = rng.uniform(*STAR_TYPES[type_index]['size'])
+    return make_body(STAR, type_index, position, size, seed)
+
+
+def generate_planet(orbital_radius, seed, gas_giant=False):
+    rng = random.Random(seed)
+
+    if gas_giant:
+        table, speed_k, spin = GAS_GIANTS, 0.2, (30, 60)
+    else:
+        table, speed_k, spin = PLANET_TYPES, 0.3, (20, 50)
+
+    type_index = rng.choice(range(len(table)))
+    props = table[type_index]
+    size = rng.uniform(*props['size'])
+
+    orbital_speed = speed_k / math.sqrt(orbital_radius / 100)
+    orbital_angle = rng.uniform(0, math.pi * 2)
+    rotation_speed = rng.uniform(*spin)
+
+    # Rings: common on gas giants, rare on large rocky planets
+    if gas_giant:
+        ring = rng.random() > 0.4
+    else:
+        ring = size > 20 and rng.random() > 0.7
+
+    return PlanetRecord(GAS_GIANT if gas_giant else PLANET, type_index, props['name'],
+                        seed, size, orbital_radius, orbital_speed, orbital_angle,
+                        rotation_speed, ring)
+
+
+def generate_planets(star):
+    if star.planets is not None:
+        return star.planets
+
+    # Replay the star's own rolls so the planet system is the same every load
+    rng = random.Random(star.seed)
+    get_star_type(rng)
+    rng.random()
+
+    planets = []
+    num_planets = rng.randint(2, 6)
+
+    for i in range(num_planets):
+        orbital_radius = star.size * 3 + 200 + i * 150
+
+        # Gas giant chance
+        gas_giant = i >= num_planets - 2 and rng.random() > 0.5
+        planets.append(generate_planet(orbital_radius, star.seed + i + 1000, gas_giant))
+
+    star.planets = planets
+    return planets
+
+
+def generate_belts(star):
+    if star.belts is not None:
+        return star.belts
+
+    planets = generate_planets(star)
+    rng = random.Random(star.seed + BELT_SEED_OFFSET)
+    belts = []
+    if rng.random() < BELT_CHANCE:
+        # In the gap inside one of the planet orbits, or just past the last
+        gap = rng.randint(1, len(planets))
+        center = star.size * 3 + 200 + (gap - 0.5) * 150
+        half_width = rng.uniform(20, 40) if gap < len(planets) else rng.uniform(30, 60)
+        type_index = rng.randrange(len(BELT_TYPES))
+        props = BELT_TYPES[type_index]
+        count = int(Config.BELT_ROCKS * rng.uniform(0.5, 1.5))
+        belts.append(BeltRecord(type_index, props['name'], rng.getrandbits(32),
+                                center - half_width, center + half_width, rng.uniform(4, 14),
+                                count, props['rock_size'], rng.uniform(0.25, 0.35)))
+
+    star.belts = belts
+    return belts
+
+
+def star_fate(star):
+    # (universe time of death, SUPERNOVA or STAR_DEATH)
+    rng = random.Random(star.seed + FATE_SEED_OFFSET)
+    death = STAR_LIFETIMES[star.type_index] * rng.random()
+    return death, SUPERNOVA if star.type_index in SUPERNOVA_TYPES else STAR_DEATH
+
+
+def star_remnants(star):
+    # What a star leaves behind, in place of the star and its planets
+    rng = random.Random(star.seed + FATE_SEED_OFFSET + 1)
+    color_index = rng.randrange(NEBULA_COLOR_COUNT)
+    if star.type_index in SUPERNOVA_TYPES:
+        return [
+            make_body(BLACK_HOLE, 0, star.position, rng.uniform(8, 20) * 4, star.seed + 20000),
+            make_body(NEBULA, color_index, star.position, star.size * rng.uniform(1.5, 2.5),
+                      star.seed + 10000),
+        ]
+    return [make_body(NEBULA, color_index, star.position, star.size * rng.uniform(1.5, 3),
+                      star.seed + 10000)]
+
+
+def chunk_plans(coords_list):
+    # (chunk seed, star seeds, nebula, black hole) per chunk, all seeds from
+    # one vectorized call. In the flat layout every chunk has STARS_PER_CHUNK
+    # stars and the chunk's rng rolls for the rare bodies (None here); the
+    # galaxy layout decides all of it up front from the density field.
+    coords_list = list(coords_list)
+    if not coords_list:
+        return []
+    seeds = chunk_seeds(coords_list).tolist()
+
+    if Config.UNIVERSE_LAYOUT == 'flat':
+        body_seeds = star_seeds(coords_list, Config.STARS_PER_CHUNK).tolist()
+        return [(seed, stars, None, None) for seed, stars in zip(seeds, body_seeds)]
+
+    counts, nebulae, black_holes = chunk_contents(coords_list)
+    body_seeds = star_seeds(coords_list, int(counts.max())).tolist()
+    return [(seed, stars[:count], nebula, black_hole) for seed, stars, count, nebula, black_hole
+            in zip(seeds, body_seeds, counts.tolist(), nebulae.tolist(), black_holes.tolist())]
+
+
+def generate_chunk(coords, with_planets=False, plan=None):
+    cx, cy, cz = coords
+    size = Config.CHUNK_SIZE
+
+    seed, body_seeds, nebula, black_hole = plan or chunk_plans([coords])[0]
+    flat = nebula is None
+
+    rng = random.Random(seed)
+    chunk = ChunkRecord(coords)
+
+    # Stars. The flat layout keeps them near its single layer.
+    star_y = (-100, 100) if flat else (200, size - 200)
+    for body_seed in body_seeds:
+        star_rng = random.Random(body_seed)
+
+        pos = (
+            cx * size + star_rng.uniform(200, size - 200),
+            cy * size + star_rng.uniform(*star_y),
+            cz * size + star_rng.uniform(200, size - 200)
+        )
+        star = generate_star(pos, body_seed)
+        if with_planets:
+            generate_planets(star)
+        chunk.bodies.append(star)
+
+    # Rare nebula
+    if flat:
+        nebula = rng.random() < 0.08
+    if nebula:
+        pos = (
+            cx * size + rng.uniform(0, size),
+            cy * size + (rng.uniform(-200, 200) if flat else rng.uniform(0, size)),
+            cz * size + rng.uniform(0, size)
+        )
+        nebula_size = rng.uniform(150, 350)
+        nebula_seed = seed + 10000
+        color_index = random.Random(nebula_seed).choice(range(NEBULA_COLOR_COUNT))
+        chunk.bodies.append(make_body(NEBULA, color_index, pos, nebula_size, nebula_seed))
+
+    # Rare black hole
+    if flat:
+        black_hole = rng.random() < 0.03
+    if black_hole:
+        pos = (
+            cx * size + rng.uniform(0, size),
+            cy * size + (rng.uniform(-50, 50) if flat else rng.uniform(0, size)),
+            cz * size + rng.uniform(0, size)
+        )
+        mass = rng.uniform(8, 20)
+        chunk.bodies.append(make_body(BLACK_HOLE, 0, pos, mass * 4, seed + 20000))
+
+    return chunk
+
+
+def generate_chunks(coords_list, with_planets=False):
+    coords_list = list(coords_list)
+    return [generate_chunk(coords, with_planets, plan)
+            for coords, plan in zip(coords_list, chunk_plans(coords_list))]
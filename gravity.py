@@ -0,0 +1,313 @@
+# Barnes-Hut gravity.
+#
+# Every loaded mass (stars, black holes, planets, gas giants) is registered
+# with its absolute position, in dense slot arrays like the LOD system. The
+# octree is rebuilt from those arrays whenever they change: bodies are sorted
+# by Morton code, so each octree node is a contiguous run of bodies and a
+# whole level is built with a few reductions. Mass, centre of mass and the
+# radius of its bodies around that centre are kept per node.
+#
+# Queries walk the tree for many points at once. A node whose radius/distance
+# is below the opening angle `theta` acts as a single point mass at its
+# centre of mass; otherwise its children are visited. Each query point then
+# touches O(log n) nodes instead of all n bodies. theta=0 gives the exact
+# pairwise sum.
+
+import time
+
+import numpy as np
+
+from generation import STAR, BLACK_HOLE, PLANET, GAS_GIANT
+
+# Mass per unit size^3. The smallest black hole (size 32) outweighs the
+# largest star (350): 10 * 32^3 = 328k against 0.005 * 350^3 = 214k. At
+# G = 1 surface pull is 4 * density * size, 7 u/s^2 for a Blue Giant and
+# at most 10 for planets, so the ship's gravity drift stays below its Slow
+# speed; near a black hole it reaches hundreds. Nebulae have no mass.
+DENSITIES = {
+    STAR: 0.005,
+    BLACK_HOLE: 10.0,
+    PLANET: 0.1,
+    GAS_GIANT: 0.04,
+}
+
+MAX_DEPTH = 16  # Morton bits per axis
+
+
+def body_mass(kind, size):
+    return DENSITIES.get(kind, 0.0) * size ** 3
+
+
+def _spread_bits(v):
+    # 16 bits -> every third bit of a 48-bit code
+    v = v.astype(np.uint64) & np.uint64(0xFFFF)
+    v = (v | (v << np.uint64(32))) & np.uint64(0x1F00000000FFFF)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x1F0000FF0000FF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x100F00F00F00F00F)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x10C30C30C30C30C3)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return v
+
+
+def morton_codes(cells):
+    return (_spread_bits(cells[:, 0]) | (_spread_bits(cells[:, 1]) << np.uint64(1))
+            | (_spread_bits(cells[:, 2]) << np.uint64(2)))
+
+
+class Octree:
+    # Flat node arrays, level by level from the root (node 0). Children of a
+    # node are the contiguous range child_first:child_first + child_count,
+    # one stored level down.
+    def __init__(self, positions, masses, max_depth=MAX_DEPTH):
+        n = len(masses)
+        lo = positions.min(axis=0)
+        span = max(float((positions.max(axis=0) - lo).max()), 1e-6) * (1 + 1e-9)
+        cells = np.floor((positions - lo) / span * (1 << max_depth)).astype(np.int64)
+        codes = morton_codes(np.clip(cells, 0, (1 << max_depth) - 1))
+
+        order = np.argsort(codes, kind='stable')
+        codes = codes[order]
+        pos = positions[order]
+        mass = masses[order]
+        # Relative to the box corner, so sums stay precise far from the origin
+        weighted = (pos - lo) * mass[:, None]
+
+        # Bodies leave the active set once their node holds only them, so
+        # deep levels only cost as much as the clusters that still need
+        # splitting. Levels that split nothing would repeat their parents
+        # and are skipped.
+        active = np.arange(n)
+        sub_codes, sub_pos, sub_mass, sub_weighted = codes, pos - lo, mass, weighted
+        parents = 0
+        starts, counts, node_mass, node_com, node_radius = [], [], [], [], []
+        for depth in range(max_depth + 1):
+            prefix = sub_codes >> np.uint64(3 * (max_depth - depth))
+            local = np.flatnonzero(np.r_[True, prefix[1:] != prefix[:-1]])
+            if len(local) == parents:
+                continue
+
+            count = np.diff(np.r_[local, len(active)])
+            m = np.add.reduceat(sub_mass, local)
+            com = np.add.reduceat(sub_weighted, local, axis=0) / np.maximum(m, 1e-300)[:, None]
+
+            # Radius of the bodies around the centre of mass, for the
+            # opening test
+            owner = np.repeat(np.arange(len(local)), count)
+            dist = np.sqrt(((sub_pos - com[owner]) ** 2).sum(axis=1))
+
+            starts.append(active[local])
+            counts.append(count)
+            node_mass.append(m)
+            node_com.append(com)
+            node_radius.append(np.maximum.reduceat(dist, local))
+
+            split = count > 1
+            parents = int(split.sum())
+            if not parents:
+                break
+            if parents < len(local):
+                keep = np.repeat(split, count)
+                active = active[keep]
+                sub_codes, sub_pos = sub_codes[keep], sub_pos[keep]
+                sub_mass, sub_weighted = sub_mass[keep], sub_weighted[keep]
+
+        self.depth = len(starts) - 1
+        self.starts = np.concatenate(starts)
+        self.counts = np.concatenate(counts)
+        self.mass = np.concatenate(node_mass)
+        self.com = np.concatenate(node_com) + lo
+        self.radius = self.base_radius = np.concatenate(node_radius)
+
+        self.lo = lo
+        self.order = order
+        self.body_mass = mass
+        self.built_positions = pos
+        self.drift = 0.0
+
+        # A node's bodies are one contiguous run in Morton order, so its
+        # children are the next level's nodes starting inside that run
+        firsts = np.cumsum([0] + [len(s) for s in starts])
+        self.child_first = np.zeros(len(self.mass), dtype=np.int64)
+        self.child_count = np.zeros(len(self.mass), dtype=np.int64)
+        for d in range(self.depth):
+            first = np.searchsorted(starts[d + 1], starts[d])
+            last = np.searchsorted(starts[d + 1], starts[d] + counts[d])
+            self.child_first[firsts[d]:firsts[d + 1]] = first + firsts[d + 1]
+            self.child_count[firsts[d]:firsts[d + 1]] = last - first
+
+        # Single bodies and coincident bodies at the bottom are points
+        self.leaf = self.child_count == 0
+
+    def __len__(self):
+        return len(self.mass)
+
+    def refit(self, positions):
+        # Same bodies at new positions: the structure and masses stay, the
+        # centres of mass are recomputed from prefix sums over each node's
+        # run, and radii grow by twice the furthest any body has moved
+        pos = positions[self.order]
+        self.drift = float(np.sqrt(((pos - self.built_positions) ** 2).sum(axis=1).max()))
+        sums = np.zeros((len(pos) + 1, 3))
+        np.cumsum((pos - self.lo) * self.body_mass[:, None], axis=0, out=sums[1:])
+        self.com = (sums[self.starts + self.counts] - sums[self.starts]) / self.mass[:, None] + self.lo
+        self.radius = self.base_radius + 2 * self.drift
+
+    def accelerations(self, points, theta, g, softening):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        acc = np.zeros_like(points)
+        query = np.arange(len(points))
+        node = np.zeros(len(points), dtype=np.int64)
+        theta2 = theta * theta
+        eps2 = softening * softening
+        interactions = 0
+
+        while len(node):
+            delta = self.com[node] - points[query]
+            r2 = (delta * delta).sum(axis=1)
+            accept = self.leaf[node] | (self.radius[node] ** 2 < theta2 * r2)
+
+            near = query[accept]
+            if len(near):
+                r2a = r2[accept] + eps2
+                # A point sitting on a body (r2a == 0) feels nothing from it
+                scale = np.divide(g * self.mass[node[accept]], r2a * np.sqrt(r2a),
+                                  out=np.zeros(len(r2a)), where=r2a > 0)
+                np.add.at(acc, near, delta[accept] * scale[:, None])
+                interactions += len(near)
+
+            opened = node[~accept]
+            counts = self.child_count[opened]
+            total = int(counts.sum())
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            query = np.repeat(query[~accept], counts)
+            node = np.repeat(self.child_first[opened], counts) + offsets
+
+        return acc, interactions
+
+
+class GravitySystem:
+    def __init__(self, theta=0.3, g=1.0, softening=10.0, slack=200.0, capacity=64):
+        self.theta = theta
+        self.g = g
+        self.softening = softening
+        # Moving bodies refit the tree until one has drifted this far
+        self.slack = slack
+
+        self.count = 0
+        self.objects = []
+        self.slots = {}
+        self.positions = np.zeros((capacity, 3))
+        self.masses = np.zeros(capacity)
+
+        self.tree = None
+        self.dirty = False
+        self.moved = False
+
+        self.builds = 0
+        self.refits = 0
+        self.build_ms = 0.0
+        self.queries = 0
+        self.interactions = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, obj):
+        return obj in self.slots
+
+    def _grow(self):
+        capacity = len(self.masses) * 2
+        for name in ('positions', 'masses'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, obj, position, mass):
+        if obj in self.slots:
+            self.remove(obj)
+        if mass <= 0:
+            return
+        if self.count == len(self.masses):
+            self._grow()
+
+        i = self.count
+        self.slots[obj] = i
+        self.objects.append(obj)
+        self.positions[i] = position
+        self.masses[i] = mass
+        self.count += 1
+        self.dirty = True
+
+    def remove(self, obj):
+        i = self.slots.pop(obj, None)
+        if i is None:
+            return
+
+        last = self.count - 1
+        # Swap-remove keeps the arrays dense
+        if i != last:
+            moved = self.objects[last]
+            self.objects[i] = moved
+            self.slots[moved] = i
+            self.positions[i] = self.positions[last]
+            self.masses[i] = self.masses[last]
+
+        self.objects.pop()
+        self.count -= 1
+        self.dirty = True
+
+    def sync(self, objects, positions):
+        # For moving masses: copy fresh positions for the given objects
+        slots = [self.slots[obj] for obj in objects if obj in self.slots]
+        if len(slots) == len(positions):
+            self.positions[slots] = positions
+        else:
+            for obj, position in zip(objects, positions):
+                i = self.slots.get(obj)
+                if i is not None:
+                    self.positions[i] = position
+        self.moved = self.moved or bool(slots)
+
+    def build(self):
+        # Membership changes rebuild the tree, movement only refits it
+        if not (self.dirty or self.moved):
+            return
+        start = time.perf_counter()
+        n = self.count
+        if not self.dirty and self.tree is not None:
+            self.tree.refit(self.positions[:n])
+            self.refits += 1
+            self.dirty = self.tree.drift > self.slack
+        if self.dirty:
+            self.tree = Octree(self.positions[:n], self.masses[:n]) if n else None
+            self.builds += 1
+        self.dirty = self.moved = False
+        self.build_ms = (time.perf_counter() - start) * 1000
+
+    def accelerations(self, points):
+        # (n, 3) accelerations at absolute positions
+        self.build()
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if self.tree is None:
+            return np.zeros_like(points)
+        acc, interactions = self.tree.accelerations(points, self.theta, self.g, self.softening)
+        self.queries += len(points)
+        self.interactions += interactions
+        return acc
+
+    def acceleration(self, point):
+        return self.accelerations(point)[0]
+
+    def step_bodies(self, positions, velocities, dt):
+        # Semi-implicit Euler for free (massless) bodies, in place
+        velocities += self.accelerations(positions) * dt
+        positions += velocities * dt
+
+    def report(self, name='Gravity'):
+        nodes = len(self.tree) if self.tree is not None else 0
+        depth = self.tree.depth if self.tree is not None else 0
+        per_query = self.interactions / self.queries if self.queries else 0.0
+        return (f"{name:<10} bodies {self.count:>5} | nodes {nodes:>5} | depth {depth:>2} | "
+                f"builds {self.builds} refits {self.refits} ({self.build_ms:.2f} ms) | "
+                f"{per_query:.1f} interactions/query | theta {self.theta}")
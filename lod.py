@@ -0,0 +1,157 @@
+# Distance-based level of detail.
+#
+# Every tracked object gets a level from its apparent size (size / distance),
+# computed for all of them in one vectorized pass:
+#   FULL     - high-resolution mesh plus detail children (glow, rings, disks)
+#   MEDIUM   - mid-resolution mesh plus detail children
+#   LOW      - low-resolution mesh, details culled
+#   IMPOSTOR - camera-facing disc
+# A level only changes once the apparent size has moved `hysteresis` past a
+# threshold, so objects sitting on a boundary don't flicker. Objects are told
+# about changes through set_lod(level).
+#
+# Level meshes are shared between all objects. Each object's model holds one
+# small wrapper node per level (so show/hide and color stay per object), and
+# each wrapper instances the shared geometry.
+
+import numpy as np
+from panda3d.core import NodePath
+
+FULL, MEDIUM, LOW, IMPOSTOR = 0, 1, 2, 3
+LEVEL_NAMES = ['full', 'medium', 'low', 'impostor']
+
+
+def select_levels(ratios, current, thresholds, hysteresis):
+    # thresholds are apparent-size ratios, in descending order
+    finest = (ratios[:, None] * (1 + hysteresis) < thresholds).sum(axis=1)
+    coarsest = (ratios[:, None] * (1 - hysteresis) < thresholds).sum(axis=1)
+    return np.clip(current, finest, coarsest)
+
+
+def make_lod_model(name, level_nodes):
+    model = NodePath(name)
+    for level, node in enumerate(level_nodes):
+        wrapper = model.attach_new_node(f'{name}_lod{level}')
+        wrapper.attach_new_node(node)
+        wrapper.hide()
+    return model
+
+
+def instance_model(name, node):
+    # Per-object handle on one shared mesh
+    model = NodePath(name)
+    model.attach_new_node(node)
+    return model
+
+
+def show_lod_level(model, level):
+    for i, wrapper in enumerate(model.get_children()):
+        if i == level:
+            wrapper.show()
+        else:
+            wrapper.hide()
+
+
+class LODSystem:
+    def __init__(self, thresholds, hysteresis=0.15, capacity=64):
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.hysteresis = hysteresis
+
+        self.count = 0
+        self.objects = []
+        self.slots = {}
+
+        self.positions = np.zeros((capacity, 3))
+        self.sizes = np.zeros(capacity)
+        self.levels = np.full(capacity, -1, dtype=np.int8)
+        self.distances = np.zeros(capacity)
+
+        self.switches = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, obj):
+        return obj in self.slots
+
+    def _grow(self):
+        capacity = len(self.sizes) * 2
+        for name in ('positions', 'sizes', 'levels', 'distances'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, obj, position, size):
+        if obj in self.slots:
+            self.remove(obj)
+        if self.count == len(self.sizes):
+            self._grow()
+
+        i = self.count
+        self.slots[obj] = i
+        self.objects.append(obj)
+        self.positions[i] = position
+        self.sizes[i] = size
+        # Unset, so the next update always reports a level
+        self.levels[i] = -1
+        self.distances[i] = np.inf
+        self.count += 1
+
+    def remove(self, obj):
+        i = self.slots.pop(obj, None)
+        if i is None:
+            return
+
+        last = self.count - 1
+        # Swap-remove keeps the arrays dense
+        if i != last:
+            moved = self.objects[last]
+            self.objects[i] = moved
+            self.slots[moved] = i
+            for array in (self.positions, self.sizes, self.levels, self.distances):
+                array[i] = array[last]
+
+        self.objects.pop()
+        self.count -= 1
+
+    def sync(self, objects, positions):
+        # For moving objects: copy fresh positions for the given objects
+        slots = [self.slots[obj] for obj in objects if obj in self.slots]
+        if len(slots) == len(positions):
+            self.positions[slots] = positions
+            return
+        for obj, position in zip(objects, positions):
+            i = self.slots.get(obj)
+            if i is not None:
+                self.positions[i] = position
+
+    def distance(self, obj):
+        # Distance measured by the last update()
+        return float(self.distances[self.slots[obj]])
+
+    def update(self, point):
+        n = self.count
+        if not n:
+            return 0
+
+        dists = np.sqrt(((self.positions[:n] - np.asarray(point, dtype=np.float64)) ** 2).sum(axis=1))
+        self.distances[:n] = dists
+        ratios = self.sizes[:n] / np.maximum(dists, 1e-6)
+
+        current = self.levels[:n]
+        levels = select_levels(ratios, current, self.thresholds, self.hysteresis)
+        changed = np.flatnonzero(levels != current)
+        current[:] = levels
+
+        for i in changed.tolist():
+            self.objects[i].set_lod(int(levels[i]))
+        self.switches += len(changed)
+        return len(changed)
+
+    def counts(self):
+        return np.bincount(self.levels[:self.count].clip(0), minlength=len(LEVEL_NAMES)).tolist()
+
+    def report(self, name='LOD'):
+        levels = " | ".join(f"{level} {count:>4}" for level, count in zip(LEVEL_NAMES, self.counts()))
+        return f"{name:<10} {levels} | switches {self.switches}"
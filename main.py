@@ -1,40 +1,82 @@
+import time
+STARTED = time.perf_counter()  # before the engine import, for the start-up report
+
 from ursina import *
 import math
-import random
-import hashlib
 
-app = Ursina(title='Universe Simulator', borderless=False)
+import numpy as np
 
-Sky(color=color.black)
+from config import Config
+from generation import (
+    STAR, NEBULA, BLACK_HOLE, GAS_GIANT, EVENT_NAMES,
+    generate_chunk, generate_planets, generate_belts, star_remnants,
+)
+from galaxy import chunks_around
+from meshes import make_geom_node, billboard_quads, uv_sphere, disc
+from spatial import SpatialIndex
+from orbits import OrbitSystem
+from streaming import ChunkStreamer
+from prefetch import ChunkPrefetcher
+from pools import EntityPool
+from lod import (
+    LODSystem, FULL, MEDIUM, LOW, IMPOSTOR, make_lod_model, instance_model, show_lod_level,
+)
+from batching import ChunkBatch
+from particles import ParticleSystem
+from profiler import Profiler, StartupTimer
+from simclock import SimulationClock
+from gravity import GravitySystem, body_mass
+from collisions import CollisionSystem, body_radius
+from asteroids import AsteroidBelt, BeltSystem
+from timeline import UniverseClock, EventScheduler, resolve_chunk
+from catalog import Catalog
 
-# ══════════════════════════════════════════════════════════════════
-# CONFIGURATION - OPTIMIZED
-# ══════════════════════════════════════════════════════════════════
+# Importing this module only defines things. The window, the scene and
+# every system they run on are created by init(), so tools and tests can
+# import it without any of them.
+app = None
+
+profiler = None  # created by init()
+startup = StartupTimer(STARTED)
 
-class Config:
-    CHUNK_SIZE = 4000
-    RENDER_DISTANCE = 2
-    STARS_PER_CHUNK = 2
-    PLANET_LOAD_DIST = 800
-    PLANET_UNLOAD_DIST = 1200
+def set_text(label, text):
+    # Text rebuilds all its glyphs on every assignment, so skip unchanged text
+    if getattr(label, 'raw_text', None) != text:
+        with profiler.scope('hud.text'):
+            label.text = text
 
 # ══════════════════════════════════════════════════════════════════
 # FLOATING ORIGIN
 # ══════════════════════════════════════════════════════════════════
 
 class FloatingOrigin:
+    # The absolute position of the render origin is kept as integer sector
+    # coordinates plus a float offset inside the sector, so it stays exact
+    # however far the ship flies. World content lives under one root node
+    # and a rebase only moves that node. Content positions are relative to
+    # an integer anchor sector, which jumps to the origin (shifting the
+    # root's direct children once) only after drifting REANCHOR_DISTANCE
+    # away, keeping float32 transforms precise.
     def __init__(self):
-        self.world_offset = Vec3(0, 0, 0)
+        self.root = Entity(name='world_root')
         self.threshold = 2000
-        self.entities = []
+        self.sector_size = Config.CHUNK_SIZE
+        self.sector = [0, 0, 0]
+        self.local = [0.0, 0.0, 0.0]
+        self.anchor = [0, 0, 0]
+        self.entities = set()
+        self.rebases = 0
+        self.reanchors = 0
         
     def register(self, entity):
-        if entity not in self.entities:
-            self.entities.append(entity)
+        self.entities.add(entity)
         
     def unregister(self, entity):
-        if entity in self.entities:
-            self.entities.remove(entity)
+        self.entities.discard(entity)
+        
+    @property
+    def world_offset(self):
+        return Vec3(*self.get_absolute_position((0, 0, 0)))
             
     def update(self, player_pos):
         if abs(player_pos.x) > self.threshold or \
@@ -42,101 +84,112 @@ class FloatingOrigin:
            abs(player_pos.z) > self.threshold:
             
             shift = Vec3(player_pos.x, player_pos.y, player_pos.z)
-            self.world_offset += shift
             
-            for entity in self.entities[:]:
-                if entity:
-                    entity.position -= shift
-                    
+            for i in range(3):
+                self.local[i] += shift[i]
+                carry = math.floor(self.local[i] / self.sector_size)
+                self.sector[i] += carry
+                self.local[i] -= carry * self.sector_size
+                
+            drift = max(abs(a - s) for a, s in zip(self.anchor, self.sector))
+            if drift * self.sector_size > Config.REANCHOR_DISTANCE:
+                self.reanchor()
+                
+            self.place_root()
+            self.rebases += 1
             return shift
         return Vec3(0, 0, 0)
+        
+    def place_root(self):
+        size = self.sector_size
+        self.root.position = Vec3(*(
+            (a - s) * size - l for a, s, l in zip(self.anchor, self.sector, self.local)
+        ))
+        
+    def reanchor(self):
+        size = self.sector_size
+        delta = Vec3(*((a - s) * size for a, s in zip(self.anchor, self.sector)))
+        for node in self.root.getChildren():
+            node.setPos(node.getPos() + delta)
+        self.anchor = list(self.sector)
+        self.reanchors += 1
     
     def get_absolute_position(self, local_pos):
-        return self.world_offset + local_pos
-
-floating_origin = FloatingOrigin()
-
-# ══════════════════════════════════════════════════════════════════
-# SEEDED RANDOM
-# ══════════════════════════════════════════════════════════════════
+        # Render-space position -> absolute universe position (float64)
+        size = self.sector_size
+        return tuple(
+            s * size + l + float(p) for s, l, p in zip(self.sector, self.local, local_pos)
+        )
+        
+    def to_world(self, abs_pos):
+        # Absolute universe position -> position under the world root
+        size = self.sector_size
+        return Vec3(*(p - a * size for p, a in zip(abs_pos, self.anchor)))
+        
+    def from_world(self, world_pos):
+        # Position(s) under the world root -> absolute universe position(s)
+        return np.asarray(world_pos, dtype=np.float64) + np.array(self.anchor, dtype=np.float64) * self.sector_size
+        
+    def to_render(self, abs_pos):
+        # Absolute universe position -> render space, like the ship's
+        origin = self.get_absolute_position((0, 0, 0))
+        return Vec3(*(p - o for p, o in zip(abs_pos, origin)))
 
-def get_seed(x, y, z, salt=""):
-    data = f"{int(x)},{int(y)},{int(z)},{salt}"
-    return int(hashlib.md5(data.encode()).hexdigest()[:8], 16)
+floating_origin = None  # created by init()
 
 # ══════════════════════════════════════════════════════════════════
-# STAR TYPES
+# COLORS (indexed like the generation tables)
 # ══════════════════════════════════════════════════════════════════
 
-STAR_TYPES = [
-    {'color': color.blue, 'glow': color.cyan, 'size': (200, 350), 'prob': 0.03, 'name': 'Blue Giant'},
-    {'color': color.cyan, 'glow': color.azure, 'size': (150, 250), 'prob': 0.05, 'name': 'Blue-White'},
-    {'color': color.white, 'glow': color.white, 'size': (100, 180), 'prob': 0.10, 'name': 'White Star'},
-    {'color': color.yellow, 'glow': color.orange, 'size': (80, 140), 'prob': 0.15, 'name': 'Yellow Dwarf'},
-    {'color': color.orange, 'glow': color.yellow, 'size': (60, 110), 'prob': 0.25, 'name': 'Orange Dwarf'},
-    {'color': color.red, 'glow': color.orange, 'size': (40, 90), 'prob': 0.42, 'name': 'Red Dwarf'},
+STAR_COLORS = [
+    (color.blue, color.cyan),       # Blue Giant
+    (color.cyan, color.azure),      # Blue-White
+    (color.white, color.white),     # White Star
+    (color.yellow, color.orange),   # Yellow Dwarf
+    (color.orange, color.yellow),   # Orange Dwarf
+    (color.red, color.orange),      # Red Dwarf
 ]
 
-def get_star_type(rng):
-    roll = rng.random()
-    cumulative = 0
-    for props in STAR_TYPES:
-        cumulative += props['prob']
-        if roll < cumulative:
-            return props
-    return STAR_TYPES[-1]
-
-# ══════════════════════════════════════════════════════════════════
-# PLANET TYPES
-# ══════════════════════════════════════════════════════════════════
-
-PLANET_TYPES = [
-    {'color': color.red, 'name': 'Molten', 'size': (8, 15)},
-    {'color': color.orange, 'name': 'Desert', 'size': (10, 20)},
-    {'color': color.blue, 'name': 'Ocean', 'size': (12, 25)},
-    {'color': color.green, 'name': 'Forest', 'size': (12, 22)},
-    {'color': color.cyan, 'name': 'Ice', 'size': (10, 20)},
-    {'color': color.white, 'name': 'Frozen', 'size': (10, 18)},
-    {'color': color.magenta, 'name': 'Exotic', 'size': (8, 18)},
-    {'color': color.violet, 'name': 'Crystal', 'size': (8, 16)},
-    {'color': color.gray, 'name': 'Rocky', 'size': (6, 14)},
-    {'color': color.brown, 'name': 'Barren', 'size': (8, 16)},
-    {'color': color.lime, 'name': 'Toxic', 'size': (10, 18)},
-    {'color': color.yellow, 'name': 'Sulfur', 'size': (8, 15)},
+PLANET_COLORS = [
+    color.red, color.orange, color.blue, color.green, color.cyan, color.white,
+    color.magenta, color.violet, color.gray, color.brown, color.lime, color.yellow,
 ]
 
-GAS_GIANTS = [
-    {'color': color.orange, 'name': 'Gas Giant', 'size': (35, 60)},
-    {'color': color.yellow, 'name': 'Yellow Giant', 'size': (40, 65)},
-    {'color': color.cyan, 'name': 'Ice Giant', 'size': (30, 50)},
-    {'color': color.blue, 'name': 'Blue Giant', 'size': (32, 55)},
-]
+GAS_GIANT_COLORS = [color.orange, color.yellow, color.cyan, color.blue]
+
+BELT_COLORS = [color.brown, color.light_gray, color.gray]
 
 # ══════════════════════════════════════════════════════════════════
-# BACKGROUND STARS (reduced count)
+# BACKGROUND STARS (single mesh)
 # ══════════════════════════════════════════════════════════════════
 
-background_stars = Entity()
 bg_colors = [color.white, color.yellow, color.cyan, color.orange, color.red]
 
-for _ in range(600):  # Reduced from 3000
-    theta = random.uniform(0, math.pi * 2)
-    phi = random.uniform(-math.pi/2, math.pi/2)
-    r = 8000
+def build_starfield(count, radius=8000):
+    theta = np.random.uniform(0, math.pi * 2, count)
+    phi = np.random.uniform(-math.pi/2, math.pi/2, count)
     
-    x = r * math.cos(phi) * math.cos(theta)
-    y = r * math.sin(phi)
-    z = r * math.cos(phi) * math.sin(theta)
+    centers = np.stack([
+        radius * np.cos(phi) * np.cos(theta),
+        radius * np.sin(phi),
+        radius * np.cos(phi) * np.sin(theta),
+    ], axis=1)
+    sizes = np.random.uniform(3, 10, count)
     
-    Entity(
-        parent=background_stars,
-        model='quad',
-        position=(x, y, z),
-        scale=random.uniform(3, 10),
-        color=random.choice(bg_colors),
-        billboard=True,
-        unlit=True
-    )
+    palette = np.array([tuple(c) for c in bg_colors], dtype=np.float32)
+    colors = palette[np.random.randint(len(palette), size=count)]
+    
+    vertices, triangles = billboard_quads(centers, sizes)
+    node = make_geom_node('background_stars', vertices, np.repeat(colors, 4, axis=0), triangles)
+    
+    field = Entity()
+    field.attach_new_node(node)
+    field.set_light_off()
+    field.set_two_sided(True)
+    return field
+
+# Built after the first frame is out, see finish_startup()
+background_stars = None
 
 # ══════════════════════════════════════════════════════════════════
 # EFFECTS (simplified)
@@ -153,252 +206,314 @@ class Effects:
         )
         self.time_dilation = 1.0
         self.gravity_pull = Vec3(0, 0, 0)
+        self.notice = ""
+        self.notice_until = 0.0
+        
+    def announce(self, text):
+        # Shown for a while, unless a hazard warning needs the space
+        self.notice = text
+        self.notice_until = sim_clock.sim_time + Config.IMPACT_WARNING_SECONDS
+        
+    def collide(self, event):
+        self.announce(f"⚠ IMPACT: {event.b.type_name.upper()} ⚠")
         
     def update(self, ship_pos):
-        self.gravity_pull = Vec3(0, 0, 0)
         self.time_dilation = 1.0
         warning = ""
         
-        # Only check nearby chunks
-        for chunk in universe.chunks.values():
-            for obj in chunk.objects:
-                dist = (obj.position - ship_pos).length()
+        # Acceleration from every loaded mass
+        abs_pos = floating_origin.get_absolute_position(ship_pos)
+        self.gravity_pull = Vec3(*gravity.acceleration(abs_pos))
+        
+        # Stars first so black-hole warnings take precedence
+        star_r = universe.index.max_size(STAR)
+        for obj, dist in universe.get_within(ship_pos, star_r, STAR):
+            danger_r = obj.scale_x * 2
+            if dist < danger_r * 0.5:
+                warning = "⚠ RADIATION WARNING ⚠"
                 
-                if isinstance(obj, BlackHole):
-                    grav_r = obj.scale_x * 15
-                    if dist < grav_r:
-                        strength = (1 - dist / grav_r) ** 2 * 50
-                        direction = (obj.position - ship_pos).normalized()
-                        self.gravity_pull += direction * strength
-                        self.time_dilation = max(0.1, dist / grav_r)
-                        
-                        if dist < obj.scale_x * 2:
-                            warning = "☠ EVENT HORIZON ☠"
-                            self.gravity_pull = direction * 300
-                        elif dist < grav_r * 0.5:
-                            warning = "⚠ EXTREME GRAVITY ⚠"
-                            
-                elif isinstance(obj, Star):
-                    danger_r = obj.scale_x * 2
-                    if dist < danger_r * 0.5:
-                        warning = "⚠ RADIATION WARNING ⚠"
-                        
-        self.warning.text = warning
+        grav_reach = universe.index.max_size(BLACK_HOLE) * 15
+        for obj, dist in universe.get_within(ship_pos, grav_reach, BLACK_HOLE):
+            grav_r = obj.scale_x * 15
+            if dist < grav_r:
+                self.time_dilation = max(0.1, dist / grav_r)
+                
+                if dist < obj.scale_x * 2:
+                    warning = "☠ EVENT HORIZON ☠"
+                elif dist < grav_r * 0.5:
+                    warning = "⚠ EXTREME GRAVITY ⚠"
+                    
+        if not warning and sim_clock.sim_time < self.notice_until:
+            warning = self.notice
+        set_text(self.warning, warning)
 
-effects = Effects()
+effects = None  # created by init()
 
 # ══════════════════════════════════════════════════════════════════
-# STAR CLASS (simplified)
+# ORBITS (all planets and gas giants, advanced in one batch)
 # ══════════════════════════════════════════════════════════════════
 
-class Star(Entity):
-    def __init__(self, position, seed):
-        self.seed = seed
-        self.rng = random.Random(seed)
-        
-        props = get_star_type(self.rng)
-        self.main_color = props['color']
-        self.type_name = props['name']
+orbits = None  # created by init()
+
+# ══════════════════════════════════════════════════════════════════
+# SIMULATION CLOCK (fixed steps, rendering interpolates between them)
+# ══════════════════════════════════════════════════════════════════
+
+sim_clock = None  # created by init()
+
+# ══════════════════════════════════════════════════════════════════
+# UNIVERSE TIME (state on load from seed + clock, lazily resolved events)
+# ══════════════════════════════════════════════════════════════════
+
+universe_clock = universe_events = None  # created by init()
+
+# ══════════════════════════════════════════════════════════════════
+# GRAVITY (Barnes-Hut over every loaded mass)
+# ══════════════════════════════════════════════════════════════════
+
+gravity = None  # created by init()
+
+# ══════════════════════════════════════════════════════════════════
+# COLLISIONS (grid broad phase, swept tests for the ship)
+# ══════════════════════════════════════════════════════════════════
+
+collisions = None  # created by init()
+
+# ══════════════════════════════════════════════════════════════════
+# ASTEROID BELTS (one mesh per belt, rocks as orbital-element arrays)
+# ══════════════════════════════════════════════════════════════════
+
+asteroid_belts = None  # created by init()
+
+# ══════════════════════════════════════════════════════════════════
+# CATALOG (queries over generated data, loaded or not)
+# ══════════════════════════════════════════════════════════════════
+
+catalog = None  # created by init()
+
+# ══════════════════════════════════════════════════════════════════
+# LEVEL OF DETAIL (shared meshes, one set per resolution)
+# ══════════════════════════════════════════════════════════════════
+
+def lod_geom(name, mesh):
+    vertices, triangles = mesh
+    return make_geom_node(name, vertices, (1, 1, 1, 1), triangles)
+
+SPHERE_NODES = IMPOSTOR_NODE = LOD_NODES = None  # created by init()
+
+def build_lod_nodes():
+    global SPHERE_NODES, IMPOSTOR_NODE, LOD_NODES
+    SPHERE_NODES = [
+        lod_geom('sphere_full', uv_sphere(16, 32)),
+        lod_geom('sphere_medium', uv_sphere(8, 16)),
+        lod_geom('sphere_low', uv_sphere(4, 8)),
+    ]
+    IMPOSTOR_NODE = lod_geom('impostor', disc(12))
+    NodePath(IMPOSTOR_NODE).set_billboard_point_eye()
+    NodePath(IMPOSTOR_NODE).set_two_sided(True)
+    
+    LOD_NODES = SPHERE_NODES + [IMPOSTOR_NODE]
+
+# Planets move, so they get their own LOD set fed from the orbit positions
+planet_lod = None  # created by init()
+
+
+class LODBody(Entity):
+    # Base for celestial views. The model is a set of LOD meshes, and
+    # `details` (glows, rings, disks) are only shown up to MEDIUM. Bodies
+    # that belong to a chunk are merged into its static batch; `animated`
+    # details are left out of it.
+    BATCH_IMPOSTOR = True
+    
+    def __init__(self, **kwargs):
+        super().__init__(model=make_lod_model('body', LOD_NODES), **kwargs)
+        self.details = []
+        self.animated = []
+        self.lod_level = None
+        self.chunk = None
+        
+    def detail_sphere(self, **kwargs):
+        return Entity(parent=self, model=instance_model('detail', SPHERE_NODES[FULL]), **kwargs)
+        
+    def set_lod(self, level):
+        self.lod_level = level
+        show_lod_level(self.model, level)
+        for detail in self.details:
+            detail.enabled = level <= MEDIUM
+        if self.chunk is not None:
+            self.chunk.invalidate()
+            
+    def static_details(self):
+        if self.lod_level > MEDIUM:
+            return []
+        return [d for d in self.details if d not in self.animated]
+            
+    def batch_parts(self):
+        # Impostors batch as low spheres, which look the same from that far
+        # and don't need to face the camera
+        if self.lod_level is None or (self.lod_level == IMPOSTOR and not self.BATCH_IMPOSTOR):
+            return []
+        return [self.model.get_child(min(self.lod_level, LOW))] + self.static_details()
+        
+    def set_batched(self, batched):
+        if batched:
+            for node in [self.model] + self.static_details():
+                node.hide()
+        else:
+            for node in [self.model] + self.details:
+                if node not in self.animated:
+                    node.show()
+
+# ══════════════════════════════════════════════════════════════════
+# STAR CLASS (pooled view over a generation.BodyRecord)
+# ══════════════════════════════════════════════════════════════════
+
+class Star(LODBody):
+    def __init__(self, record):
+        super().__init__(parent=floating_origin.root, unlit=True)
         
-        size = self.rng.uniform(*props['size'])
+        # Single glow layer only
+        self.glow = self.detail_sphere(scale=1.5, unlit=True)
+        self.details = [self.glow]
+        self.planets = []
+        self.belts = []
+        self.reset(record)
         
-        super().__init__(
-            model='sphere',
-            color=self.main_color,
-            position=position,
-            scale=size,
-            unlit=True
-        )
+    def reset(self, record):
+        self.record = record
+        self.seed = record.seed
         
-        floating_origin.register(self)
+        self.main_color, glow = STAR_COLORS[record.type_index]
+        self.type_name = record.type_name
+        self.star_name = record.name
         
-        # Single glow layer only
-        Entity(
-            parent=self,
-            model='sphere',
-            scale=1.5,
-            color=props['glow'].tint(-0.5),
-            unlit=True
-        )
+        self.color = self.main_color
+        self.glow.color = glow.tint(-0.5)
+        self.position = floating_origin.to_world(record.position)
+        self.scale = record.size
         
-        self.star_name = f"Star-{seed % 9999}"
-        self.planets = []
         self.planets_loaded = False
+        self.enabled = True
+        floating_origin.register(self)
+        
+    def park(self):
+        self.enabled = False
         
     def load_planets(self):
         if self.planets_loaded:
             return
             
-        num_planets = self.rng.randint(2, 6)  # Reduced max
-        
-        for i in range(num_planets):
-            orbital_radius = self.scale_x * 3 + 200 + i * 150
-            
-            # Gas giant chance
-            if i >= num_planets - 2 and self.rng.random() > 0.5:
-                planet = GasGiant(self, orbital_radius, self.seed + i + 1000)
+        for planet_record in generate_planets(self.record):
+            if planet_record.kind == GAS_GIANT:
+                planet = gas_giant_pool.acquire(self, planet_record)
             else:
-                planet = Planet(self, orbital_radius, self.seed + i + 1000)
+                planet = planet_pool.acquire(self, planet_record)
                 
             self.planets.append(planet)
             
+        for belt_record in generate_belts(self.record):
+            belt = AsteroidBelt(belt_record, floating_origin.root, self.position,
+                                BELT_COLORS[belt_record.type_index])
+            self.belts.append(asteroid_belts.add(belt))
+            
         self.planets_loaded = True
         
     def unload_planets(self):
         for planet in self.planets:
             planet.cleanup()
+        for belt in self.belts:
+            asteroid_belts.remove(belt)
         self.planets.clear()
+        self.belts.clear()
         self.planets_loaded = False
         
     def cleanup(self):
         self.unload_planets()
         floating_origin.unregister(self)
-        destroy(self)
+        star_pool.release(self)
 
 # ══════════════════════════════════════════════════════════════════
-# PLANET CLASS (simplified)
+# PLANET CLASS (pooled view over a generation.PlanetRecord)
 # ══════════════════════════════════════════════════════════════════
 
-class Planet(Entity):
-    def __init__(self, parent_star, orbital_radius, seed):
-        self.parent_star = parent_star
-        self.orbital_radius = orbital_radius
-        self.rng = random.Random(seed)
-        
-        props = self.rng.choice(PLANET_TYPES)
-        self.type_name = props['name']
-        
-        size = self.rng.uniform(*props['size'])
-        
-        self.orbital_speed = 0.3 / math.sqrt(orbital_radius / 100)
-        self.orbital_angle = self.rng.uniform(0, math.pi * 2)
-        self.rotation_speed = self.rng.uniform(20, 50)
+class Planet(LODBody):
+    COLORS = PLANET_COLORS
+    RING = {'scale': 2.2, 'rotation_x': 80, 'color': color.white.tint(-0.5)}
+    
+    def __init__(self, parent_star, record):
+        super().__init__(parent=floating_origin.root)
         
-        x = math.cos(self.orbital_angle) * orbital_radius
-        z = math.sin(self.orbital_angle) * orbital_radius
+        # Single ring, shown for some planets
+        self.ring = Entity(parent=self, model='circle', double_sided=True, **self.RING)
+        self.reset(parent_star, record)
         
-        super().__init__(
-            model='sphere',
-            color=props['color'],
-            position=parent_star.position + Vec3(x, 0, z),
-            scale=size
-        )
+    def reset(self, parent_star, record):
+        self.parent_star = parent_star
+        self.record = record
+        self.type_name = record.type_name
+        
+        # Where the orbit has got to by now, however long it went unloaded
+        angle = record.orbital_angle + record.orbital_speed * universe_clock.time
+        heading = record.rotation_speed * universe_clock.time
+        x = math.cos(angle) * record.orbital_radius
+        z = math.sin(angle) * record.orbital_radius
+        
+        self.color = self.COLORS[record.type_index]
+        self.position = parent_star.position + Vec3(x, 0, z)
+        self.rotation_y = 0
+        self.scale = record.size
+        self.enabled = True
+        
+        # The ring is a detail, shown once the LOD update places the planet
+        self.ring.enabled = False
+        self.details = [self.ring] if record.ring else []
+        planet_lod.add(self, self.position, record.size)
+        abs_pos = floating_origin.from_world(self.position)
+        gravity.add(self, abs_pos, body_mass(record.kind, record.size))
+        collisions.add(self, abs_pos, body_radius(record.kind, record.size), record.kind)
         
         floating_origin.register(self)
         
-        # Single ring for some planets
-        if size > 20 and self.rng.random() > 0.7:
-            Entity(
-                parent=self,
-                model='circle',
-                scale=2.2,
-                rotation_x=80,
-                color=color.white.tint(-0.5),
-                double_sided=True
-            )
-            
-    def update(self):
-        if not self.parent_star:
-            return
-            
-        dt = time.dt * effects.time_dilation
-        self.orbital_angle += dt * self.orbital_speed
-        
-        x = math.cos(self.orbital_angle) * self.orbital_radius
-        z = math.sin(self.orbital_angle) * self.orbital_radius
-        
-        self.position = self.parent_star.position + Vec3(x, 0, z)
-        self.rotation_y += dt * self.rotation_speed
+        # Orbit and spin are advanced in bulk by the shared OrbitSystem
+        orbits.add(self, parent_star, record.orbital_radius, record.orbital_speed,
+                   angle, record.rotation_speed, heading)
         
+    def park(self):
+        self.parent_star = None
+        self.enabled = False
+            
     def cleanup(self):
+        orbits.remove(self)
+        planet_lod.remove(self)
+        gravity.remove(self)
+        collisions.remove(self)
         floating_origin.unregister(self)
-        destroy(self)
+        self.pool.release(self)
 
 # ══════════════════════════════════════════════════════════════════
-# GAS GIANT (simplified)
+# GAS GIANT (same view, own colors and more common rings)
 # ══════════════════════════════════════════════════════════════════
 
-class GasGiant(Entity):
-    def __init__(self, parent_star, orbital_radius, seed):
-        self.parent_star = parent_star
-        self.orbital_radius = orbital_radius
-        self.rng = random.Random(seed)
-        
-        props = self.rng.choice(GAS_GIANTS)
-        self.type_name = props['name']
-        
-        size = self.rng.uniform(*props['size'])
-        
-        self.orbital_speed = 0.2 / math.sqrt(orbital_radius / 100)
-        self.orbital_angle = self.rng.uniform(0, math.pi * 2)
-        self.rotation_speed = self.rng.uniform(30, 60)
-        
-        x = math.cos(self.orbital_angle) * orbital_radius
-        z = math.sin(self.orbital_angle) * orbital_radius
-        
-        super().__init__(
-            model='sphere',
-            color=props['color'],
-            position=parent_star.position + Vec3(x, 0, z),
-            scale=size
-        )
-        
-        floating_origin.register(self)
-        
-        # Rings (high chance)
-        if self.rng.random() > 0.4:
-            Entity(
-                parent=self,
-                model='circle',
-                scale=2,
-                rotation_x=75,
-                color=color.orange.tint(-0.4),
-                double_sided=True
-            )
-            
-    def update(self):
-        if not self.parent_star:
-            return
-            
-        dt = time.dt * effects.time_dilation
-        self.orbital_angle += dt * self.orbital_speed
-        
-        x = math.cos(self.orbital_angle) * self.orbital_radius
-        z = math.sin(self.orbital_angle) * self.orbital_radius
-        
-        self.position = self.parent_star.position + Vec3(x, 0, z)
-        self.rotation_y += dt * self.rotation_speed
-        
-    def cleanup(self):
-        floating_origin.unregister(self)
-        destroy(self)
+class GasGiant(Planet):
+    COLORS = GAS_GIANT_COLORS
+    RING = {'scale': 2, 'rotation_x': 75, 'color': color.orange.tint(-0.4)}
 
 # ══════════════════════════════════════════════════════════════════
-# BLACK HOLE (simplified)
+# BLACK HOLE (pooled view over a generation.BodyRecord)
 # ══════════════════════════════════════════════════════════════════
 
-class BlackHole(Entity):
-    def __init__(self, position, mass, seed):
-        size = mass * 4
-        
-        super().__init__(
-            model='sphere',
-            color=color.black,
-            position=position,
-            scale=size
-        )
-        
-        floating_origin.register(self)
+class BlackHole(LODBody):
+    BATCH_IMPOSTOR = False
+    
+    def __init__(self, record):
+        super().__init__(parent=floating_origin.root, color=color.black)
         
-        self.star_name = f"BlackHole-{seed % 999}"
         self.type_name = "Black Hole"
         self.planets_loaded = False
         self.planets = []
         
         # Simple glow
-        Entity(
-            parent=self,
-            model='sphere',
+        glow = self.detail_sphere(
             scale=1.3,
             color=color.violet.tint(-0.5),
             unlit=True
@@ -414,13 +529,34 @@ class BlackHole(Entity):
             double_sided=True,
             unlit=True
         )
+        self.details = [glow, self.disk]
+        self.animated = [self.disk]
+        
+        # A black impostor would vanish against the sky, so it shows the glow
+        # (and stays out of the chunk batch)
+        impostor = self.model.get_child(IMPOSTOR)
+        impostor.set_color_scale_off()
+        impostor.set_color_scale(color.violet.tint(-0.5))
+        self.reset(record)
+        
+    def reset(self, record):
+        self.record = record
+        self.star_name = record.name
+        self.position = floating_origin.to_world(record.position)
+        self.scale = record.size
+        self.enabled = True
+        floating_origin.register(self)
+        
+    def park(self):
+        self.enabled = False
         
     def update(self):
-        self.disk.rotation_y += time.dt * 100
+        if self.disk.enabled:
+            self.disk.rotation_y += time.dt * 100
         
     def cleanup(self):
         floating_origin.unregister(self)
-        destroy(self)
+        black_hole_pool.release(self)
         
     def load_planets(self):
         pass
@@ -428,48 +564,76 @@ class BlackHole(Entity):
         pass
 
 # ══════════════════════════════════════════════════════════════════
-# NEBULA (simplified)
+# NEBULA (pooled view over a generation.BodyRecord)
 # ══════════════════════════════════════════════════════════════════
 
-class Nebula(Entity):
+class Nebula(LODBody):
     COLORS = [color.pink, color.cyan, color.violet, color.orange, color.magenta]
     
-    def __init__(self, position, size, seed):
-        rng = random.Random(seed)
-        nebula_color = rng.choice(self.COLORS)
-        
-        super().__init__(
-            model='sphere',
-            color=nebula_color.tint(-0.7),
-            position=position,
-            scale=size,
-            unlit=True
-        )
+    def __init__(self, record):
+        super().__init__(parent=floating_origin.root, unlit=True)
         
-        floating_origin.register(self)
-        self.star_name = f"Nebula-{seed % 999}"
         self.type_name = "Nebula"
         self.planets_loaded = False
         self.planets = []
         
         # Single inner layer
-        Entity(
-            parent=self,
-            model='sphere',
-            scale=0.7,
-            color=nebula_color.tint(-0.5),
-            unlit=True
-        )
+        self.inner = self.detail_sphere(scale=0.7, unlit=True)
+        self.details = [self.inner]
+        self.reset(record)
+        
+    def reset(self, record):
+        self.record = record
+        self.star_name = record.name
+        
+        nebula_color = self.COLORS[record.type_index]
+        self.color = nebula_color.tint(-0.7)
+        self.inner.color = nebula_color.tint(-0.5)
+        self.position = floating_origin.to_world(record.position)
+        self.scale = record.size
+        self.enabled = True
+        floating_origin.register(self)
+        
+    def park(self):
+        self.enabled = False
             
     def cleanup(self):
         floating_origin.unregister(self)
-        destroy(self)
+        nebula_pool.release(self)
         
     def load_planets(self):
         pass
     def unload_planets(self):
         pass
 
+# ══════════════════════════════════════════════════════════════════
+# ENTITY POOLS
+# ══════════════════════════════════════════════════════════════════
+
+star_pool = planet_pool = gas_giant_pool = nebula_pool = black_hole_pool = None  # created by init()
+VIEW_POOLS = {}
+
+def build_pools():
+    global star_pool, planet_pool, gas_giant_pool, nebula_pool, black_hole_pool
+    star_pool = EntityPool(Star, destroy, Config.POOL_MAX_SIZE)
+    planet_pool = EntityPool(Planet, destroy, Config.POOL_MAX_SIZE)
+    gas_giant_pool = EntityPool(GasGiant, destroy, Config.POOL_MAX_SIZE)
+    nebula_pool = EntityPool(Nebula, destroy, Config.POOL_MAX_SIZE)
+    black_hole_pool = EntityPool(BlackHole, destroy, Config.POOL_MAX_SIZE)
+    
+    Planet.pool = planet_pool
+    GasGiant.pool = gas_giant_pool
+    
+    VIEW_POOLS.update({
+        STAR: star_pool,
+        NEBULA: nebula_pool,
+        BLACK_HOLE: black_hole_pool,
+    })
+
+def pool_report():
+    pools = [star_pool, planet_pool, gas_giant_pool, nebula_pool, black_hole_pool]
+    return "\n".join(pool.report() for pool in pools)
+
 # ══════════════════════════════════════════════════════════════════
 # UNIVERSE CHUNKS
 # ══════════════════════════════════════════════════════════════════
@@ -477,57 +641,40 @@ class Nebula(Entity):
 class UniverseChunk:
     def __init__(self, coords):
         self.coords = coords
+        self.record = None
         self.objects = []
         self.loaded = False
         
-    def generate(self):
+        # Static geometry is merged once LOD levels settle
+        self.batch = ChunkBatch(floating_origin.root)
+        self.dirty_frame = 0
+        
+    def generate(self, record=None):
         if self.loaded:
             return
             
-        cx, cy, cz = self.coords
-        seed = get_seed(cx, cy, cz, "chunk")
-        rng = random.Random(seed)
-        
-        # Generate stars
-        num_stars = Config.STARS_PER_CHUNK
-        
-        for i in range(num_stars):
-            star_seed = get_seed(cx, cy, cz, f"star{i}")
-            star_rng = random.Random(star_seed)
-            
-            pos = Vec3(
-                cx * Config.CHUNK_SIZE + star_rng.uniform(200, Config.CHUNK_SIZE - 200),
-                cy * Config.CHUNK_SIZE + star_rng.uniform(-100, 100),
-                cz * Config.CHUNK_SIZE + star_rng.uniform(200, Config.CHUNK_SIZE - 200)
-            )
-            
-            star = Star(pos, star_seed)
-            self.objects.append(star)
-            
-        # Rare nebula
-        if rng.random() < 0.08:
-            pos = Vec3(
-                cx * Config.CHUNK_SIZE + rng.uniform(0, Config.CHUNK_SIZE),
-                cy * Config.CHUNK_SIZE + rng.uniform(-200, 200),
-                cz * Config.CHUNK_SIZE + rng.uniform(0, Config.CHUNK_SIZE)
-            )
-            nebula = Nebula(pos, rng.uniform(150, 350), seed + 10000)
-            self.objects.append(nebula)
-            
-        # Rare black hole
-        if rng.random() < 0.03:
-            pos = Vec3(
-                cx * Config.CHUNK_SIZE + rng.uniform(0, Config.CHUNK_SIZE),
-                cy * Config.CHUNK_SIZE + rng.uniform(-50, 50),
-                cz * Config.CHUNK_SIZE + rng.uniform(0, Config.CHUNK_SIZE)
-            )
-            bh = BlackHole(pos, rng.uniform(8, 20), seed + 20000)
-            self.objects.append(bh)
+        self.record = record or generate_chunk(self.coords)
+        
+        for body in self.record.bodies:
+            obj = VIEW_POOLS[body.kind].acquire(body)
+            obj.chunk = self
+            self.objects.append(obj)
             
         self.loaded = True
         
+    def invalidate(self):
+        # Show the individual nodes again until the batch is rebuilt
+        self.batch.clear()
+        self.dirty_frame = universe.frame
+        
+    def rebuild(self):
+        self.batch.build(self.objects, self.objects[0].position)
+        self.dirty_frame = None
+        
     def unload(self):
+        self.batch.clear()
         for obj in self.objects:
+            obj.chunk = None
             obj.cleanup()
         self.objects.clear()
         self.loaded = False
@@ -536,58 +683,193 @@ class UniverseChunk:
 class Universe:
     def __init__(self):
         self.chunks = {}
+        self.index = SpatialIndex(Config.CHUNK_SIZE)
+        self.streamer = ChunkStreamer()
+        self.prefetcher = ChunkPrefetcher(Config.CHUNK_SIZE, Config.PREFETCH_SECONDS, Config.PREFETCH_MIN_SPEED,
+                                          Config.PREFETCH_RADIUS, Config.PREFETCH_MAX_CHUNKS)
+        self.lod = LODSystem(Config.LOD_RATIOS, Config.LOD_HYSTERESIS)
+        self.planet_hosts = set()
+        self.frame = 0
+        
+        # Occupied chunks in render range, recomputed on entering a chunk
+        self.current = None
+        self.needed = set()
         
     def get_chunk_coords(self, pos):
         return (
-            int(math.floor(pos.x / Config.CHUNK_SIZE)),
-            int(math.floor(pos.y / Config.CHUNK_SIZE)),
-            int(math.floor(pos.z / Config.CHUNK_SIZE))
+            int(math.floor(pos[0] / Config.CHUNK_SIZE)),
+            int(math.floor(pos[1] / Config.CHUNK_SIZE)),
+            int(math.floor(pos[2] / Config.CHUNK_SIZE))
         )
         
-    def update(self, player_pos):
-        current = self.get_chunk_coords(player_pos)
-        
-        needed = set()
-        for dx in range(-Config.RENDER_DISTANCE, Config.RENDER_DISTANCE + 1):
-            for dz in range(-Config.RENDER_DISTANCE, Config.RENDER_DISTANCE + 1):
-                if dx*dx + dz*dz <= Config.RENDER_DISTANCE**2:
-                    needed.add((current[0]+dx, 0, current[2]+dz))
+    def instantiate_chunk(self, record):
+        # Stars that died before now are already remnants; later deaths
+        # are scheduled for as long as the chunk stays loaded
+        record, upcoming = resolve_chunk(record, universe_clock.time)
+        chunk = UniverseChunk(record.coords)
+        chunk.generate(record)
+        self.add_chunk(chunk)
+        universe_events.track(chunk.coords, upcoming)
+        
+    def add_chunk(self, chunk):
+        self.chunks[chunk.coords] = chunk
+        for obj in chunk.objects:
+            self.add_body(obj)
+            
+    def add_body(self, obj):
+        self.index.insert(obj, obj.record.position, obj.record.kind, obj.scale_x)
+        self.lod.add(obj, obj.record.position, obj.scale_x)
+        gravity.add(obj, obj.record.position, body_mass(obj.record.kind, obj.record.size))
+        collisions.add(obj, obj.record.position, body_radius(obj.record.kind, obj.record.size),
+                       obj.record.kind)
+        
+    def remove_body(self, obj):
+        self.index.remove(obj)
+        self.lod.remove(obj)
+        gravity.remove(obj)
+        collisions.remove(obj)
+        self.planet_hosts.discard(obj)
+            
+    def remove_chunk(self, coords):
+        chunk = self.chunks.pop(coords)
+        universe_events.drop(coords)
+        for obj in chunk.objects:
+            self.remove_body(obj)
+        chunk.unload()
+        
+    def apply_event(self, event):
+        # A star in a loaded chunk dies: its view and planets go, its
+        # remnants come in
+        chunk = self.chunks[event.coords]
+        star = next(obj for obj in chunk.objects if obj.record.kind == STAR and obj.record.seed == event.seed)
+        remnants = star_remnants(star.record)
+        i = chunk.record.bodies.index(star.record)
+        chunk.record.bodies[i:i + 1] = remnants
+        
+        chunk.invalidate()
+        self.remove_body(star)
+        chunk.objects.remove(star)
+        star.chunk = None
+        star.cleanup()
+        for body in remnants:
+            obj = VIEW_POOLS[body.kind].acquire(body)
+            obj.chunk = chunk
+            chunk.objects.append(obj)
+            self.add_body(obj)
+        return star.record
+        
+    def update(self, player_pos, velocity=(0, 0, 0)):
+        abs_pos = floating_origin.get_absolute_position(player_pos)
+        current = self.get_chunk_coords(abs_pos)
+        if Config.UNIVERSE_LAYOUT == 'flat':
+            current = (current[0], 0, current[2])
+            
+        # Empty chunks are never requested, so streaming cost follows content
+        if current != self.current:
+            needed = {tuple(c) for c in chunks_around(current, Config.RENDER_DISTANCE).tolist()}
+            # Jumps aren't travel, so they don't count against the prefetcher
+            travelled = self.current is not None and max(abs(a - b) for a, b in zip(current, self.current)) <= 1
+            if self.prefetcher.path and travelled:
+                self.prefetcher.score('loaded' if c in self.chunks else self.streamer.status(c)
+                                      for c in needed - self.needed)
+            self.current = current
+            self.needed = needed
+        needed = self.needed
                         
-        for coords in needed:
-            if coords not in self.chunks:
-                chunk = UniverseChunk(coords)
-                chunk.generate()
-                self.chunks[coords] = chunk
+        def chunk_dist(coords):
+            return sum((a - b) ** 2 for a, b in zip(coords, current))
+            
+        # At speed, chunks along the predicted path are generated ahead of
+        # time. The ones that would survive unloading are loaded early too.
+        reach = max(Config.UNLOAD_DISTANCE, Config.RENDER_DISTANCE) ** 2
+        with profiler.scope('universe.prefetch'):
+            path = self.prefetcher.predict(abs_pos, velocity, current)
+            soon = [c for c in path if chunk_dist(c) <= reach]
+            later = [c for c in path if chunk_dist(c) > reach]
+            
+        # Loading is centred a little ahead of the ship, so chunks in front
+        # come first and the ones behind it last
+        lead = self.prefetcher.lead(abs_pos, velocity, Config.PREFETCH_LEAD,
+                                    Config.RENDER_DISTANCE * Config.CHUNK_SIZE)
+        lead = (lead / Config.CHUNK_SIZE - 0.5).tolist()
+        
+        def priority(coords):
+            return sum((a - b) ** 2 for a, b in zip(coords, lead))
+            
+        # Generation runs on the worker pool
+        with profiler.scope('universe.chunks'):
+            requested = self.streamer.requested + self.streamer.prefetched
+            self.streamer.cancel_stale(needed.union(path))
+            missing = sorted({c for c in needed.union(soon) if c not in self.chunks}, key=priority)
+            self.streamer.request(missing)
+            self.streamer.prefetch(later)
+            self.streamer.collect()
+            loaded = self.streamer.take(Config.CHUNK_BUDGET_MS, self.instantiate_chunk, priority)
+            profiler.count('chunks_generated', self.streamer.requested + self.streamer.prefetched - requested)
+            profiler.count('chunks_loaded', loaded)
                 
-        to_remove = [c for c in self.chunks if c not in needed]
-        for coords in to_remove:
-            self.chunks[coords].unload()
-            del self.chunks[coords]
+        # Live chunks are only dropped past the larger unload radius, so
+        # hovering on a chunk border doesn't thrash
+        with profiler.scope('universe.unload'):
+            to_remove = [c for c in self.chunks if chunk_dist(c) > reach]
+            for coords in to_remove:
+                self.remove_chunk(coords)
+            profiler.count('chunks_unloaded', len(to_remove))
+            
+        # One distance pass drives LOD levels and planet unloading
+        with profiler.scope('universe.lod'):
+            self.lod.update(abs_pos)
+        with profiler.scope('universe.batching'):
+            self.rebuild_batches()
             
         # Load/unload planets
-        for chunk in self.chunks.values():
-            for obj in chunk.objects:
-                if isinstance(obj, Star):
-                    dist = (obj.position - player_pos).length()
-                    if dist < Config.PLANET_LOAD_DIST and not obj.planets_loaded:
-                        obj.load_planets()
-                    elif dist > Config.PLANET_UNLOAD_DIST and obj.planets_loaded:
-                        obj.unload_planets()
+        with profiler.scope('planets.load'):
+            for star, dist in self.index.within(abs_pos, Config.PLANET_LOAD_DIST, STAR):
+                if not star.planets_loaded:
+                    star.load_planets()
+                    self.planet_hosts.add(star)
+                
+        with profiler.scope('planets.unload'):
+            for star in list(self.planet_hosts):
+                if self.lod.distance(star) > Config.PLANET_UNLOAD_DIST:
+                    star.unload_planets()
+                    self.planet_hosts.discard(star)
                         
-    def get_nearest(self, pos, max_dist=5000):
-        nearest = None
-        nearest_dist = max_dist
-        
+    def rebuild_batches(self):
+        # Chunks are batched once their LOD levels have held still for a few
+        # frames, within a per-frame budget
+        self.frame += 1
+        settled = self.frame - Config.BATCH_SETTLE_FRAMES
+        deadline = time.perf_counter() + Config.BATCH_BUDGET_MS / 1000
         for chunk in self.chunks.values():
-            for obj in chunk.objects:
-                d = (obj.position - pos).length()
-                if d < nearest_dist:
-                    nearest = obj
-                    nearest_dist = d
+            if chunk.dirty_frame is not None and chunk.dirty_frame <= settled and chunk.objects:
+                chunk.rebuild()
+                if time.perf_counter() >= deadline:
+                    break
                     
-        return nearest, nearest_dist
+    def batch_report(self):
+        batches = [c.batch for c in self.chunks.values() if c.batch.built]
+        before = sum(b.geoms_before for b in batches)
+        after = sum(b.geoms_after for b in batches)
+        nodes_before = sum(b.nodes_before for b in batches)
+        nodes_after = sum(b.nodes_after for b in batches)
+        builds = sum(b.builds for b in batches)
+        return (f"{'Batching':<10} chunks {len(batches):>4}/{len(self.chunks):<4} | "
+                f"nodes {nodes_before} -> {nodes_after} | draw calls {before} -> {after} | builds {builds}")
+        
+    def get_nearest(self, pos, max_dist=5000, kind=None):
+        abs_pos = floating_origin.get_absolute_position(pos)
+        return self.index.nearest(abs_pos, max_dist, kind)
+        
+    def get_k_nearest(self, pos, k, max_dist=5000, kind=None):
+        abs_pos = floating_origin.get_absolute_position(pos)
+        return self.index.k_nearest(abs_pos, k, max_dist, kind)
+        
+    def get_within(self, pos, radius, kind=None):
+        abs_pos = floating_origin.get_absolute_position(pos)
+        return self.index.within(abs_pos, radius, kind)
 
-universe = Universe()
+universe = None  # created by init()
 
 # ══════════════════════════════════════════════════════════════════
 # SPACESHIP
@@ -626,11 +908,23 @@ class Spaceship(Entity):
         )
         
         self.target = None
+        self.target_record = None
+        self.catalog_query = None
         self.autopilot = False
         
+        # Simulated positions in render space; position itself is interpolated
+        self.sim_position = Vec3(0, 0, 0)
+        self.prev_position = Vec3(0, 0, 0)
+        self.rendered = Vec3(0, 0, 0)
+        self.drift = Vec3(0, 0, 0)
+        
+    @property
+    def velocity(self):
+        # Thrust plus gravity drift, in units per second
+        return self.forward * self.speed + self.drift
+        
     def update(self):
-        max_speed = self.max_speeds[self.mode]
-        accel = self.accels[self.mode]
+        # Steering runs per frame; motion is simulated in fixed steps
         dt = time.dt * effects.time_dilation
         
         # Mouse look
@@ -645,6 +939,62 @@ class Spaceship(Entity):
         if held_keys['e']:
             self.rotation_z -= dt * 50
             
+        if self.catalog_query is not None and self.catalog_query.done():
+            self.target = None
+            self.target_record = self.catalog_query.result()[0]
+            self.catalog_query = None
+            
+        # Pooled entities get recycled, so a target that was unloaded is
+        # followed by its record instead
+        if self.target and (not self.target.enabled or self.target.record is not self.target_record):
+            self.target = None
+            
+        # Autopilot
+        target = self.target_position()
+        if self.autopilot and target is not None:
+            direction = (target - self.position).normalized()
+            target_y = math.degrees(math.atan2(direction.x, direction.z))
+            target_x = math.degrees(math.asin(-direction.y))
+            self.rotation_y = lerp(self.rotation_y, target_y, dt * 2)
+            self.rotation_x = lerp(self.rotation_x, target_x, dt * 2)
+            
+        # Engine color
+        max_speed = self.max_speeds[self.mode]
+        mode_colors = [color.cyan, color.lime, color.orange, color.magenta]
+        self.engine.color = mode_colors[self.mode]
+        self.engine.scale = 0.3 + (abs(self.speed) / max_speed) * 0.3
+        
+    def target_position(self):
+        if self.target:
+            return self.target.world_position
+        if self.target_record:
+            return floating_origin.to_render(self.target_record.position)
+        return None
+        
+    def target_catalog(self, **filters):
+        # Nearest match anywhere in catalog range, loaded or not. The search
+        # runs in the background and update() targets what it finds.
+        self.cancel_catalog()
+        self.catalog_query = catalog.submit('nearest', floating_origin.get_absolute_position(self.position),
+                                            alive_at=universe_clock.time, **filters)
+        
+    def cancel_catalog(self):
+        if self.catalog_query is not None:
+            self.catalog_query.cancel()
+            self.catalog_query = None
+        
+    def sync_position(self):
+        # Anything that moved the ship directly (R, a teleport) wins over
+        # the simulated state
+        if (self.position - self.rendered).length_squared() > 1e-6:
+            self.sim_position = Vec3(self.position)
+            self.prev_position = Vec3(self.position)
+            self.drift = Vec3(0, 0, 0)
+            
+    def simulate(self, dt):
+        max_speed = self.max_speeds[self.mode]
+        accel = self.accels[self.mode]
+        
         # Thrust
         if held_keys['w']:
             self.speed = min(self.speed + accel * dt, max_speed)
@@ -666,29 +1016,38 @@ class Spaceship(Entity):
         if held_keys['left shift']:
             movement -= self.up * strafe * dt
             
-        # Gravity
-        movement += effects.gravity_pull * dt
+        # Gravity accelerates a drift velocity, damped like the thrust
+        self.drift = (self.drift + effects.gravity_pull * dt) * 0.99
+        movement += self.drift * dt
+        
+        # Swept against every loaded body, so no speed can tunnel through
+        # one. A hit stops the ship at the surface.
+        start = floating_origin.get_absolute_position(self.sim_position)
+        end = [a + float(m) for a, m in zip(start, movement)]
+        hit = collisions.sweep(self, start, end, Config.SHIP_RADIUS, dt)
+        if hit is not None:
+            movement *= hit.time
+            self.speed = 0
+            self.drift = Vec3(0, 0, 0)
+            
+        self.prev_position = self.sim_position
+        self.sim_position = self.sim_position + movement
         
-        self.position += movement
+    def present(self, alpha):
+        # Drawn between the last two simulated positions
+        self.position = self.prev_position + (self.sim_position - self.prev_position) * alpha
         
-        # Autopilot
-        if self.autopilot and self.target:
-            direction = (self.target.position - self.position).normalized()
-            target_y = math.degrees(math.atan2(direction.x, direction.z))
-            target_x = math.degrees(math.asin(-direction.y))
-            self.rotation_y = lerp(self.rotation_y, target_y, dt * 2)
-            self.rotation_x = lerp(self.rotation_x, target_x, dt * 2)
-            
         # Floating origin
-        shift = floating_origin.update(self.position)
+        with profiler.scope('floating_origin'):
+            shift = floating_origin.update(self.position)
         if shift.length_squared() > 0:
             self.position -= shift
-            background_stars.position -= shift
+            self.sim_position = self.sim_position - shift
+            self.prev_position = self.prev_position - shift
+            if background_stars is not None:
+                background_stars.position -= shift
             
-        # Engine color
-        mode_colors = [color.cyan, color.lime, color.orange, color.magenta]
-        self.engine.color = mode_colors[self.mode]
-        self.engine.scale = 0.3 + (abs(self.speed) / max_speed) * 0.3
+        self.rendered = Vec3(self.position)
         
     def input(self, key):
         if key == '1':
@@ -706,7 +1065,16 @@ class Spaceship(Entity):
             self.speed = 0
         elif key == 't':
             obj, dist = universe.get_nearest(self.position)
-            self.target = obj
+            if obj:
+                self.cancel_catalog()
+                self.target = obj
+                self.target_record = obj.record
+            else:
+                self.target_catalog()
+        elif key == 'g':
+            self.target_catalog(star_type='Blue Giant')
+        elif key == 'b':
+            self.target_catalog(kind=BLACK_HOLE)
         elif key == 'y':
             self.autopilot = not self.autopilot
         elif key == 'r':
@@ -727,7 +1095,7 @@ class HUD(Entity):
         self.near_info = Text(position=(-0.85, 0.25), scale=0.9, color=color.lime)
         
         Text(
-            text='WASD:Fly | QE:Roll | 1-4:Speed | I:Boost | T:Target | Y:Auto | X:Stop | R:Jump',
+            text='WASD:Fly | QE:Roll | 1-4:Speed | I:Boost | T/G/B:Target | Y:Auto | X:Stop | R:Jump',
             position=(0, -0.47),
             origin=(0, 0),
             scale=0.6,
@@ -738,6 +1106,10 @@ class HUD(Entity):
         Entity(parent=camera.ui, model='quad', scale=0.005, color=color.white)
         
     def update(self):
+        with profiler.scope('hud'):
+            self.refresh()
+            
+    def refresh(self):
         speed = abs(self.ship.speed)
         mode = self.ship.modes[self.ship.mode]
         
@@ -746,55 +1118,51 @@ class HUD(Entity):
         else:
             speed_str = f'{speed:.0f}'
             
-        self.info.text = f'Speed: {speed_str} | Mode: {mode}'
+        set_text(self.info, f'Speed: {speed_str} | Mode: {mode}')
         
         # Target
-        if self.ship.target:
-            dist = (self.ship.target.position - self.ship.position).length()
+        target = self.ship.target_position()
+        if target is not None:
+            dist = (target - self.ship.position).length()
+            name = self.ship.target_record.name
             auto = ' [AUTO]' if self.ship.autopilot else ''
             if dist > 1000:
-                self.target_info.text = f'Target: {self.ship.target.star_name} | {dist/1000:.1f}k{auto}'
+                set_text(self.target_info, f'Target: {name} | {dist/1000:.1f}k{auto}')
             else:
-                self.target_info.text = f'Target: {self.ship.target.star_name} | {dist:.0f}{auto}'
+                set_text(self.target_info, f'Target: {name} | {dist:.0f}{auto}')
         else:
-            self.target_info.text = 'No target (T)'
+            set_text(self.target_info, 'No target (T)')
             
         # Nearest
         obj, dist = universe.get_nearest(self.ship.position, 3000)
         if obj:
             if dist > 1000:
-                self.near_info.text = f'Near: {obj.type_name} | {dist/1000:.1f}k'
+                set_text(self.near_info, f'Near: {obj.type_name} | {dist/1000:.1f}k')
             else:
-                self.near_info.text = f'Near: {obj.type_name} | {dist:.0f}'
+                set_text(self.near_info, f'Near: {obj.type_name} | {dist:.0f}')
         else:
-            self.near_info.text = ''
+            set_text(self.near_info, '')
 
 # ══════════════════════════════════════════════════════════════════
-# WARP EFFECT (reduced particles)
+# WARP EFFECT (one particle buffer, thousands of streaks)
 # ══════════════════════════════════════════════════════════════════
 
 class WarpEffect(Entity):
     def __init__(self, ship):
         super().__init__(parent=ship)
         self.ship = ship
-        self.streaks = []
-        
-        for _ in range(30):  # Reduced from 100
-            streak = Entity(
-                parent=self,
-                model='cube',
-                scale=(0.01, 0.01, 0.5),
-                position=(
-                    random.uniform(-6, 6),
-                    random.uniform(-6, 6),
-                    random.uniform(10, 40)
-                ),
-                color=color.cyan,
-                unlit=True,
-                enabled=False
-            )
-            streak.start_z = streak.z
-            self.streaks.append(streak)
+        self.streaks = ParticleSystem(Config.WARP_STREAKS, parent=self, name='warp_streaks')
+        self.streaks.node.hide()
+        
+        # Streaks live forever and wrap around, Warp mode shows a quarter
+        self.streaks.position[:] = self.spawn(Config.WARP_STREAKS)
+        
+    def spawn(self, count):
+        return np.column_stack([
+            np.random.uniform(-6, 6, count),
+            np.random.uniform(-6, 6, count),
+            np.random.uniform(10, 40, count),
+        ])
             
     def update(self):
         mode = self.ship.mode
@@ -802,64 +1170,286 @@ class WarpEffect(Entity):
         max_speed = self.ship.max_speeds[mode]
         ratio = speed / max_speed if max_speed > 0 else 0
         
-        active = mode >= 2 and ratio > 0.2
+        streaks = self.streaks
+        if not (mode >= 2 and ratio > 0.2):
+            streaks.node.hide()
+            return
+            
+        active = Config.WARP_STREAKS if mode == 3 else Config.WARP_STREAKS // 4
+        streaks.life[:active] = np.inf
+        streaks.life[active:] = 0
+        streaks.color[:] = color.magenta if mode == 3 else color.cyan
+        streaks.velocity[:, 2] = -80 * ratio
+        streaks.length[:] = 0.5 + ratio * 8
+        streaks.step(time.dt)
+        
+        wrapped = np.flatnonzero(streaks.position[:, 2] < -5)
+        streaks.position[wrapped] = self.spawn(len(wrapped))
+        
+        streaks.upload()
+        streaks.node.show()
+
+# ══════════════════════════════════════════════════════════════════
+# ENGINE EXHAUST
+# ══════════════════════════════════════════════════════════════════
+
+class EngineExhaust(Entity):
+    def __init__(self, ship):
+        super().__init__(parent=ship)
+        self.ship = ship
+        self.particles = ParticleSystem(Config.EXHAUST_PARTICLES, parent=self, name='exhaust')
+        self.nozzle = np.array([0, 0, 0.6])
+        self.carry = 0.0
         
-        for streak in self.streaks:
-            streak.enabled = active
-            if active:
-                streak.color = color.magenta if mode == 3 else color.cyan
-                streak.z -= time.dt * 80 * ratio
-                streak.scale_z = 0.5 + ratio * 8
-                
-                if streak.z < -5:
-                    streak.z = streak.start_z
-                    streak.x = random.uniform(-6, 6)
-                    streak.y = random.uniform(-6, 6)
+    def update(self):
+        ship = self.ship
+        ratio = abs(ship.speed) / ship.max_speeds[ship.mode]
+        
+        # Emission rate follows throttle, the fraction carries between frames
+        self.carry += Config.EXHAUST_PARTICLES * ratio * time.dt * 2
+        count = int(self.carry)
+        self.carry -= count
+        
+        if count:
+            spread = np.random.uniform(-1, 1, (count, 3)) * (1, 1, 0)
+            velocity = spread + (0, 0, -(6 + 20 * ratio))
+            self.particles.emit(count, self.nozzle, velocity, ship.engine.color,
+                                length=0.3 + ratio, life=np.random.uniform(0.2, 0.5, count))
+        self.particles.update(time.dt)
 
 # ══════════════════════════════════════════════════════════════════
 # START
 # ══════════════════════════════════════════════════════════════════
 
-ship = Spaceship()
-ship.position = Vec3(2000, 0, 2000)
+# Middle of the start chunk, in the layer itself for the flat layout
+START_POSITION = (2000, 0 if Config.UNIVERSE_LAYOUT == 'flat' else 2000, 2000)
 
-hud = HUD(ship)
-warp = WarpEffect(ship)
+ship = hud = warp = exhaust = None  # created by init()
 
-mouse.locked = True
-window.fps_counter.enabled = True
-window.fullscreen = True
+# ══════════════════════════════════════════════════════════════════
+# PROFILER OVERLAY (F3)
+# ══════════════════════════════════════════════════════════════════
 
-Text(
-    text='UNIVERSE SIMULATOR',
-    position=(0, 0.47),
-    origin=(0, 0),
-    scale=1.2,
-    color=color.white
-)
+class ProfilerOverlay(Entity):
+    def __init__(self):
+        super().__init__(parent=camera.ui)
+        self.label = Text(position=(0.35, 0.45), scale=0.8, color=color.lime, enabled=False)
+        self.refresh_in = 0
+        
+    def toggle(self):
+        self.label.enabled = not self.label.enabled
+        self.refresh_in = 0
+        
+    def update(self):
+        if not self.label.enabled:
+            return
+            
+        # Refreshed twice a second, the overlay shouldn't be a hot path itself
+        self.refresh_in -= time.dt
+        if self.refresh_in > 0:
+            return
+        self.refresh_in = 0.5
+        
+        frame = profiler.frame_stats()
+        lines = [f"frame {frame['mean']:.1f} ms | max {frame['max']:.1f} | {frame['fps']:.0f} fps", ""]
+        for name, stats in profiler.worst():
+            lines.append(f"{name:<18} {stats['mean']:6.2f} | max {stats['max']:6.2f}")
+            
+        counters = profiler.counter_stats()
+        if counters:
+            lines += [
+                "",
+                f"chunks/s {counters['chunks_generated']['per_second']:.1f} | "
+                f"prefetch hits {universe.prefetcher.hit_rate():.0%}",
+                f"entities {counters['entities']['last']:.0f} | origin {counters['origin_entities']['last']:.0f}",
+                f"sim steps/frame {counters['sim_steps']['mean']:.2f} | dropped {sim_clock.dropped_steps}",
+            ]
+        set_text(self.label, "\n".join(lines))
+
+profiler_overlay = None  # created by init()
+
+def simulate(dt):
+    # Gravity, ship motion and orbits advance in fixed steps, so their
+    # results don't depend on the frame rate
+    ship.sync_position()
+    with profiler.scope('gravity.build'):
+        gravity.build()
+    steps = sim_clock.advance(dt)
+    for _ in range(steps):
+        with profiler.scope('effects'):
+            effects.update(ship.sim_position)
+        step = sim_clock.step * effects.time_dilation
+        ship.simulate(step)
+        orbits.step(step)
+        universe_clock.advance(step)
+    ship.present(sim_clock.alpha)
+    profiler.gauge('sim_steps', steps)
 
 def update():
-    universe.update(ship.position)
-    effects.update(ship.position)
+    profiler.frame()
+    if 'interactive' not in startup:
+        finish_startup()
+    with profiler.scope('update'):
+        with profiler.scope('universe'):
+            universe.update(ship.position, ship.velocity)
+        with profiler.scope('simulation'):
+            simulate(time.dt)
+        with profiler.scope('orbits'):
+            orbits.write(sim_clock.alpha)
+            moved = floating_origin.from_world(orbits.last_positions)
+            gravity.sync(orbits.nodes, moved)
+            collisions.sync(orbits.nodes, moved)
+            planet_lod.sync(orbits.nodes, orbits.last_positions)
+            viewer = floating_origin.to_world(floating_origin.get_absolute_position(ship.position))
+            planet_lod.update(viewer)
+        with profiler.scope('belts'):
+            asteroid_belts.update_lod(viewer)
+            asteroid_belts.write(universe_clock.at(sim_clock.alpha))
+        with profiler.scope('events'):
+            # Only loaded chunks have events queued, so this is one heap
+            # peek on most frames
+            ship_pos = floating_origin.get_absolute_position(ship.position)
+            for event in universe_events.due(universe_clock.time):
+                star = universe.apply_event(event)
+                if math.dist(star.position, ship_pos) < Config.EVENT_NOTICE_DISTANCE:
+                    effects.announce(f"⚠ {EVENT_NAMES[event.kind].upper()}: {star.name.upper()} ⚠")
+        with profiler.scope('collisions'):
+            collisions.update()
+            events = collisions.drain()
+            for event in events:
+                if event.a is ship:
+                    effects.collide(event)
+            profiler.count('collisions', len(events))
+            
+    profiler.gauge('entities', len(scene.entities))
+    profiler.gauge('origin_entities', len(floating_origin.entities))
 
 def input(key):
     if key == 'escape':
         mouse.locked = not mouse.locked
+    elif key == 'p':
+        print(pool_report())
+        print(universe.streamer.cache.report())
+        print(universe.prefetcher.report())
+        print(universe.lod.report('Body LOD'))
+        print(planet_lod.report('Planet LOD'))
+        print(universe.batch_report())
+        print(gravity.report())
+        print(collisions.report())
+        print(asteroid_belts.report())
+        print(universe_events.report())
+        print(catalog.report())
+        print(startup.report())
+    elif key == 'f3':
+        profiler_overlay.toggle()
+    elif key == 'f4':
+        profiler.export_csv('profile.csv')
+        profiler.export_chrome_trace('profile_trace.json')
+        print("Profile written to profile.csv and profile_trace.json")
+
+# ══════════════════════════════════════════════════════════════════
+# STARTUP
+# init() opens the window and builds what the first frame needs. The
+# starfield waits until that frame is out, and chunks stream in as usual,
+# so the window is live before the universe around it is complete.
+# ══════════════════════════════════════════════════════════════════
+
+def print_banner():
+    print("\n" + "="*50)
+    print("         UNIVERSE SIMULATOR (OPTIMIZED)")
+    print("="*50)
+    print("  WASD       - Fly")
+    print("  Q/E        - Roll")
+    print("  Space/Shift- Up/Down")
+    print("  1-4        - Speed modes")
+    print("  I          - INSTANT BOOST")
+    print("  T          - Target nearest")
+    print("  G / B      - Target nearest Blue Giant / black hole, anywhere")
+    print("  Y          - Autopilot")
+    print("  X          - Stop")
+    print("  R          - Emergency jump")
+    print("  P          - Print pool, cache, prefetch, LOD, batching, physics and catalog stats")
+    print("  F3 / F4    - Profiler overlay / export")
+    print("="*50)
+    print("  Stars appear as specks - press I to boost!")
+    print("="*50 + "\n")
+
+def create_systems():
+    global profiler, orbits, sim_clock, universe_clock, universe_events, gravity, collisions
+    global asteroid_belts, catalog, planet_lod
+    profiler = Profiler(Config.PROFILER_EVENTS, Config.PROFILER_FRAMES, Config.PROFILER)
+    orbits = OrbitSystem()
+    sim_clock = SimulationClock(Config.SIM_STEP, Config.SIM_MAX_STEPS)
+    universe_clock = UniverseClock(Config.UNIVERSE_START_TIME)
+    universe_events = EventScheduler()
+    gravity = GravitySystem(Config.GRAVITY_THETA, Config.GRAVITY_G, Config.GRAVITY_SOFTENING,
+                            Config.GRAVITY_REFIT_SLACK)
+    collisions = CollisionSystem()
+    asteroid_belts = BeltSystem(Config.BELT_LOD_RATIOS, Config.BELT_DENSITY, Config.LOD_HYSTERESIS)
+    catalog = Catalog(Config.CATALOG_BATCH, Config.CATALOG_SECTORS, Config.CATALOG_RANGE,
+                      threaded=Config.CHUNK_WORKERS > 0)
+    planet_lod = LODSystem(Config.LOD_RATIOS, Config.LOD_HYSTERESIS)
+    build_lod_nodes()
+    build_pools()
+
+def init():
+    global app, floating_origin, effects, universe, ship, hud, warp, exhaust, profiler_overlay
+    startup.mark('import')
+    app = Ursina(title='Universe Simulator', borderless=False, window_type=Config.WINDOW_TYPE)
+    # A clear colour instead of a black Sky entity, which set up every
+    # shader Ursina ships before the first frame
+    window.color = color.black
+    startup.mark('window')
+    
+    create_systems()
+    startup.mark('systems')
+    
+    floating_origin = FloatingOrigin()
+    effects = Effects()
+    universe = Universe()
+    
+    ship = Spaceship()
+    ship.position = Vec3(*START_POSITION)
+    hud = HUD(ship)
+    warp = WarpEffect(ship)
+    exhaust = EngineExhaust(ship)
+    
+    window.fps_counter.enabled = True
+    if Config.WINDOW_TYPE == 'onscreen':
+        mouse.locked = True
+        window.fullscreen = True
+        
+    Text(
+        text='UNIVERSE SIMULATOR',
+        position=(0, 0.47),
+        origin=(0, 0),
+        scale=1.2,
+        color=color.white
+    )
+    profiler_overlay = ProfilerOverlay()
+    startup.mark('scene')
+    print_banner()
+    return app
+
+def finish_startup():
+    # Called every frame until the universe around the ship is ready
+    global background_stars
+    if 'first_update' not in startup:
+        startup.mark('first_update')
+        return
+    startup.mark('first_frame')
+    if background_stars is None:
+        background_stars = build_starfield(Config.BACKGROUND_STARS)
+        startup.mark('starfield')
+    if universe.chunks:
+        startup.mark('first_chunk')
+    if universe.current is not None and universe.needed.issubset(universe.chunks):
+        startup.mark('interactive')
+        print(startup.report())
+
+def main():
+    init()
+    app.run()
 
-print("\n" + "="*50)
-print("         UNIVERSE SIMULATOR (OPTIMIZED)")
-print("="*50)
-print("  WASD       - Fly")
-print("  Q/E        - Roll")
-print("  Space/Shift- Up/Down")
-print("  1-4        - Speed modes")
-print("  I          - INSTANT BOOST")
-print("  T          - Target nearest")
-print("  Y          - Autopilot")
-print("  X          - Stop")
-print("  R          - Emergency jump")
-print("="*50)
-print("  Stars appear as specks - press I to boost!")
-print("="*50 + "\n")
-
-app.run()
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+# Panda3D geometry built straight from NumPy arrays. One GeomNode holds any
+# number of points/triangles, so large fields cost a single scene-graph node
+# and draw call. Vertex rows are written through the buffer protocol, which
+# avoids the per-vertex Python loop of ursina.Mesh.
+
+import numpy as np
+from panda3d.core import (
+    Geom, GeomLines, GeomNode, GeomPoints, GeomTriangles, GeomVertexArrayFormat,
+    GeomVertexData, GeomVertexFormat, InternalName,
+)
+
+_array_format = GeomVertexArrayFormat()
+_array_format.add_column(InternalName.get_vertex(), 3, Geom.NT_float32, Geom.C_point)
+_array_format.add_column(InternalName.get_color(), 4, Geom.NT_float32, Geom.C_color)
+VERTEX_FORMAT = GeomVertexFormat.register_format(GeomVertexFormat(_array_format))
+
+
+def _write_rows(array_data, rows):
+    array_data.unclean_set_num_rows(len(rows))
+    memoryview(array_data).cast('B')[:] = np.ascontiguousarray(rows).tobytes()
+
+
+def _vertex_rows(vertices, colors):
+    rows = np.empty((len(vertices), 7), dtype=np.float32)
+    rows[:, :3] = vertices
+    rows[:, 3:] = colors
+    return rows
+
+
+def make_geom_node(name, vertices, colors, triangles=None, dynamic=False, lines=False):
+    # vertices (N, 3), colors (N, 4) or (4,), triangles (M, 3) vertex indices.
+    # With lines=True each consecutive vertex pair is a line segment, and
+    # without triangles the vertices are drawn as a point cloud.
+    usage = Geom.UH_dynamic if dynamic else Geom.UH_static
+    vdata = GeomVertexData(name, VERTEX_FORMAT, usage)
+    _write_rows(vdata.modify_array(0), _vertex_rows(vertices, colors))
+
+    if lines:
+        prim = GeomLines(usage)
+        prim.add_consecutive_vertices(0, len(vertices))
+    elif triangles is None:
+        prim = GeomPoints(usage)
+        prim.add_consecutive_vertices(0, len(vertices))
+    else:
+        prim = GeomTriangles(usage)
+        prim.set_index_type(Geom.NT_uint32)
+        _write_rows(prim.modify_vertices(), np.asarray(triangles, dtype=np.uint32).ravel())
+
+    geom = Geom(vdata)
+    geom.add_primitive(prim)
+    node = GeomNode(name)
+    node.add_geom(geom)
+    return node
+
+
+def update_geom_node(node, vertices, colors):
+    # Rewrites the vertex buffer in place. The row count must not change.
+    vdata = node.modify_geom(0).modify_vertex_data()
+    _write_rows(vdata.modify_array(0), _vertex_rows(vertices, colors))
+
+
+def vertex_rows(node):
+    # Writable (rows, 7) float32 view of a node's vertex buffer: xyz, then
+    # rgba. Take a fresh view each frame; the buffer can be reallocated.
+    array = node.modify_geom(0).modify_vertex_data().modify_array(0)
+    return np.frombuffer(memoryview(array).cast('B'), dtype=np.float32).reshape(-1, 7)
+
+
+def set_triangles(node, triangles):
+    # Replaces the index buffer; the count may change, the vertices don't
+    prim = node.modify_geom(0).modify_primitive(0)
+    _write_rows(prim.modify_vertices(), np.asarray(triangles, dtype=np.uint32).ravel())
+
+
+def billboard_quads(centers, sizes, facing=(0, 0, 0)):
+    # Merged quads, each turned to face the `facing` point. Returns
+    # (vertices (4N, 3), triangles (2N, 3)).
+    centers = np.asarray(centers, dtype=np.float32)
+    normal = centers - np.asarray(facing, dtype=np.float32)
+    normal /= np.linalg.norm(normal, axis=1, keepdims=True)
+
+    up = np.zeros_like(normal)
+    up[:, 1] = 1
+    up[np.abs(normal[:, 1]) > 0.99] = (1, 0, 0)
+
+    right = np.cross(up, normal)
+    right /= np.linalg.norm(right, axis=1, keepdims=True)
+    up = np.cross(normal, right)
+
+    half = (np.asarray(sizes, dtype=np.float32) * 0.5)[:, None]
+    right *= half
+    up *= half
+
+    vertices = np.stack([
+        centers - right - up,
+        centers + right - up,
+        centers + right + up,
+        centers - right + up,
+    ], axis=1).reshape(-1, 3)
+
+    base = (np.arange(len(centers), dtype=np.uint32) * 4)[:, None]
+    triangles = np.concatenate([base + (0, 1, 2), base + (0, 2, 3)], axis=1).reshape(-1, 3)
+    return vertices, triangles
+
+
+def uv_sphere(rings, segments, radius=0.5):
+    # Latitude/longitude sphere. Returns (vertices, triangles).
+    lat = np.linspace(0, np.pi, rings + 1)[:, None]
+    lon = np.linspace(0, np.pi * 2, segments + 1)[None, :]
+    vertices = np.stack([
+        np.sin(lat) * np.cos(lon),
+        np.cos(lat) * np.ones_like(lon),
+        np.sin(lat) * np.sin(lon),
+    ], axis=-1).reshape(-1, 3) * radius
+
+    row = segments + 1
+    a = (np.arange(rings)[:, None] * row + np.arange(segments)[None, :]).ravel()
+    b = a + row
+    triangles = np.concatenate([
+        np.stack([a, b, a + 1], axis=1),
+        np.stack([a + 1, b, b + 1], axis=1),
+    ])
+    return vertices, triangles
+
+
+def disc(segments, radius=0.5):
+    # Flat triangle fan in the XY plane, facing -Z. Returns (vertices, triangles).
+    angle = np.linspace(0, np.pi * 2, segments, endpoint=False)
+    rim = np.stack([np.cos(angle), np.sin(angle), np.zeros(segments)], axis=1) * radius
+    vertices = np.concatenate([np.zeros((1, 3)), rim])
+
+    i = np.arange(segments)
+    triangles = np.stack([np.zeros(segments, dtype=int), (i + 1) % segments + 1, i + 1], axis=1)
+    return vertices, triangles
@@ -0,0 +1,145 @@
+# Batched orbital motion for every loaded planet and gas giant.
+#
+# Orbit parameters live in contiguous arrays, indexed by slot, and are
+# advanced together in one vectorized step. The results are then written
+# back to the scene graph in a single pass. Parents (the host stars) are kept
+# in their own table, so each star's position is read once per frame
+# however many bodies orbit it.
+#
+# step() advances the simulation state at the fixed simulation rate and keeps
+# the previous angles; write() places the nodes once per rendered frame,
+# interpolated between the two.
+
+import numpy as np
+
+
+class OrbitSystem:
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.nodes = []
+        self.slots = {}
+
+        self.radius = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.angle = np.zeros(capacity)
+        self.prev_angle = np.zeros(capacity)
+        self.spin = np.zeros(capacity)
+        self.heading = np.zeros(capacity)
+        self.prev_heading = np.zeros(capacity)
+        self.parent_index = np.zeros(capacity, dtype=np.int32)
+
+        self.parents = []
+        self.parent_slots = {}
+        self.parent_refs = []
+
+        # World positions from the last write, in slot order
+        self.last_positions = np.zeros((0, 3))
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self):
+        capacity = len(self.radius) * 2
+        for name in ('radius', 'speed', 'angle', 'prev_angle', 'spin', 'heading',
+                     'prev_heading', 'parent_index'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def _add_parent(self, parent):
+        p = self.parent_slots.get(parent)
+        if p is None:
+            p = self.parent_slots[parent] = len(self.parents)
+            self.parents.append(parent)
+            self.parent_refs.append(0)
+        self.parent_refs[p] += 1
+        return p
+
+    def _release_parent(self, p):
+        self.parent_refs[p] -= 1
+        if self.parent_refs[p]:
+            return
+
+        last = len(self.parents) - 1
+        del self.parent_slots[self.parents[p]]
+        if p != last:
+            moved = self.parents[last]
+            self.parents[p] = moved
+            self.parent_refs[p] = self.parent_refs[last]
+            self.parent_slots[moved] = p
+            indices = self.parent_index[:self.count]
+            indices[indices == last] = p
+        self.parents.pop()
+        self.parent_refs.pop()
+
+    def add(self, node, parent, radius, speed, angle, spin=0.0, heading=0.0):
+        if self.count == len(self.radius):
+            self._grow()
+
+        i = self.count
+        self.slots[node] = i
+        self.nodes.append(node)
+        self.radius[i] = radius
+        self.speed[i] = speed
+        self.angle[i] = self.prev_angle[i] = angle
+        self.spin[i] = spin
+        self.heading[i] = self.prev_heading[i] = heading
+        self.parent_index[i] = self._add_parent(parent)
+        self.count += 1
+
+    def remove(self, node):
+        i = self.slots.pop(node, None)
+        if i is None:
+            return
+
+        self._release_parent(self.parent_index[i])
+        last = self.count - 1
+
+        # Swap-remove keeps the arrays dense
+        if i != last:
+            moved = self.nodes[last]
+            self.nodes[i] = moved
+            self.slots[moved] = i
+            for array in (self.radius, self.speed, self.angle, self.prev_angle, self.spin,
+                          self.heading, self.prev_heading, self.parent_index):
+                array[i] = array[last]
+
+        self.nodes.pop()
+        self.count -= 1
+
+    def positions(self, angle=None):
+        n = self.count
+        parent_pos = np.array([p.getPos() for p in self.parents], dtype=np.float64).reshape(-1, 3)
+        centers = parent_pos[self.parent_index[:n]]
+
+        if angle is None:
+            angle = self.angle[:n]
+        radius = self.radius[:n]
+        centers[:, 0] += np.cos(angle) * radius
+        centers[:, 2] += np.sin(angle) * radius
+        return centers
+
+    def step(self, dt):
+        n = self.count
+        self.prev_angle[:n] = self.angle[:n]
+        self.prev_heading[:n] = self.heading[:n]
+        self.angle[:n] += dt * self.speed[:n]
+        self.heading[:n] += dt * self.spin[:n]
+
+    def write(self, alpha=1.0):
+        # alpha blends from the previous step (0) to the latest one (1)
+        n = self.count
+        if not n:
+            self.last_positions = np.zeros((0, 3))
+            return
+
+        angle = self.prev_angle[:n] + (self.angle[:n] - self.prev_angle[:n]) * alpha
+        heading = self.prev_heading[:n] + (self.heading[:n] - self.prev_heading[:n]) * alpha
+
+        pos = self.last_positions = self.positions(angle)
+        # Ursina maps rotation_y to a negated Panda3D heading
+        headings = (-heading).tolist()
+
+        for node, (x, y, z), h in zip(self.nodes, pos.tolist(), headings):
+            node.set_pos_hpr(x, y, z, h, 0, 0)
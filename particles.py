@@ -0,0 +1,86 @@
+# Array-backed particle system.
+#
+# Particle state lives in fixed-capacity NumPy arrays and is drawn as line
+# streaks from a single dynamic vertex buffer, rewritten once per frame. A
+# particle is alive while `life` > 0 (np.inf for ones that never expire).
+# Dead particles collapse to invisible zero-length lines, so the buffer size,
+# and with it the per-frame cost, never changes.
+
+import numpy as np
+from panda3d.core import NodePath, TransparencyAttrib
+
+from meshes import make_geom_node, update_geom_node
+
+
+class ParticleSystem:
+    def __init__(self, capacity, parent=None, name='particles'):
+        self.capacity = capacity
+
+        self.position = np.zeros((capacity, 3), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 3), dtype=np.float32)
+        self.color = np.zeros((capacity, 4), dtype=np.float32)
+        self.length = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+
+        self._vertices = np.zeros((capacity * 2, 3), dtype=np.float32)
+        self._colors = np.zeros((capacity * 2, 4), dtype=np.float32)
+
+        self.geom_node = make_geom_node(name, self._vertices, self._colors, dynamic=True, lines=True)
+        self.node = NodePath(self.geom_node)
+        self.node.set_light_off()
+        self.node.set_transparency(TransparencyAttrib.M_alpha)
+        if parent is not None:
+            self.node.reparent_to(parent)
+
+    def alive(self):
+        return self.life > 0
+
+    def count(self):
+        return int(np.count_nonzero(self.life > 0))
+
+    def emit(self, count, position, velocity, color, length=1.0, life=1.0):
+        # Arguments are per-particle arrays or single values. Returns the
+        # slots used, which may be fewer than `count` when the pool is full.
+        slots = np.flatnonzero(self.life <= 0)[:count]
+        n = len(slots)
+        if n:
+            self.position[slots] = _take(position, n, self.position)
+            self.velocity[slots] = _take(velocity, n, self.velocity)
+            self.color[slots] = _take(color, n, self.color)
+            self.length[slots] = _take(length, n, self.length)
+            self.life[slots] = _take(life, n, self.life)
+        return slots
+
+    def clear(self):
+        self.life[:] = 0
+
+    def step(self, dt):
+        self.position += self.velocity * dt
+        self.life -= dt
+
+    def upload(self):
+        # Heads sit at the particle position, tails trail back along the
+        # velocity and fade out
+        alive = self.life > 0
+        speed = np.linalg.norm(self.velocity, axis=1, keepdims=True)
+        direction = np.divide(self.velocity, speed, out=np.zeros_like(self.velocity), where=speed > 0)
+        tail = self.position - direction * (self.length * alive)[:, None]
+
+        self._vertices[0::2] = self.position
+        self._vertices[1::2] = tail
+        self._colors[0::2] = self.color
+        self._colors[0::2, 3] *= alive
+        self._colors[1::2] = self._colors[0::2]
+        self._colors[1::2, 3] = 0
+
+        update_geom_node(self.geom_node, self._vertices, self._colors)
+
+    def update(self, dt):
+        self.step(dt)
+        self.upload()
+
+
+def _take(value, n, target):
+    # Per-particle arrays are cut to the free slots, single values broadcast
+    value = np.asarray(value, dtype=np.float32)
+    return value[:n] if value.ndim == target.ndim else value
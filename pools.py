@@ -0,0 +1,62 @@
+# Typed object pools for scene entities.
+#
+# Released objects are parked (disabled) instead of destroyed. acquire()
+# re-skins a parked one through its reset() method, and only builds a new
+# object when the pool is empty. Pooled classes implement:
+#   reset(*args) - take on a new identity and become visible
+#   park()       - hide and detach from per-frame systems
+# Anything released beyond max_size is handed to `destroy` for real.
+
+
+class EntityPool:
+    def __init__(self, factory, destroy, max_size=256, name=None):
+        self.factory = factory
+        self.destroy = destroy
+        self.max_size = max_size
+        self.name = name or getattr(factory, '__name__', 'pool')
+        self.free = []
+
+        self.live = 0
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    def acquire(self, *args):
+        self.live += 1
+        if self.free:
+            self.hits += 1
+            obj = self.free.pop()
+            obj.reset(*args)
+            return obj
+
+        self.misses += 1
+        return self.factory(*args)
+
+    def release(self, obj):
+        self.live -= 1
+        if len(self.free) >= self.max_size:
+            self.dropped += 1
+            self.destroy(obj)
+            return
+
+        obj.park()
+        self.free.append(obj)
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'live': self.live,
+            'free': len(self.free),
+            'hits': self.hits,
+            'misses': self.misses,
+            'dropped': self.dropped,
+            'hit_rate': self.hit_rate(),
+        }
+
+    def report(self):
+        return (f"{self.name:<10} live {self.live:>4} | free {len(self.free):>4} | "
+                f"hit rate {self.hit_rate() * 100:5.1f}% ({self.hits}/{self.hits + self.misses})")
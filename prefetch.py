@@ -0,0 +1,99 @@
+# Velocity-predictive chunk prefetch.
+#
+# At Warp and Hyper speeds the ship crosses a chunk in well under a second,
+# so waiting until it enters a chunk before asking for its neighbours leaves
+# them generating while they're already on screen. The prefetcher
+# extrapolates the ship's velocity over the next `seconds` and returns the
+# occupied chunks along that path, widened by `radius` chunks, in the order
+# the ship will reach them. The path is only recomputed on entering a chunk,
+# turning or changing speed noticeably.
+#
+# The hit rate counts chunks entering render range while prefetching: a hit
+# was already generated (or loaded), a late one was still on a worker, a
+# miss was never predicted.
+
+import numpy as np
+
+from config import Config
+from galaxy import occupied, sphere_offsets
+
+TURN_COS = 0.99  # heading changes beyond ~8 degrees re-predict the path
+SPEED_CHANGE = 0.25
+
+
+class ChunkPrefetcher:
+    def __init__(self, chunk_size, seconds=2.0, min_speed=1000.0, radius=1, max_chunks=64):
+        self.chunk_size = chunk_size
+        self.seconds = seconds
+        self.min_speed = min_speed
+        self.radius = radius
+        self.max_chunks = max_chunks
+
+        self.path = []  # predicted chunk coords, in arrival order
+        self.current = None
+        self.heading = None
+        self.speed = 0.0
+
+        self.predictions = 0
+        self.hits = 0
+        self.late = 0
+        self.misses = 0
+
+    def predict(self, abs_pos, velocity, current):
+        velocity = np.asarray(velocity, dtype=np.float64)
+        speed = float(np.sqrt(velocity @ velocity))
+        if speed < self.min_speed:
+            self.path = []
+            self.current = None
+            return self.path
+
+        heading = velocity / speed
+        if (current == self.current and heading @ self.heading > TURN_COS
+                and abs(speed - self.speed) <= self.speed * SPEED_CHANGE):
+            return self.path
+        self.current, self.heading, self.speed = current, heading, speed
+        self.predictions += 1
+
+        # Sample the path every half chunk, then widen each sample's chunk
+        step = self.chunk_size / 2 / speed
+        times = np.arange(1, max(int(self.seconds / step), 1) + 1) * step
+        points = np.asarray(abs_pos, dtype=np.float64) + velocity * times[:, None]
+        cells = np.floor(points / self.chunk_size).astype(np.int64)
+        if Config.UNIVERSE_LAYOUT == 'flat':
+            cells[:, 1] = 0
+        coords = (cells[:, None, :] + sphere_offsets(self.radius)[None]).reshape(-1, 3)
+
+        # First appearance is arrival order
+        _, first = np.unique(coords, axis=0, return_index=True)
+        coords = coords[np.sort(first)]
+        coords = coords[occupied(coords)][:self.max_chunks]
+        self.path = [tuple(c) for c in coords.tolist()]
+        return self.path
+
+    def lead(self, abs_pos, velocity, seconds, max_distance):
+        # Where the ship will be in `seconds`, at most max_distance away
+        offset = np.asarray(velocity, dtype=np.float64) * seconds
+        length = float(np.sqrt(offset @ offset))
+        if length > max_distance:
+            offset *= max_distance / length
+        return np.asarray(abs_pos, dtype=np.float64) + offset
+
+    def score(self, statuses):
+        # One status per chunk entering render range, from
+        # ChunkStreamer.status() or 'loaded'
+        for status in statuses:
+            if status in ('ready', 'loaded'):
+                self.hits += 1
+            elif status == 'pending':
+                self.late += 1
+            else:
+                self.misses += 1
+
+    def hit_rate(self):
+        total = self.hits + self.late + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self, name='Prefetch'):
+        return (f"{name:<10} hits {self.hits:>5} | late {self.late:>4} | misses {self.misses:>4} | "
+                f"{self.hit_rate():.1%} hit rate | {self.predictions} predictions | "
+                f"path {len(self.path)} chunks")
@@ -0,0 +1,242 @@
+# Frame profiler.
+#
+# Named timing scopes record into a fixed-size ring buffer of NumPy arrays,
+# so the cost of a scope is two perf_counter() calls and a few array writes,
+# and memory never grows. Per-frame counters (chunks generated, entities
+# alive, ...) are kept in a second ring, one slot per frame.
+#
+#   with profiler.scope('universe.chunks'):
+#       ...
+#
+# summary()/worst() aggregate the last N frames. export_csv() and
+# export_chrome_trace() dump everything still in the ring; the trace opens in
+# chrome://tracing or Perfetto.
+
+import csv
+import json
+import time
+
+import numpy as np
+
+
+class _Scope:
+    # One reusable scope object per name. A scope must not be nested inside
+    # itself.
+    __slots__ = ('profiler', 'name_id', 'start')
+
+    def __init__(self, profiler, name_id):
+        self.profiler = profiler
+        self.name_id = name_id
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._record(self.name_id, self.start, time.perf_counter() - self.start)
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class Profiler:
+    def __init__(self, events=65536, frames=1024, enabled=True):
+        self.enabled = enabled
+
+        self.names = []
+        self.scopes = {}
+
+        self.ids = np.zeros(events, dtype=np.int16)
+        self.frames = np.zeros(events, dtype=np.int64)
+        self.starts = np.zeros(events, dtype=np.float64)
+        self.durations = np.zeros(events, dtype=np.float32)
+        self.head = 0
+        self.recorded = 0
+
+        self.frame_starts = np.zeros(frames, dtype=np.float64)
+        self.frame_times = np.zeros(frames, dtype=np.float32)
+        self.counters = {}
+        self.frame_index = 0
+        self.epoch = time.perf_counter()
+        self.frame_starts[0] = self.epoch
+
+    # ──────────────────────────────────────────────────────────────
+    # Recording
+    # ──────────────────────────────────────────────────────────────
+
+    def scope(self, name):
+        if not self.enabled:
+            return _NULL_SCOPE
+        scope = self.scopes.get(name)
+        if scope is None:
+            scope = self.scopes[name] = _Scope(self, len(self.names))
+            self.names.append(name)
+        return scope
+
+    def _record(self, name_id, start, duration):
+        i = self.head
+        self.ids[i] = name_id
+        self.frames[i] = self.frame_index
+        self.starts[i] = start
+        self.durations[i] = duration
+        self.head = (i + 1) % len(self.ids)
+        self.recorded += 1
+
+    def frame(self):
+        # Closes the current frame and starts the next one
+        now = time.perf_counter()
+        slots = len(self.frame_starts)
+        slot = self.frame_index % slots
+        self.frame_times[slot] = now - self.frame_starts[slot]
+
+        self.frame_index += 1
+        slot = self.frame_index % slots
+        self.frame_starts[slot] = now
+        for values in self.counters.values():
+            values[slot] = 0
+
+    def _counter(self, name):
+        values = self.counters.get(name)
+        if values is None:
+            values = self.counters[name] = np.zeros(len(self.frame_starts))
+        return values
+
+    def count(self, name, value=1):
+        # Adds to this frame's value, e.g. chunks generated
+        self._counter(name)[self.frame_index % len(self.frame_starts)] += value
+
+    def gauge(self, name, value):
+        # Sets this frame's value, e.g. entities alive
+        self._counter(name)[self.frame_index % len(self.frame_starts)] = value
+
+    # ──────────────────────────────────────────────────────────────
+    # Queries over the last `frames` finished frames
+    # ──────────────────────────────────────────────────────────────
+
+    def _window(self, frames):
+        frames = min(frames, self.frame_index, len(self.frame_starts) - 1)
+        return self.frame_index - frames, frames
+
+    def _events(self):
+        n = min(self.recorded, len(self.ids))
+        if n < len(self.ids):
+            order = np.arange(n)
+        else:
+            order = np.roll(np.arange(n), -self.head)
+        return self.ids[order], self.frames[order], self.starts[order], self.durations[order]
+
+    def summary(self, frames=120):
+        # {name: {'mean', 'max', 'calls'}}, in ms per frame
+        first, count = self._window(frames)
+        if not count or not self.names:
+            return {}
+
+        ids, frame_ids, _, durations = self._events()
+        mask = (frame_ids >= first) & (frame_ids < self.frame_index)
+        totals = np.zeros((len(self.names), count))
+        np.add.at(totals, (ids[mask], frame_ids[mask] - first), durations[mask] * 1000)
+        calls = np.bincount(ids[mask], minlength=len(self.names))
+
+        return {
+            name: {
+                'mean': float(totals[i].mean()),
+                'max': float(totals[i].max()),
+                'calls': int(calls[i]),
+            }
+            for i, name in enumerate(self.names) if calls[i]
+        }
+
+    def worst(self, n=8, frames=120, key='max'):
+        stats = self.summary(frames)
+        return sorted(stats.items(), key=lambda item: item[1][key], reverse=True)[:n]
+
+    def frame_stats(self, frames=120):
+        first, count = self._window(frames)
+        if not count:
+            return {'mean': 0.0, 'max': 0.0, 'fps': 0.0}
+        slots = np.arange(first, self.frame_index) % len(self.frame_starts)
+        times = self.frame_times[slots] * 1000
+        mean = float(times.mean())
+        return {'mean': mean, 'max': float(times.max()), 'fps': 1000 / max(mean, 1e-9)}
+
+    def counter_stats(self, frames=120):
+        # {name: {'last', 'mean', 'per_second'}}
+        first, count = self._window(frames)
+        if not count:
+            return {}
+        slots = np.arange(first, self.frame_index) % len(self.frame_starts)
+        seconds = max(float(self.frame_times[slots].sum()), 1e-9)
+
+        stats = {}
+        for name, values in self.counters.items():
+            window = values[slots]
+            stats[name] = {
+                'last': float(window[-1]),
+                'mean': float(window.mean()),
+                'per_second': float(window.sum()) / seconds,
+            }
+        return stats
+
+    # ──────────────────────────────────────────────────────────────
+    # Export
+    # ──────────────────────────────────────────────────────────────
+
+    def export_csv(self, path):
+        ids, frame_ids, starts, durations = self._events()
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame', 'scope', 'start_ms', 'duration_ms'])
+            for name_id, frame, start, duration in zip(ids.tolist(), frame_ids.tolist(),
+                                                       starts.tolist(), durations.tolist()):
+                writer.writerow([frame, self.names[name_id], f"{(start - self.epoch) * 1000:.3f}",
+                                 f"{duration * 1000:.4f}"])
+
+    def export_chrome_trace(self, path):
+        ids, frame_ids, starts, durations = self._events()
+        events = [
+            {'name': self.names[name_id], 'ph': 'X', 'pid': 1, 'tid': 1,
+             'ts': (start - self.epoch) * 1e6, 'dur': duration * 1e6, 'args': {'frame': frame}}
+            for name_id, frame, start, duration in zip(ids.tolist(), frame_ids.tolist(),
+                                                       starts.tolist(), durations.tolist())
+        ]
+
+        first, count = self._window(len(self.frame_starts))
+        for frame in range(first, self.frame_index):
+            slot = frame % len(self.frame_starts)
+            ts = (self.frame_starts[slot] - self.epoch) * 1e6
+            for name, values in self.counters.items():
+                events.append({'name': name, 'ph': 'C', 'pid': 1, 'ts': ts, 'args': {name: values[slot]}})
+
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+class StartupTimer:
+    # Start-up milestones, in seconds since `start`. Each is kept the first
+    # time it's reached, so marking one every frame is fine.
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks = {}
+
+    def __contains__(self, name):
+        return name in self.marks
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.start
+        return self.marks[name]
+
+    def report(self, name='Startup'):
+        steps = " | ".join(f"{step} {seconds * 1000:.0f} ms" for step, seconds in self.marks.items())
+        return f"{name:<10} {steps}"
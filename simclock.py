@@ -0,0 +1,49 @@
+# Fixed-timestep simulation clock.
+#
+# Render frames feed their real dt into an accumulator, and the simulation
+# advances in whole steps of `step` seconds, so motion and gravity come out
+# the same at any frame rate. What is left in the accumulator (less than one
+# step) becomes `alpha`, the fraction used to interpolate rendered positions
+# between the last two simulation states.
+#
+#   for _ in range(clock.advance(time.dt)):
+#       simulate(clock.step)
+#   present(clock.alpha)
+#
+# A slow frame runs at most `max_steps` steps and the rest of its time is
+# dropped, so the simulation slows down instead of falling further behind
+# every frame (the "spiral of death").
+
+
+class SimulationClock:
+    def __init__(self, step=1 / 60, max_steps=8):
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.alpha = 0.0
+
+        self.steps = 0
+        self.dropped_steps = 0
+        self.sim_time = 0.0
+
+    def advance(self, dt):
+        # Returns how many steps to simulate this frame
+        self.accumulator += max(dt, 0.0)
+        # The epsilon keeps dt == step from rounding down to zero steps
+        steps = int(self.accumulator / self.step + 1e-9)
+
+        if steps > self.max_steps:
+            self.dropped_steps += steps - self.max_steps
+            steps = self.max_steps
+            self.accumulator %= self.step
+        else:
+            self.accumulator -= steps * self.step
+
+        self.alpha = min(max(self.accumulator / self.step, 0.0), 1.0)
+        self.steps += steps
+        self.sim_time += steps * self.step
+        return steps
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.alpha = 0.0
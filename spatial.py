@@ -0,0 +1,214 @@
+# Uniform-grid spatial index for proximity queries over loaded objects.
+#
+# Objects are bucketed by the grid cell containing their (absolute) position.
+# A query only visits the cells overlapping its search sphere and scans each
+# of them with one vectorized distance computation, so cost tracks the local
+# object density instead of everything that is loaded.
+#
+# Nearest queries have no sphere to start from. They visit shells of cells
+# outward from the query's cell and stop once the best k found are closer
+# than anything the next shell could hold.
+
+import heapq
+import math
+
+import numpy as np
+
+
+class _Cell:
+    __slots__ = ('objects', 'positions', 'kinds', 'sizes', 'slots', '_arrays')
+
+    def __init__(self):
+        self.objects = []
+        self.positions = []
+        self.kinds = []
+        self.sizes = []
+        self.slots = {}
+        self._arrays = None
+
+    def add(self, obj, position, kind, size):
+        self.slots[obj] = len(self.objects)
+        self.objects.append(obj)
+        self.positions.append(position)
+        self.kinds.append(kind)
+        self.sizes.append(size)
+        self._arrays = None
+
+    def remove(self, obj):
+        i = self.slots.pop(obj)
+        last = len(self.objects) - 1
+
+        # Swap-remove keeps the lists dense
+        if i != last:
+            moved = self.objects[last]
+            self.objects[i] = moved
+            self.positions[i] = self.positions[last]
+            self.kinds[i] = self.kinds[last]
+            self.sizes[i] = self.sizes[last]
+            self.slots[moved] = i
+
+        self.objects.pop()
+        self.positions.pop()
+        self.kinds.pop()
+        self.sizes.pop()
+        self._arrays = None
+
+    def arrays(self):
+        if self._arrays is None:
+            self._arrays = (
+                np.array(self.positions, dtype=np.float64).reshape(-1, 3),
+                np.array(self.kinds, dtype=np.int16),
+            )
+        return self._arrays
+
+
+class SpatialIndex:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.where = {}
+        self.max_sizes = {}
+
+    def __len__(self):
+        return len(self.where)
+
+    def __contains__(self, obj):
+        return obj in self.where
+
+    def cell_key(self, pos):
+        return (
+            int(math.floor(pos[0] / self.cell_size)),
+            int(math.floor(pos[1] / self.cell_size)),
+            int(math.floor(pos[2] / self.cell_size))
+        )
+
+    def insert(self, obj, position, kind, size=0.0):
+        if obj in self.where:
+            self.remove(obj)
+
+        position = (float(position[0]), float(position[1]), float(position[2]))
+        key = self.cell_key(position)
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = self.cells[key] = _Cell()
+
+        cell.add(obj, position, kind, size)
+        self.where[obj] = key
+        self.max_sizes[kind] = max(self.max_sizes.get(kind, 0.0), size)
+
+    def remove(self, obj):
+        key = self.where.pop(obj, None)
+        if key is None:
+            return
+
+        cell = self.cells[key]
+        cell.remove(obj)
+        if not cell.objects:
+            del self.cells[key]
+
+    def max_size(self, kind):
+        # Largest size ever inserted for a kind, for bounding per-object radii
+        return self.max_sizes.get(kind, 0.0)
+
+    # ──────────────────────────────────────────────────────────────
+    # Queries. `pos` is any 3-sequence, results are (obj, distance).
+    # ──────────────────────────────────────────────────────────────
+
+    def _candidate_cells(self, pos, radius):
+        if radius is None or math.isinf(radius):
+            return self.cells.values()
+
+        lo = self.cell_key((pos[0] - radius, pos[1] - radius, pos[2] - radius))
+        hi = self.cell_key((pos[0] + radius, pos[1] + radius, pos[2] + radius))
+        count = (hi[0] - lo[0] + 1) * (hi[1] - lo[1] + 1) * (hi[2] - lo[2] + 1)
+
+        # Large searches walk the occupied cells instead of the empty volume
+        if count > len(self.cells):
+            return [cell for key, cell in self.cells.items()
+                    if lo[0] <= key[0] <= hi[0] and lo[1] <= key[1] <= hi[1]
+                    and lo[2] <= key[2] <= hi[2]]
+
+        cells = []
+        for x in range(lo[0], hi[0] + 1):
+            for y in range(lo[1], hi[1] + 1):
+                for z in range(lo[2], hi[2] + 1):
+                    cell = self.cells.get((x, y, z))
+                    if cell is not None:
+                        cells.append(cell)
+        return cells
+
+    def _gather(self, pos, radius, kind, cells=None):
+        point = np.array([pos[0], pos[1], pos[2]], dtype=np.float64)
+        found = []
+
+        for cell in self._candidate_cells(pos, radius) if cells is None else cells:
+            positions, kinds = cell.arrays()
+            dists = np.sqrt(((positions - point) ** 2).sum(axis=1))
+
+            mask = np.ones(len(dists), dtype=bool) if radius is None else dists < radius
+            if kind is not None:
+                mask &= kinds == kind
+
+            for i in np.flatnonzero(mask):
+                found.append((cell.objects[i], float(dists[i])))
+        return found
+
+    def _shell(self, center, r):
+        # Occupied cells r cells from center (Chebyshev), a hollow cube
+        cx, cy, cz = center
+        cells = []
+        for x in range(cx - r, cx + r + 1):
+            edge_x = abs(x - cx) == r
+            for y in range(cy - r, cy + r + 1):
+                if edge_x or abs(y - cy) == r:
+                    zs = range(cz - r, cz + r + 1)
+                else:
+                    zs = (cz - r, cz + r) if r else (cz,)
+                for z in zs:
+                    cell = self.cells.get((x, y, z))
+                    if cell is not None:
+                        cells.append(cell)
+        return cells
+
+    def _search(self, pos, k, max_dist, kind):
+        # The k nearest, shell by shell. Everything outside shells 0..r is
+        # at least r cells away, so the search ends once the k-th best is
+        # that close. Once a shell has more cells than are left occupied,
+        # the rest are scanned directly instead of walking empty space.
+        center = self.cell_key(pos)
+        limit = math.inf if max_dist is None else max_dist
+        found = []
+        visited = 0
+        r = 0
+        # Shell r is at least r - 1 cells away
+        while visited < len(self.cells) and (r - 1) * self.cell_size < limit:
+            shell_cells = (2 * r + 1) ** 3 - (2 * r - 1) ** 3 if r else 1
+            if shell_cells > len(self.cells) - visited:
+                rest = [cell for key, cell in self.cells.items()
+                        if max(abs(a - b) for a, b in zip(key, center)) >= r]
+                found += self._gather(pos, max_dist, kind, rest)
+                break
+
+            cells = self._shell(center, r)
+            visited += len(cells)
+            found += self._gather(pos, max_dist, kind, cells)
+            if len(found) >= k:
+                found = heapq.nsmallest(k, found, key=lambda item: item[1])
+                if found[-1][1] <= r * self.cell_size:
+                    break
+            r += 1
+        return heapq.nsmallest(k, found, key=lambda item: item[1])
+
+    def within(self, pos, radius, kind=None):
+        found = self._gather(pos, radius, kind)
+        found.sort(key=lambda item: item[1])
+        return found
+
+    def k_nearest(self, pos, k, max_dist=None, kind=None):
+        return self._search(pos, k, max_dist, kind)
+
+    def nearest(self, pos, max_dist=None, kind=None):
+        found = self._search(pos, 1, max_dist, kind)
+        if not found:
+            return None, max_dist
+        return found[0]
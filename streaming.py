@@ -0,0 +1,186 @@
+# Background chunk generation.
+#
+# Chunk records come from the LRU cache or the optional on-disk store when
+# possible, and are otherwise computed on a worker pool ahead of need. The
+# main thread only turns finished records into entities, and it stops once it
+# has spent its per-frame budget. Requests that stop being needed before they run are
+# cancelled, and any that finish after going stale are dropped.
+#
+# Prefetches generate on the same pool but only fill the cache. Requesting a
+# chunk that is still prefetching picks up the record when it finishes.
+
+import atexit
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from config import Config
+from generation import generate_chunks, generation_settings
+from cache import ChunkCache
+from chunkstore import ChunkStore
+
+
+def _init_worker(settings):
+    # Process workers start with a fresh Config, so carry the layout over
+    # once per process. Thread workers share the main one's.
+    for name, value in settings.items():
+        setattr(Config, name, value)
+
+
+class ChunkStreamer:
+    def __init__(self, workers=None, mode=None, batch_size=None, cache=None, store=None):
+        workers = Config.CHUNK_WORKERS if workers is None else workers
+        mode = mode or Config.CHUNK_WORKER_MODE
+        self.batch_size = batch_size or Config.CHUNK_BATCH
+
+        if workers <= 0:
+            self.executor = None
+        elif mode == 'process':
+            self.executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                                initargs=(generation_settings(),))
+        else:
+            self.executor = ThreadPoolExecutor(workers, thread_name_prefix='chunkgen')
+        if self.executor is not None:
+            atexit.register(self.shutdown)
+
+        if cache is None:
+            cache = ChunkCache(Config.CHUNK_CACHE_ENTRIES, Config.CHUNK_CACHE_BYTES)
+        self.cache = cache
+
+        if store is None and Config.CHUNK_STORE_PATH:
+            store = ChunkStore(Config.CHUNK_STORE_PATH)
+            atexit.register(store.close)
+        self.store = store
+
+        self.pending = {}   # coords -> future
+        self.batches = {}   # future -> coords still pending from it
+        self.wanted = set() # pending coords to instantiate, the rest only get cached
+        self.ready = {}     # coords -> ChunkRecord waiting to be instantiated
+
+        self.requested = 0
+        self.prefetched = 0
+        self.instantiated = 0
+        self.cancelled = 0
+        self.discarded = 0
+
+    def is_waiting(self, coords):
+        return coords in self.pending or coords in self.ready
+
+    def has_record(self, coords):
+        return coords in self.cache or (self.store is not None and coords in self.store)
+
+    def status(self, coords):
+        # 'ready' once a record exists, 'pending' while a worker has it
+        if coords in self.ready or self.has_record(coords):
+            return 'ready'
+        if coords in self.pending:
+            return 'pending'
+        return None
+
+    def request(self, coords_list):
+        todo = []
+        for coords in coords_list:
+            if coords in self.ready:
+                continue
+            if coords in self.pending:
+                self.wanted.add(coords)
+                continue
+            record = self.cache.get(coords)
+            if record is None and self.store is not None:
+                record = self.store.get(coords)
+                if record is not None:
+                    self.cache.put(record)
+
+            if record is not None:
+                self.ready[coords] = record
+            else:
+                todo.append(coords)
+
+        if not todo:
+            return
+        self.requested += len(todo)
+
+        if self.executor is None:
+            for record in generate_chunks(todo):
+                self.remember(record)
+                self.ready[record.coords] = record
+            return
+
+        self.wanted.update(todo)
+        self._submit(todo)
+
+    def prefetch(self, coords_list):
+        # Generates into the cache only. Needs workers: generating inline
+        # would spend the frame time prefetching is meant to save.
+        if self.executor is None:
+            return
+        todo = [c for c in coords_list if not self.is_waiting(c) and not self.has_record(c)]
+        self.prefetched += len(todo)
+        self._submit(todo)
+
+    def _submit(self, todo):
+        for i in range(0, len(todo), self.batch_size):
+            batch = todo[i:i + self.batch_size]
+            future = self.executor.submit(generate_chunks, batch)
+            self.batches[future] = set(batch)
+            for coords in batch:
+                self.pending[coords] = future
+
+    def remember(self, record):
+        self.cache.put(record)
+        if self.store is not None:
+            self.store.put(record)
+
+    def cancel_stale(self, needed):
+        # `needed` covers prefetched chunks too, or they'd be cancelled here
+        for coords in [c for c in self.pending if c not in needed]:
+            future = self.pending.pop(coords)
+            self.wanted.discard(coords)
+            members = self.batches.get(future)
+            if members is None:
+                continue
+            members.discard(coords)
+            if not members and future.cancel():
+                del self.batches[future]
+                self.cancelled += 1
+
+        for coords in [c for c in self.ready if c not in needed]:
+            del self.ready[coords]
+            self.discarded += 1
+
+    def collect(self):
+        for future in [f for f in self.batches if f.done()]:
+            members = self.batches.pop(future)
+            if future.cancelled():
+                continue
+
+            for record in future.result():
+                self.remember(record)
+                coords = record.coords
+                if coords not in members:
+                    self.discarded += 1
+                    continue
+                self.pending.pop(coords, None)
+                if coords in self.wanted:
+                    self.wanted.discard(coords)
+                    self.ready[coords] = record
+
+    def take(self, budget_ms, instantiate, priority=None):
+        # Instantiates ready records, in priority order, until the budget is
+        # spent. At least one is always instantiated, so streaming advances.
+        if not self.ready:
+            return 0
+
+        deadline = time.perf_counter() + budget_ms / 1000
+        count = 0
+        for coords in sorted(self.ready, key=priority):
+            instantiate(self.ready.pop(coords))
+            count += 1
+            if time.perf_counter() >= deadline:
+                break
+
+        self.instantiated += count
+        return count
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,43 @@
+# Catalog queries against chunks resolved the way the game loads them.
+#
+#   python3 -m pytest test_catalog.py
+
+import itertools
+
+from catalog import Catalog
+from generation import STAR, NEBULA, BLACK_HOLE, SUPERNOVA_TYPES, generate_chunk, star_fate
+from timeline import resolve_chunk
+
+
+def supernova_star():
+    # The first star that dies as a supernova, and its chunk
+    for coords in itertools.product(range(-4, 5), range(-1, 2), range(-4, 5)):
+        for body in generate_chunk(coords).bodies:
+            if body.kind == STAR and body.type_index in SUPERNOVA_TYPES:
+                return coords, body
+    raise AssertionError("no supernova star near the origin")
+
+
+def test_remnant_after_death():
+    coords, star = supernova_star()
+    death = star_fate(star)[0]
+    catalog = Catalog()
+
+    before = catalog.nearest(star.position, alive_at=death - 1)
+    assert before[0].seed == star.seed and before[1] == 0
+
+    for kind in (BLACK_HOLE, NEBULA):
+        record, dist = catalog.nearest(star.position, kind=kind, alive_at=death + 1)
+        assert dist == 0
+        assert record in resolve_chunk(generate_chunk(coords), death + 1)[0].bodies
+    after = catalog.within(star.position, 1, kind=STAR, alive_at=death + 1)
+    assert star.seed not in [record.seed for record, _ in after]
+
+
+def test_matches_resolved_chunk():
+    coords, star = supernova_star()
+    now = star_fate(star)[0] + 1
+    resolved = resolve_chunk(generate_chunk(coords), now)[0].bodies
+    found = Catalog().in_sector(Catalog.sector_of(star.position), alive_at=now)
+    found = {(record.kind, record.seed) for record, _ in found}
+    assert {(body.kind, body.seed) for body in resolved} <= found
@@ -0,0 +1,41 @@
+# The on-disk store throws away halves that don't belong together.
+#
+#   python3 -m pytest test_chunkstore.py
+
+import os
+
+from chunkstore import ChunkStore, bake
+from galaxy import chunks_around
+from generation import generate_chunk
+
+COORDS = [tuple(c) for c in chunks_around((0, 0, 0), 2).tolist()]
+
+
+def baked(path):
+    store = ChunkStore(str(path))
+    bake(store, COORDS)
+    store.close()
+    return str(path)
+
+
+def test_round_trip(tmp_path):
+    store = ChunkStore(baked(tmp_path))
+    assert not store.rejected and len(store) == len(COORDS)
+    assert all(store.get(c) == generate_chunk(c) for c in COORDS)
+
+
+def test_missing_half_is_rejected(tmp_path):
+    for name in ('bodies.bin', 'index.bin'):
+        path = baked(tmp_path / name)
+        os.remove(os.path.join(path, name))
+        store = ChunkStore(path)
+        assert store.rejected and len(store) == 0
+        assert store.get(COORDS[0]) is None
+
+
+def test_truncated_bodies_are_rejected(tmp_path):
+    path = baked(tmp_path)
+    bodies = os.path.join(path, 'bodies.bin')
+    os.truncate(bodies, os.path.getsize(bodies) // 2)
+    store = ChunkStore(path)
+    assert store.rejected and len(store) == 0
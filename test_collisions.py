@@ -0,0 +1,61 @@
+# Broad phase and sweeps against brute force, near and far from the origin.
+#
+#   python3 -m pytest test_collisions.py
+
+import numpy as np
+
+from collisions import CollisionSystem
+
+
+def brute_pairs(positions, radii):
+    delta = positions[:, None] - positions[None]
+    touching = (delta * delta).sum(axis=2) < (radii[:, None] + radii[None]) ** 2
+    a, b = np.nonzero(np.triu(touching, 1))
+    return {frozenset(p) for p in zip(a.tolist(), b.tolist())}
+
+
+def system(positions, radii):
+    collisions = CollisionSystem()
+    for i, (position, radius) in enumerate(zip(positions, radii)):
+        collisions.add(i, position, radius, 0)
+    return collisions
+
+
+def found_pairs(collisions):
+    a, b = collisions.pairs()
+    return {frozenset((collisions.objects[i], collisions.objects[j])) for i, j in zip(a.tolist(), b.tolist())}
+
+
+def cluster(center, count=400, spread=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.asarray(center) + rng.uniform(-spread, spread, (count, 3)), rng.uniform(5, 60, count)
+
+
+def test_pairs_near_origin():
+    positions, radii = cluster((0, 0, 0))
+    assert found_pairs(system(positions, radii)) == brute_pairs(positions, radii)
+
+
+def test_pairs_far_from_origin():
+    # Far past 2^20 cells of the smallest size, where packed keys would
+    # wrap; the second cluster lost pairs to wrapped keys
+    far = [((1e11, 0, 0), 1), ((353378703662.1321, -878394574083.888, 111192233841.44678), 6)]
+    for center, seed in far:
+        positions, radii = cluster(center, 300, 2000, seed)
+        assert found_pairs(system(positions, radii)) == brute_pairs(positions, radii)
+
+
+def test_bodies_spread_past_the_key_range():
+    near, near_radii = cluster((0, 0, 0), 200, seed=2)
+    far, far_radii = cluster((4e12, 0, 0), 200, seed=3)
+    positions, radii = np.vstack([near, far]), np.r_[near_radii, far_radii]
+    assert found_pairs(system(positions, radii)) == brute_pairs(positions, radii)
+
+
+def test_sweep_far_from_origin():
+    center = np.array([2e11, -1e11, 3e10])
+    collisions = system([center], [50.0])
+    event = collisions.sweep('ship', center - (500, 0, 0), center + (500, 0, 0), 3.0)
+    assert event is not None and event.b == 0
+    assert abs(event.time - (500 - 53) / 1000) < 1e-6
+    assert collisions.sweep('ship', center + (0, 500, 0), center + (500, 500, 0), 3.0) is None
@@ -0,0 +1,53 @@
+# Body masses against the ship: black holes dominate, and every star and
+# planet can be flown away from in Slow mode.
+#
+#   python3 -m pytest test_gravity.py
+
+from config import Config
+from generation import STAR, BLACK_HOLE, PLANET, GAS_GIANT, STAR_TYPES, PLANET_TYPES, GAS_GIANTS
+from gravity import GravitySystem, body_mass
+
+SLOW_SPEED = 30  # Spaceship.max_speeds[0]
+BLACK_HOLE_SIZES = (32, 80)  # generate_chunk and star_remnants
+
+BIGGEST = {
+    STAR: max(t['size'][1] for t in STAR_TYPES),
+    PLANET: max(t['size'][1] for t in PLANET_TYPES),
+    GAS_GIANT: max(t['size'][1] for t in GAS_GIANTS),
+}
+
+
+def pull(kind, size, distance):
+    system = GravitySystem(0.0, Config.GRAVITY_G, Config.GRAVITY_SOFTENING)
+    system.add('body', (0.0, 0.0, 0.0), body_mass(kind, size))
+    return float(-system.acceleration((distance, 0.0, 0.0))[0])
+
+
+def drift(accel):
+    # Where the ship's drift settles under a constant pull: it gains
+    # accel * step and is damped by 0.99 every simulation step
+    return accel * Config.SIM_STEP * 0.99 / (1 - 0.99)
+
+
+def test_black_holes_outweigh_everything():
+    smallest = body_mass(BLACK_HOLE, BLACK_HOLE_SIZES[0])
+    for kind, size in BIGGEST.items():
+        assert smallest > body_mass(kind, size)
+    assert body_mass(STAR, BIGGEST[STAR]) > body_mass(GAS_GIANT, BIGGEST[GAS_GIANT])
+
+
+def test_black_holes_pull_hardest():
+    for distance in (500, 2000, 8000):
+        assert pull(BLACK_HOLE, BLACK_HOLE_SIZES[0], distance) > pull(STAR, BIGGEST[STAR], distance)
+
+
+def test_every_body_can_be_escaped_in_slow_mode():
+    for kind, size in BIGGEST.items():
+        surface = size / 2 + Config.SHIP_RADIUS
+        assert drift(pull(kind, size, surface)) < SLOW_SPEED, kind
+
+
+def test_event_horizon_holds_a_slow_ship():
+    # The HUD's event horizon, two sizes from the centre
+    for size in BLACK_HOLE_SIZES:
+        assert drift(pull(BLACK_HOLE, size, size * 2)) > SLOW_SPEED
@@ -0,0 +1,64 @@
+# Grid queries against a brute-force scan.
+#
+#   python3 -m pytest test_spatial.py
+
+import random
+
+import numpy as np
+
+from spatial import SpatialIndex
+
+
+def make_index(seed, count=600, spread=40000, cell_size=4000):
+    rng = random.Random(seed)
+    index = SpatialIndex(cell_size)
+    objects = {}
+    # A dense cluster, a sparse field and a few far outliers
+    for i in range(count):
+        if i % 3 == 0:
+            pos = tuple(rng.gauss(0, 3000) for _ in range(3))
+        else:
+            pos = tuple(rng.uniform(-spread, spread) for _ in range(3))
+        objects[i] = (pos, rng.randrange(3))
+    for i in range(count, count + 5):
+        objects[i] = (tuple(rng.uniform(-1e6, 1e6) for _ in range(3)), rng.randrange(3))
+    for obj, (pos, kind) in objects.items():
+        index.insert(obj, pos, kind)
+    return index, objects
+
+
+def brute(objects, pos, k, max_dist=None, kind=None):
+    found = []
+    for obj, (p, obj_kind) in objects.items():
+        dist = float(np.sqrt(((np.array(p) - np.array(pos)) ** 2).sum()))
+        if (kind is None or obj_kind == kind) and (max_dist is None or dist < max_dist):
+            found.append((dist, obj))
+    found.sort()
+    return [obj for _, obj in found[:k]]
+
+
+def query_points(seed):
+    rng = random.Random(seed)
+    points = [(0.0, 0.0, 0.0), (5e5, 5e5, 5e5), (-3e6, 0.0, 2e6)]
+    points += [tuple(rng.uniform(-60000, 60000) for _ in range(3)) for _ in range(30)]
+    return points
+
+
+def test_k_nearest_matches_brute_force():
+    index, objects = make_index(1)
+    for pos in query_points(2):
+        for k in (1, 5, 40):
+            for kind in (None, 2):
+                for max_dist in (None, 15000):
+                    got = [obj for obj, _ in index.k_nearest(pos, k, max_dist, kind)]
+                    assert got == brute(objects, pos, k, max_dist, kind)
+
+
+def test_nearest_matches_brute_force():
+    index, objects = make_index(3)
+    for pos in query_points(4):
+        for kind in (None, 0, 1):
+            obj, dist = index.nearest(pos, kind=kind)
+            assert [obj] == brute(objects, pos, 1, kind=kind)
+    assert index.nearest((1e9, 0, 0), max_dist=100) == (None, 100)
+    assert SpatialIndex(1000).nearest((0, 0, 0)) == (None, None)
@@ -0,0 +1,128 @@
+# Universe time and long-timescale events.
+#
+# The universe clock counts simulated seconds since the epoch, time
+# dilation included. Loaded content is placed from it analytically: a
+# planet's orbit angle, a belt rock's phase or a star's fate is a function
+# of its seed and the clock, so nothing is simulated while it's unloaded
+# and coming back later finds everything where it would have been.
+#
+# Stellar deaths are seeded too. Chunks resolve them lazily: when a chunk
+# materializes, deaths already past are applied to (a copy of) its record
+# at once, and the ones still to come go on a heap. Unloading a chunk drops
+# its events, so only loaded chunks are ever tracked and a frame only looks
+# at the top of the heap.
+#
+#   record, upcoming = resolve_chunk(record, clock.time)
+#   scheduler.track(record.coords, upcoming)
+#   for event in scheduler.due(clock.time):
+#       apply(event)
+
+import heapq
+from dataclasses import dataclass
+
+from generation import STAR, ChunkRecord, star_fate, star_remnants
+
+
+class UniverseClock:
+    def __init__(self, start=0.0):
+        self.time = start
+        self.prev_time = start
+
+    def advance(self, dt):
+        self.prev_time = self.time
+        self.time += dt
+
+    def at(self, alpha=1.0):
+        # alpha blends from the previous step (0) to the latest one (1)
+        return self.prev_time + (self.time - self.prev_time) * alpha
+
+
+@dataclass
+class UniverseEvent:
+    time: float
+    kind: int
+    coords: tuple
+    seed: int  # of the body it happens to
+
+
+def resolve_chunk(record, now):
+    # The chunk as it is at `now`, and its events still to come. The
+    # record itself is left alone, it may be shared with the chunk cache.
+    bodies = []
+    upcoming = []
+    for body in record.bodies:
+        if body.kind == STAR:
+            death, kind = star_fate(body)
+            if death <= now:
+                bodies += star_remnants(body)
+                continue
+            upcoming.append(UniverseEvent(death, kind, record.coords, body.seed))
+        bodies.append(body)
+    return ChunkRecord(record.coords, bodies), upcoming
+
+
+class EventScheduler:
+    def __init__(self):
+        self.heap = []
+        self.seq = 0
+        # Chunk coords -> (generation, event count) of its events on the
+        # heap. Dropping a chunk only forgets its generation; its entries
+        # are skipped when they reach the top, or swept out once they make
+        # up half the heap.
+        self.live = {}
+        self.generation = 0
+        self.stale = 0
+
+        self.scheduled = 0
+        self.fired = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def track(self, coords, events):
+        self.drop(coords)
+        self.generation += 1
+        self.live[coords] = (self.generation, len(events))
+        for event in events:
+            self.seq += 1
+            heapq.heappush(self.heap, (event.time, self.seq, self.generation, event))
+        self.scheduled += len(events)
+
+    def drop(self, coords):
+        entry = self.live.pop(coords, None)
+        if entry is None:
+            return
+        self.stale += entry[1]
+        self.dropped += entry[1]
+        if self.stale > 64 and self.stale * 2 > len(self.heap):
+            self.heap = [item for item in self.heap if self._is_live(item)]
+            heapq.heapify(self.heap)
+            self.stale = 0
+
+    def _is_live(self, item):
+        entry = self.live.get(item[3].coords)
+        return entry is not None and entry[0] == item[2]
+
+    def next_time(self):
+        return self.heap[0][0] if self.heap else None
+
+    def due(self, now):
+        # Events up to `now`, earliest first
+        events = []
+        while self.heap and self.heap[0][0] <= now:
+            item = heapq.heappop(self.heap)
+            if not self._is_live(item):
+                self.stale -= 1
+                continue
+            generation, count = self.live[item[3].coords]
+            self.live[item[3].coords] = (generation, count - 1)
+            events.append(item[3])
+        self.fired += len(events)
+        return events
+
+    def report(self, name='Events'):
+        upcoming = self.next_time()
+        upcoming = f"next at {upcoming:.0f}s" if upcoming is not None else "none pending"
+        return (f"{name:<10} tracked chunks {len(self.live):>4} | queued {len(self.heap):>5} | "
+                f"fired {self.fired} | dropped {self.dropped} | {upcoming}")